@@ -0,0 +1,120 @@
+import os
+
+import numpy as np
+import pytest
+
+import unified_plotting as up
+
+
+X = np.linspace(0.0, 1.0, 1000)
+Y = X ** 2
+
+
+def test_render_cache(my_outdir, monkeypatch):
+    directory = os.path.join(my_outdir, 'render_cache')
+    cache = up.cache.RenderCache(directory)
+    cache.clear()
+
+    # Miss renders and stores all formats
+    outputs = cache.render(up.plotly.scatter, X, Y, title='Cached', formats=['html', 'json'])
+    assert sorted(outputs) == ['html', 'json']
+    assert outputs['html'].startswith(b'<')
+    assert cache.stats['misses'] == 1
+    assert cache.stats['hits'] == 0
+    assert cache.stats['size_bytes'] == sum(len(val) for val in outputs.values())
+
+    # Hit with the same content is answered from disk without creating a figure
+    def fail(*args, **kwargs):
+        raise AssertionError('Plot function was called')
+
+    monkeypatch.setattr(up.plotly.Figure, '__init__', fail)
+    outputs_cached = cache.render(up.plotly.scatter, X.copy(), y=list(Y), title='Cached',
+                                  formats=['json', 'html'])
+    monkeypatch.undo()
+    assert outputs_cached == outputs
+    assert cache.stats['hits'] == 1
+    assert cache.stats['bytes_saved'] == cache.stats['size_bytes']
+    assert cache.hit_rate == 0.5
+
+    # Changed data, arguments or settings are misses
+    cache.render(up.plotly.scatter, X, Y + 1, title='Cached', formats='json')
+    cache.render(up.plotly.scatter, X, Y, title='Changed', formats='json')
+    try:
+        up.config.settings.marker_size = 7
+        cache.render(up.plotly.scatter, X, Y, title='Cached', formats='json')
+    finally:
+        up.config.load_defaults()
+    assert cache.stats['misses'] == 4
+
+    # Missing formats of a cached call are added, matplotlib is supported as well
+    outputs = cache.render(up.matplotlib.scatter, X, Y, formats=['svg', 'png'])
+    assert outputs['png'].startswith(b'\x89PNG')
+    outputs = cache.render(up.matplotlib.scatter, X, Y, formats=['png', 'pdf'])
+    assert outputs['pdf'].startswith(b'%PDF')
+    assert cache.stats['misses'] == 6
+    assert not [name for name in os.listdir(directory) if name.startswith('.')]
+
+    # Least recently used files are evicted when the size limit is exceeded
+    size_mb = cache.stats['size_bytes'] / 1e6
+    limited_cache = up.cache.RenderCache(directory, max_mb=size_mb)
+    assert limited_cache.stats['size_bytes'] == cache.stats['size_bytes']
+    limited_cache.render(up.matplotlib.scatter, X, Y, formats='svg')
+    limited_cache.render(up.matplotlib.histogram, [X], formats='svg')
+    assert limited_cache.stats['size_bytes'] <= size_mb * 1e6
+    limited_cache.render(up.matplotlib.scatter, X, Y, formats='svg')
+    assert limited_cache.stats['hits'] == 2
+    limited_cache.render(up.plotly.scatter, X, Y, title='Cached', formats='html')
+    assert limited_cache.stats['misses'] == 2
+
+    limited_cache.clear()
+    assert os.listdir(directory) == []
+    assert limited_cache.stats == dict(
+        hits=0, misses=0, hit_rate=0.0, bytes_saved=0, size_bytes=0)
+
+
+def test_render_cache_invalid_arguments(my_outdir):
+    with pytest.raises(ValueError):
+        up.cache.RenderCache(os.path.join(my_outdir, 'render_cache'), max_mb=-1)
+    cache = up.cache.RenderCache(os.path.join(my_outdir, 'render_cache'))
+    with pytest.raises(ValueError):
+        cache.render(up.javascript.table, [X, Y], formats='png')
+
+
+def test_render_cache_fingerprint_of_content(my_outdir):
+    import networkx as nx
+    import scipy.sparse
+
+    directory = os.path.join(my_outdir, 'render_cache_content')
+    cache = up.cache.RenderCache(directory)
+    cache.clear()
+
+    # Sparse matrices with equal shape, dtype and number of entries are distinguished
+    matrix1 = scipy.sparse.csr_matrix(np.array([[0, 1, 0], [0, 0, 0], [0, 0, 0]]))
+    matrix2 = scipy.sparse.csr_matrix(np.array([[0, 0, 0], [0, 0, 1], [0, 0, 0]]))
+    outputs1 = cache.render(up.javascript.network_d3, matrix1, formats='html')
+    outputs2 = cache.render(up.javascript.network_d3, matrix2, formats='html')
+    assert outputs1 != outputs2
+    cache.render(up.javascript.network_d3, matrix1.tocsr(copy=True), formats='html')
+    assert cache.stats['hits'] == 1
+    assert cache.stats['misses'] == 2
+
+    # A changed JGF file is a miss although its filepath is the same
+    filepath = os.path.join(my_outdir, 'render_cache_graph.json')
+    with open(filepath, 'w') as file_handle:
+        file_handle.write('{"graph": {"nodes": [{"id": "a"}]}}')
+    outputs1 = cache.render(up.javascript.network_d3, filepath, formats='html')
+    with open(filepath, 'w') as file_handle:
+        file_handle.write('{"graph": {"nodes": [{"id": "a"}, {"id": "b"}]}}')
+    outputs2 = cache.render(up.javascript.network_d3, filepath, formats='html')
+    assert outputs1 != outputs2
+    assert cache.stats['misses'] == 4
+    os.remove(filepath)
+
+    # Objects that can not be fingerprinted bypass the cache
+    size_bytes = cache.stats['size_bytes']
+    graph = nx.path_graph(3)
+    cache.render(up.javascript.network_d3, graph, formats='html')
+    cache.render(up.javascript.network_d3, graph, formats='html')
+    assert cache.stats['misses'] == 6
+    assert cache.stats['size_bytes'] == size_bytes
+    cache.clear()
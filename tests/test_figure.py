@@ -293,6 +293,25 @@ def test_export_html_plotly(my_outdir):
     up.config.load_defaults()
 
 
+def test_export_html_shared_assets_plotly(my_outdir):
+    dirpath = os.path.join(my_outdir, 'shared_assets_plotly')
+    asset_dirpath = os.path.join(dirpath, 'assets')
+    sizes = []
+    for i, method_name in enumerate(['bar', 'scatter']):
+        fig = getattr(up.plotly, method_name)(X, Y)
+        inline_filepath = fig.export_html(os.path.join(dirpath, 'inline_{}'.format(i)))
+        filepath = fig.export_html(os.path.join(dirpath, 'page_{}'.format(i)), assets='directory')
+        sizes.append((os.path.getsize(inline_filepath), os.path.getsize(filepath)))
+    asset_filenames = os.listdir(asset_dirpath)
+    assert len(asset_filenames) == 1
+    with open(filepath) as file_handle:
+        assert 'src="assets/{}"'.format(asset_filenames[0]) in file_handle.read()
+    for inline_size, size in sizes:
+        assert size < inline_size / 10
+    with pytest.raises(ValueError):
+        fig.export_html(filepath, assets='nonsense')
+
+
 def test_text_representations_plotly():
     fig = up.plotly.scatter_3d(X, Y, Z, dpi=100)
 
@@ -462,3 +481,167 @@ def test_set_size_memory(my_outdir):
         fig.set_size(height_mm=height_mm_3)
         check_size_and_resolution(
             filepath, fig, dpi_2, width_mm_1, height_mm_3, image_format)
+
+
+def test_output_cache():
+    representations = [
+        (up.matplotlib.scatter, 'svg_text', 'png_data_url'),
+        (up.plotly.scatter, 'json_text', 'html_text_cdn'),
+    ]
+    for func, name_1, name_2 in representations:
+        fig = func(X, Y)
+        # Repeated representations are served from the cache
+        text_1 = getattr(fig, name_1)
+        text_2 = getattr(fig, name_2)
+        assert len(fig._output_cache) == 2
+        assert getattr(fig, name_1) is text_1
+        assert getattr(fig, name_2) == text_2
+        assert len(fig._output_cache) == 2
+        # Invalidation by changing size or display format
+        fig.set_size(width_mm=WIDTH_MM_DEFAULT + 10)
+        assert len(fig._output_cache) == 0
+        assert getattr(fig, name_1) != text_1
+        fig.set_display_format('svg')
+        assert len(fig._output_cache) == 0
+        # Invalidation by modifying the wrapped figure object
+        text_1 = getattr(fig, name_1)
+        if isinstance(fig, up.matplotlib.Figure):
+            fig.fig.axes[0].set_title('Title')
+        else:
+            fig.fig.layout.title = 'Title'
+        assert getattr(fig, name_1) != text_1
+
+    # Invalidation by adding a figure
+    fig = up.plotly.scatter(X, Y)
+    json_text = fig.json_text
+    fig = fig + up.plotly.scatter(Y, X)
+    assert fig.json_text != json_text
+    json_text = fig.json_text
+    fig.fig.data[0].marker.size = 3
+    assert fig.json_text != json_text
+    json_text = fig.json_text
+    fig.fig.frames = [dict(data=[dict(y=X)])]
+    assert fig.json_text != json_text
+
+    # Limited size, disabled cache
+    try:
+        up.config.settings.output_cache_max_mb = 0.000001
+        fig = up.matplotlib.scatter(X, Y)
+        fig.svg_text
+        assert len(fig._output_cache) == 0
+        up.config.settings.output_cache_max_mb = 0
+        fig.png_data_url
+        assert len(fig._output_cache) == 0
+    finally:
+        up.config.load_defaults()
+
+
+def test_export_many_matplotlib(my_outdir):
+    fig = up.matplotlib.scatter(X, Y, width_mm=80, height_mm=60, dpi=100)
+    filepath = os.path.join(my_outdir, 'export_many')
+    targets = {fmt: filepath for fmt in ['png', 'jpg', 'tif', 'webp', 'pdf', 'svg']}
+    filepaths = fig.export_many(targets, thumbnail_filepath=filepath + '_thumbnail.jpg',
+                                thumbnail_max_px=64)
+    assert sorted(filepaths) == sorted(list(targets) + ['thumbnail'])
+    for fmt, used_filepath in filepaths.items():
+        assert os.path.isfile(used_filepath)
+        if fmt in ['png', 'jpg', 'tif', 'webp']:
+            assert used_filepath.endswith('.' + fmt)
+            img = pil_image.open(used_filepath)
+            assert img.width == int(80 / 25.4 * 100)
+            assert img.height == int(60 / 25.4 * 100)
+    thumbnail = pil_image.open(filepaths['thumbnail'])
+    assert thumbnail.format == 'JPEG'
+    assert max(thumbnail.size) == 64
+
+    # Same pixels as a separate export with savefig
+    with pil_image.open(filepaths['png']) as img_1:
+        with pil_image.open(fig.export_png(filepath + '_single')) as img_2:
+            assert list(img_1.getdata()) == list(img_2.getdata())
+
+    # The pixel buffer is cached until the figure is modified
+    assert len(fig._output_cache) == 1
+    fig.fig.axes[0].set_title('Title')
+    fig.export_many({'png': filepath})
+    with pil_image.open(filepaths['png']) as img:
+        assert list(img.getdata()) != list(pil_image.open(filepath + '_single.png').getdata())
+
+    with pytest.raises(ValueError):
+        fig.export_many({'nonsense': filepath})
+
+
+def test_export_pool_plotly(my_outdir):
+    figures = [up.plotly.scatter(X, Y, dpi=100), up.plotly.bar(X, Y, width_mm=50)]
+    filepaths = [os.path.join(my_outdir, 'pool_{}'.format(i)) for i in range(len(figures))]
+    with up.plotly.ExportPool(num_workers=2, timeout=120) as pool:
+        results = pool.export_batch(figures, ['png', 'svg'], filepaths)
+        # Workers are reused for the next batch
+        assert pool.export_batch(figures[:1], 'jpg', filepaths[:1])[0]['jpg'].endswith('.jpg')
+    # After closing, new workers are started for the next batch
+    try:
+        assert pool.export_batch(figures[1:], 'jpg', filepaths[1:])[0]['jpg'].endswith('.jpg')
+    finally:
+        pool.close()
+    assert len(results) == len(figures)
+    for fig, result in zip(figures, results):
+        assert sorted(result) == ['png', 'svg']
+        assert all(os.path.isfile(filepath) for filepath in result.values())
+        img = pil_image.open(result['png'])
+        assert img.width == int(fig.size.width_px * fig.size.dpi / 96.0)
+
+
+def test_export_pool_plotly_close(my_outdir):
+    # Stopped workers are not counted anymore, so a closed pool starts new ones when used again
+    pool = up.plotly.ExportPool(num_workers=1, timeout=120)
+    filepath = os.path.join(my_outdir, 'pool_close')
+    for _ in range(2):
+        try:
+            pool.export_batch([up.plotly.scatter(X, Y)], 'svg', [filepath])
+        except ValueError:
+            pass  # export failed, e.g. without renderer, but the worker was used nevertheless
+        pool.close()
+        assert pool._num_started_workers == 0
+
+
+def test_export_pool_plotly_invalid_arguments():
+    for kwargs in [dict(num_workers=0), dict(timeout=-1), dict(max_retries=-1)]:
+        with pytest.raises(ValueError):
+            up.plotly.ExportPool(**kwargs)
+    with up.plotly.ExportPool(num_workers=1) as pool:
+        fig = up.plotly.scatter(X, Y)
+        with pytest.raises(ValueError):
+            pool.export_batch([fig], ['nonsense'], ['filepath'])
+        with pytest.raises(ValueError):
+            pool.export_batch([fig, fig], ['png'], ['filepath'])
+        with pytest.raises(ValueError):
+            pool.export_batch([up.matplotlib.scatter(X, Y)], ['png'], ['filepath'])
+
+
+def test_concurrent_rendering_matplotlib(monkeypatch):
+    import gc
+    import weakref
+    from concurrent.futures import ThreadPoolExecutor
+
+    import matplotlib
+
+    def render(i):
+        fig = up.matplotlib.scatter(X, [val * i for val in Y], title='Plot {}'.format(i),
+                                    x_title='x', y_title='y', width_mm=60, height_mm=45, dpi=50)
+        return fig.png_data_url, fig.svg_text
+
+    # Threads produce exactly the same output as sequential rendering
+    monkeypatch.setenv('SOURCE_DATE_EPOCH', '0')  # SVG metadata contains the date otherwise
+    num_figures = 24
+    with matplotlib.rc_context({'svg.hashsalt': 'fixed'}):  # SVG ids are random otherwise
+        expected = [render(i) for i in range(num_figures)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for _ in range(3):
+                assert list(executor.map(render, range(num_figures))) == expected
+
+    # Figures are not registered in pyplot and are freed without closing them
+    fig = up.matplotlib.scatter(X, Y)
+    assert not hasattr(fig.fig.canvas, 'manager')
+    mpl_fig = weakref.ref(fig.fig)
+    del fig
+    gc.collect()
+    assert mpl_fig() is None
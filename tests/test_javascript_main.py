@@ -266,6 +266,34 @@ def test_network_format_single_graph(my_outdir):
     export_all_available_formats(fig, filepath)
 
 
+def test_network_format_networkx_conversion():
+    import networkx as nx
+
+    graph = nx.MultiDiGraph(label='Multi', background_color='gray')
+    graph.add_node('a', label='A', size=20)
+    graph.add_node(1, color=None)
+    graph.add_edge('a', 1, id='e1', size=3)
+    graph.add_edge('a', 1, label='parallel')
+    graph_copy = deepcopy(graph)
+
+    data = format_conversion.networkx_to_jgf(graph)['graph']
+    assert data['directed'] is True
+    assert data['label'] == 'Multi'
+    assert data['metadata'] == {'background_color': 'gray'}
+    assert data['nodes'] == [
+        {'id': 'a', 'label': 'A', 'metadata': {'size': 20}},
+        {'id': '1', 'metadata': {'color': None}},
+    ]
+    assert data['edges'] == [
+        {'source': 'a', 'target': '1', 'id': 'e1', 'metadata': {'size': 3}},
+        {'source': 'a', 'target': '1', 'label': 'parallel'},
+    ]
+    # No side effects on the graph
+    assert graph.graph == graph_copy.graph
+    assert list(graph.nodes(data=True)) == list(graph_copy.nodes(data=True))
+    assert list(graph.edges(data=True)) == list(graph_copy.edges(data=True))
+
+
 def test_network_format_multiple_jgf(my_outdir):
     multiple_jgf = {
         'graphs': [
@@ -383,6 +411,95 @@ def test_network_format_multiple_graph_and_jgf(my_outdir):
     export_all_available_formats(fig, filepath)
 
 
+def test_network_format_columnar(my_outdir):
+    from base64 import b64decode
+
+    import numpy as np
+    import scipy.sparse
+    from unified_plotting._unified_arguments import shared_preprocessing
+    from unified_plotting.javascript import _plots_network
+
+    edges_df = pd.DataFrame({
+        'source': ['a', 'b', 'c', 'a'],
+        'target': ['b', 'c', 'a', 'd'],
+        'label': ['ab', 'bc', None, 'ad'],
+        'size': [1.0, 2.0, np.nan, 4.0],
+    })
+    nodes_df = pd.DataFrame({'id': ['c', 'b', 'a'], 'color': ['red', 'green', 'blue']})
+    matrix = scipy.sparse.csr_matrix(np.array([[0, 1, 0], [1, 0, 2], [0, 2, 0]]))
+
+    # Conversion to columnar graphs without per-item objects
+    graph = format_conversion.edges_to_columnar_graph(edges_df)['graph']
+    assert graph['node_columns']['id'].tolist() == ['a', 'b', 'c', 'd']
+    assert graph['edge_columns']['source'].tolist() == [0, 1, 2, 0]
+    assert graph['edge_columns']['target'].tolist() == [1, 2, 0, 3]
+    graph = format_conversion.edges_to_columnar_graph(
+        edges_df, nodes_df, directed=True, metadata={'label': 'Tables'})['graph']
+    assert graph['directed'] is True
+    assert graph['label'] == 'Tables'
+    assert graph['edge_columns']['source'].tolist() == [2, 1, 0]  # edge to "d" removed
+    assert graph['edge_columns']['label'].tolist() == ['ab', 'bc', None]
+    graph = format_conversion.sparse_matrix_to_columnar_graph(matrix)['graph']
+    assert graph['directed'] is False
+    assert graph['edge_columns']['weight'].tolist() == [1, 2]
+    graph = format_conversion.sparse_matrix_to_columnar_graph(scipy.sparse.eye(3, k=1))['graph']
+    assert graph['directed'] is True
+    graph = format_conversion.sparse_matrix_to_columnar_graph(
+        scipy.sparse.eye(3, k=-1), directed=False)['graph']
+    assert graph['edge_columns']['source'].tolist() == [0, 1]
+    assert graph['edge_columns']['target'].tolist() == [1, 2]
+    graph = format_conversion.sparse_matrix_to_columnar_graph(
+        scipy.sparse.csr_matrix(np.array([[0, 1, 0], [3, 0, 0], [5, 2, 0]])),
+        directed=False)['graph']
+    assert graph['edge_columns']['source'].tolist() == [0, 0, 1]
+    assert graph['edge_columns']['target'].tolist() == [1, 2, 2]
+    assert graph['edge_columns']['weight'].tolist() == [1, 5, 2]
+
+    # DataFrames are detected by their interface, not by the module path of their type
+    class EdgeFrame(pd.DataFrame):
+        pass
+
+    assert shared_preprocessing._is_columnar_graph_data(EdgeFrame(edges_df))
+
+    # Compact encoding for embedding in the templates
+    encoded = _plots_network._encode_columnar_graphs(
+        shared_preprocessing.prepare_graph_data(edges_df))[0]
+    ids = encoded['node_columns']['id']
+    assert ids['type'] == 'category'
+    codes = np.frombuffer(b64decode(ids['codes']), dtype='<i4')
+    assert [ids['categories'][code] for code in codes] == ['a', 'b', 'c', 'd']
+    assert encoded['edge_columns']['source']['type'] == 'int32'
+    sizes = np.frombuffer(b64decode(encoded['edge_columns']['size']['values']), dtype='<f8')
+    assert np.isnan(sizes[2])
+
+    # All forms of columnar data, also mixed with JGF
+    data = [
+        edges_df,
+        {'source': np.array([1, 2, 3]), 'target': np.array([2, 3, 1]), 'size': [1, 2, 3]},
+        {'edges': edges_df, 'nodes': nodes_df, 'directed': True,
+         'metadata': {'label': 'Tables', 'node_color': 'gray'}},
+        matrix,
+        {'edges': matrix, 'nodes': {'label': ['x', 'y', 'z']}},
+        TESTDATA_JGF['directed attributed'],
+    ]
+    for plot_function in [up.javascript.network_d3, up.javascript.network_vis,
+                          up.javascript.network_webgl]:
+        assert 'node_columns' in plot_function(edges_df).html_text
+        fig = plot_function(data)
+        filepath = create_output_filepath(
+            my_outdir, 'network_format_columnar_{}'.format(plot_function.__name__))
+        export_all_available_formats(fig, filepath)
+
+    with pytest.raises(ValueError):
+        up.javascript.network_d3({'source': [1, 2], 'target': [2]})
+    with pytest.raises(ValueError):
+        up.javascript.network_d3({'edges': {'source': [1, 2]}})
+    with pytest.raises(ValueError):
+        up.javascript.network_d3({'edges': edges_df, 'nodes': {'name': ['a']}})
+    with pytest.raises(ValueError):
+        up.javascript.network_d3(scipy.sparse.csr_matrix(np.ones((2, 3))))
+
+
 def test_network_format_fail_on_invalid_data():
     def d3_fails(data):
         with pytest.raises(ValueError):
@@ -425,6 +542,432 @@ def test_network_format_fail_on_invalid_data():
         webgl_fails(data)
 
 
+def test_network_layout_precomputation(my_outdir):
+    from functools import partial
+
+    import numpy as np
+    from unified_plotting._unified_arguments import shared_preprocessing
+    from unified_plotting.javascript import _network_layout, _plots_network
+
+    jgf = {
+        'nodes': [{'id': i} for i in range(30)] + [{'id': 0, 'label': 'repeated'}],
+        'edges': [{'source': i, 'target': (i + 1) % 30} for i in range(30)]
+        + [{'source': 0, 'target': 'unknown'}],
+    }
+    jgf['nodes'][0]['metadata'] = {'x': 500, 'y': '-20.5', 'size': 5}
+    jgf_copy = deepcopy(jgf)
+    placed_jgf = {'metadata': {'node_x': 0}, 'nodes': [{'id': 0}], 'edges': []}
+    edges_df = pd.DataFrame({'source': range(100), 'target': [0] * 100})
+    data = [{'graph': jgf}, {'graph': placed_jgf}, edges_df]
+
+    for plot_function, axes in [(up.javascript.network_d3, 'xy'),
+                                (up.javascript.network_vis, 'xy'),
+                                (up.javascript.network_webgl, 'xyz')]:
+        fig = plot_function(data, layout_precomputation='barnes_hut')
+        assert 'layoutPrecomputed = true' in fig.html_text
+        filepath = create_output_filepath(
+            my_outdir, 'network_layout_precomputation_{}'.format(plot_function.__name__))
+        export_all_available_formats(fig, filepath)
+        assert 'layoutPrecomputed = false' in plot_function(data).html_text
+    assert jgf == jgf_copy
+
+    # Positions as fixed coordinates of the nodes, given ones are kept
+    graphs = _plots_network._precompute_layouts(
+        shared_preprocessing.prepare_graph_data(data), 'barnes_hut', 2, 50.0,
+        _network_layout.d3_force_layout)
+    nodes = graphs[0]['nodes']
+    assert nodes[0]['metadata'] == {'x': 500.0, 'y': -20.5, 'size': 5}
+    assert nodes[-1] == {'id': 0, 'label': 'repeated'}
+    positions = np.array([[node['metadata']['x'], node['metadata']['y']] for node in nodes[:30]])
+    lengths = np.sqrt(((positions - np.roll(positions, 1, axis=0)) ** 2).sum(axis=1))
+    assert 10.0 < np.median(lengths) < 100.0
+    assert graphs[1] == placed_jgf
+    columns = graphs[2]['node_columns']
+    assert len(columns['x']) == len(columns['y']) == 100
+    assert not np.isnan(columns['x']).any()
+
+    # Unknown values and missing graph libraries
+    with pytest.raises(ValueError):
+        up.javascript.network_d3(data, layout_precomputation='nonsense')
+    graphs = _plots_network._precompute_layouts(
+        [jgf], 'graph_tool', 3, 100.0, partial(_network_layout.d3_force_layout, num_dimensions=3))
+    assert set(graphs[0]['nodes'][1]['metadata']) == {'x', 'y', 'z'}
+
+
+def test_network_coarsening(my_outdir):
+    import json
+
+    import numpy as np
+    from unified_plotting.javascript import _network_coarsening
+
+    # Planted partition: 8 dense groups of 50 nodes with few edges between them
+    rng = np.random.RandomState(1)
+    groups = np.arange(400) // 50
+    sources, targets = rng.randint(0, 400, size=(2, 20000))
+    keep = (groups[sources] == groups[targets]) | (rng.random_sample(20000) < 0.002)
+    sources, targets = sources[keep], targets[keep]
+    labels, num_groups = _network_coarsening.partition(400, sources, targets, 20)
+    assert num_groups <= 20
+    assert num_groups >= 8
+    for label in range(num_groups):
+        assert len(set(groups[labels == label])) == 1
+    lower, upper, weights = _network_coarsening.aggregate_edges(labels, sources, targets)
+    assert (lower < upper).all()
+    assert weights.sum() == (labels[sources] != labels[targets]).sum()
+
+    # Isolated nodes and a star also lead to few groups
+    for sources, targets in [([], []), ([0] * 999, range(1, 1000))]:
+        sources, targets = np.array(sources, dtype=int), np.array(targets, dtype=int)
+        labels, num_groups = _network_coarsening.partition(1000, sources, targets, 10)
+        assert 2 <= num_groups <= 10
+        assert labels.max() < num_groups
+
+    # Sparse fragmented graph: groups follow the edges, so that a group with nodes of several
+    # components is a union of whole components
+    import scipy.sparse
+    import scipy.sparse.csgraph
+    sources, targets = rng.randint(0, 2000, size=(2, 1200))
+    labels, num_groups = _network_coarsening.partition(2000, sources, targets, 20)
+    assert num_groups <= 20
+    adjacency = scipy.sparse.csr_matrix(
+        (np.ones(len(sources)), (sources, targets)), shape=(2000, 2000))
+    _, components = scipy.sparse.csgraph.connected_components(adjacency, directed=False)
+    for label in range(num_groups):
+        nodes = np.flatnonzero(labels == label)
+        num_parts, _ = scipy.sparse.csgraph.connected_components(
+            adjacency[nodes][:, nodes], directed=False)
+        if num_parts > 1:
+            assert np.isin(np.flatnonzero(np.isin(components, components[nodes])), nodes).all()
+
+    # Plot with nested communities
+    jgf = {
+        'label': 'Chain',
+        'nodes': [{'id': i, 'label': 'Node {}'.format(i)} for i in range(300)],
+        'edges': [{'source': i, 'target': i + 1} for i in range(299)],
+    }
+    edges_df = pd.DataFrame({'source': range(1, 200), 'target': [0] * 199})
+    data = [{'graph': jgf}, edges_df, {'graph': {'nodes': [{'id': 'a'}], 'edges': []}}]
+    fig = up.javascript.network_d3(data, coarsening_threshold=10)
+    filepath = create_output_filepath(my_outdir, 'network_coarsening')
+    export_all_available_formats(fig, filepath)
+    from unified_plotting._unified_arguments import shared_preprocessing
+    from unified_plotting.javascript import _plots_network
+    graphs = _plots_network._coarsen_graphs(
+        shared_preprocessing.prepare_graph_data(data), 10, lambda graphs: graphs)
+    chain, star, single = graphs
+    assert single == data[2]['graph']
+    for coarse_graph in (chain, star):
+        assert 2 <= len(coarse_graph['nodes']) <= 10
+        assert set(coarse_graph['subgraphs']) == {node['id'] for node in coarse_graph['nodes']}
+        members = [node['metadata']['members'] for node in coarse_graph['nodes']]
+        assert sum(members) in (300, 200)
+    subgraph = json.loads(chain['subgraphs']['community 1'])
+    assert subgraph['label'].startswith('Chain > Node ')
+    assert 'subgraphs' in subgraph  # 300 nodes in at most 10 groups need another level
+    assert len(subgraph['nodes']) <= 10
+    assert 'subgraphs' not in json.loads(next(iter(subgraph['subgraphs'].values())))
+
+    graphs = _plots_network._coarsen_graphs(
+        shared_preprocessing.prepare_graph_data(data), np.int64(10), lambda graphs: graphs)
+    assert 'subgraphs' in graphs[0]
+    with pytest.raises(ValueError):
+        up.javascript.network_d3(data, coarsening_threshold=1)
+    with pytest.raises(ValueError):
+        up.javascript.network_d3(data, coarsening_threshold=True)
+
+
+def test_network_edge_sparsification(my_outdir):
+    import numpy as np
+    from unified_plotting.javascript import _network_sparsification
+
+    # Filters on arrays
+    sources = np.array([0, 0, 0, 1, 2, 3])
+    targets = np.array([1, 2, 3, 2, 3, 4])
+    weights = np.array([5.0, 1.0, 1.0, 2.0, 7.0, 1.0])
+    assert _network_sparsification.strongest_edges(weights, 2).tolist() == [
+        True, False, False, False, True, False]
+    assert _network_sparsification.strongest_edges_per_node(
+        5, sources, targets, weights, 1).tolist() == [True, False, False, False, True, True]
+    assert not _network_sparsification.disparity_backbone(
+        5, sources, targets, weights, 0.0).any()
+    assert _network_sparsification.disparity_backbone(
+        5, sources, targets, weights, 1.0).all()
+    # Star with one heavy edge among many light ones
+    sources = np.zeros(50, dtype=int)
+    targets = np.arange(1, 51)
+    weights = np.ones(50)
+    weights[7] = 100.0
+    for directed in (False, True):
+        is_kept = _network_sparsification.disparity_backbone(
+            51, sources, targets, weights, 0.05, directed)
+        assert np.flatnonzero(is_kept).tolist() == [7]
+
+    # Plots with JGF and columnar data
+    rng = np.random.RandomState(0)
+    sources, targets = np.triu_indices(40, 1)
+    similarities = rng.random_sample(len(sources))
+    jgf = {
+        'nodes': [{'id': i} for i in range(40)],
+        'edges': [{'source': int(s), 'target': int(t), 'metadata': {'weight': float(w)}}
+                  for s, t, w in zip(sources, targets, similarities)],
+    }
+    edges_df = pd.DataFrame({'source': sources, 'target': targets, 'similarity': similarities})
+    data = [{'graph': jgf}, edges_df]
+    for plot_function in (up.javascript.network_d3, up.javascript.network_vis,
+                          up.javascript.network_webgl):
+        fig = plot_function(data, max_edges=100, max_edges_per_node=5,
+                            backbone_significance=0.5)
+        filepath = create_output_filepath(
+            my_outdir, 'network_edge_sparsification_{}'.format(plot_function.__name__))
+        export_all_available_formats(fig, filepath)
+    from unified_plotting._unified_arguments import shared_preprocessing
+    from unified_plotting.javascript import _plots_network
+    graphs = shared_preprocessing.prepare_graph_data(data)
+    jgf_graph, columnar_graph = _plots_network._sparsify_graphs(graphs, 'weight', 30, 3, None)
+    kept_weights = sorted(edge['metadata']['weight'] for edge in jgf_graph['edges'])
+    assert kept_weights == sorted(similarities)[-30:]
+    assert len(jgf_graph['nodes']) == 40
+    assert len(columnar_graph['edge_columns']['source']) == 30  # no weights, ties by order
+    assert columnar_graph['edge_columns']['target'].tolist() == targets[:30].tolist()
+    jgf_graph, columnar_graph = _plots_network._sparsify_graphs(
+        graphs, 'similarity', None, 2, None)
+    assert 40 <= len(jgf_graph['edges']) <= 80  # all weights 1
+    assert 40 <= len(columnar_graph['edge_columns']['similarity']) <= 80
+    assert _plots_network._sparsify_graphs(graphs, 'weight', None, None, None) is graphs
+    jgf_graph, _ = _plots_network._sparsify_graphs(
+        graphs, 'weight', np.int64(30), np.int32(3), None)  # numpy integers are accepted
+    assert len(jgf_graph['edges']) == 30
+
+    for kwargs in [dict(max_edges=-1), dict(max_edges_per_node=2.5),
+                   dict(backbone_significance=2.0)]:
+        with pytest.raises(ValueError):
+            up.javascript.network_vis(data, **kwargs)
+
+
+def test_network_payload_optimization(my_outdir):
+    import numpy as np
+    from unified_plotting._unified_arguments import shared_preprocessing
+    from unified_plotting.javascript import _plots_network
+
+    jgf = {
+        'label': 'Attributes',
+        'directed': True,
+        'nodes': [{'id': i, 'label': 'Node {}'.format(i), 'metadata': {
+            'color': ['red', 'blue'][i % 2], 'size': i + 0.5, 'rank': i,
+            'description': 'Text that is not shown in the plot. ' * 5}} for i in range(50)]
+        + [{'id': 0, 'label': 'repeated'}, {'id': 'a'}],
+        'edges': [{'source': i, 'target': (i + 1) % 50, 'label': 'e{}'.format(i),
+                   'metadata': {'kind': ['x', 'y'][i % 2], 'weight': i}} for i in range(50)]
+        + [{'source': 0, 'target': 'unknown'}],
+    }
+    jgf['nodes'][3]['metadata']['rank'] = None
+    edges_df = pd.DataFrame({'source': range(20), 'target': [0] * 20, 'kind': ['x'] * 20,
+                             'unused': range(20)})
+    data = [{'graph': jgf}, edges_df]
+    for plot_function in (up.javascript.network_d3, up.javascript.network_vis,
+                          up.javascript.network_webgl):
+        fig = plot_function(data, payload_optimization=True, node_size_data_source='rank',
+                            edge_label_data_source='kind')
+        filepath = create_output_filepath(
+            my_outdir, 'network_payload_optimization_{}'.format(plot_function.__name__))
+        export_all_available_formats(fig, filepath)
+        assert 'not shown in the plot' not in fig.html_text
+        assert len(fig.html_text) < len(plot_function(data).html_text)
+
+    graphs = _plots_network._optimize_payloads(
+        shared_preprocessing.prepare_graph_data(data), True, ['rank', 'id'], ['kind', 'id'])
+    graph, columnar_graph = graphs
+    assert graph['label'] == 'Attributes' and graph['directed'] is True
+    node_columns = graph['node_columns']
+    assert set(node_columns) == {'id', 'label', 'color', 'size', 'rank'}
+    assert node_columns['id'].tolist() == list(range(50)) + ['a']
+    assert node_columns['label'].tolist() == ['Node {}'.format(i) for i in range(50)] + [None]
+    assert node_columns['size'].dtype == float and np.isnan(node_columns['size'][-1])
+    assert np.isnan(node_columns['rank'][3])
+    edge_columns = graph['edge_columns']
+    assert set(edge_columns) == {'source', 'target', 'label', 'kind'}
+    assert edge_columns['target'].tolist() == [(i + 1) % 50 for i in range(50)]
+    assert set(columnar_graph['edge_columns']) == {'source', 'target', 'kind'}
+    assert _plots_network._optimize_payloads(graphs, False, [], []) is graphs
+
+
+def test_network_node_image_deduplication(my_outdir):
+    import base64 as stdlib_base64
+    import io
+    import json
+
+    import numpy as np
+    from PIL import Image
+    from unified_plotting.javascript import _network_images, _plots_network
+
+    buffer = io.BytesIO()
+    pixels = np.random.RandomState(0).randint(0, 256, size=(300, 200, 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(buffer, format='PNG')
+    png_url = base64.base64_text_to_data_url(
+        base64.binary_data_to_base64_text(buffer.getvalue()), 'png')
+    svg_url = 'data:image/svg+xml;base64,' + base64.text_to_base64_text(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"></svg>')
+    jgf = {
+        'nodes': [{'id': i, 'metadata': {'image': [png_url, svg_url][i % 2], 'size': 20}}
+                  for i in range(100)] + [{'id': 'no image'}],
+        'edges': [{'source': i, 'target': i + 1} for i in range(100)],
+    }
+    jgf_copy = deepcopy(jgf)
+    edges_df = pd.DataFrame({'source': range(20), 'target': [0] * 20})
+    data = [{'graph': jgf}, edges_df]
+    for plot_function in (up.javascript.network_d3, up.javascript.network_vis,
+                          up.javascript.network_webgl):
+        fig = plot_function(data, show_node_image=True)
+        assert fig.html_text.count(png_url) == 1
+        downscaled_fig = plot_function(data, show_node_image=True, node_image_downscaling=True)
+        assert len(downscaled_fig.html_text) < len(fig.html_text) - len(png_url) / 2
+        filepath = create_output_filepath(
+            my_outdir, 'network_node_image_deduplication_{}'.format(plot_function.__name__))
+        export_all_available_formats(downscaled_fig, filepath)
+    assert jgf == jgf_copy
+
+    # Image table and node references
+    graph, columnar_graph = _plots_network._deduplicate_node_images(
+        [jgf, {'node_columns': {'id': np.arange(3), 'image': [png_url, None, png_url]},
+               'metadata': {'node_image': png_url}}], True, 'size', None, 1.5)
+    assert graph['node_images'][1] == svg_url
+    assert [node['metadata']['image'] for node in graph['nodes'][:4]] == [0, 1, 0, 1]
+    assert 'metadata' not in graph['nodes'][-1]
+    image = Image.open(io.BytesIO(stdlib_base64.b64decode(graph['node_images'][0].split(',')[1])))
+    assert image.size == (40, 60)  # twice node size 20 times factor 1.5, aspect ratio kept
+    images = columnar_graph['node_columns']['image']
+    assert images[0] == images[2] == columnar_graph['metadata']['node_image'] != png_url
+    assert images[1] is None
+    graph = _plots_network._deduplicate_node_images([jgf], False, 'size', None, 1.0)[0]
+    assert graph['node_images'] == [png_url, svg_url]
+    assert json.loads(_plots_network._template_system.to_json(graph))['nodes'][2] == {
+        'id': 2, 'metadata': {'image': 0, 'size': 20}}
+
+    # Images that are not reduced
+    assert _network_images.downscale_data_url(png_url, 500) == png_url
+    assert _network_images.downscale_data_url(svg_url, 5) == svg_url
+    assert _network_images.downscale_data_url('https://example.org/a.png', 5) == (
+        'https://example.org/a.png')
+    assert _network_images.downscale_data_url('data:image/png;base64,broken', 5) == (
+        'data:image/png;base64,broken')
+
+
+def test_network_lazy_loading(my_outdir):
+    import json
+
+    from unified_plotting.javascript import _template_system
+
+    jgf = {'label': 'First', 'nodes': [{'id': i} for i in range(50)],
+           'edges': [{'source': i, 'target': i + 1} for i in range(49)]}
+    edges_df = pd.DataFrame({'source': range(20), 'target': [0] * 20})
+    json_text = json.dumps(dict(jgf, label='Third'))
+    data = [{'graph': jgf}, edges_df, json_text]
+    for plot_function in (up.javascript.network_d3, up.javascript.network_vis,
+                          up.javascript.network_webgl):
+        for compression in (False, True):
+            fig = plot_function(data, lazy_loading=True, data_compression=compression)
+            html = fig.html_text
+            assert html.count('"compressed":"' if compression else '"text":"{') == 3
+            assert '{"label":"First","' in html and '{"label":"Third","' in html
+            filepath = create_output_filepath(
+                my_outdir, 'network_lazy_loading_{}_{}'.format(
+                    plot_function.__name__, compression))
+            export_all_available_formats(fig, filepath)
+        fig = plot_function({'graphs': [jgf, jgf]}, lazy_loading=True)
+        assert fig.html_text.count('"text":"{') == 2
+        assert plot_function(data).html_text.count('"text":"{') == 0
+        with pytest.raises(ValueError):
+            plot_function(data, lazy_loading=True, max_edges=-1)
+
+    # Items are only created while the stream is written
+    calls = []
+
+    def load_item(number):
+        calls.append(number)
+        return {'label': str(number), 'values': [number] * 3}
+
+    stream = _template_system.LazyItemStream(
+        [lambda number=number: load_item(number) for number in range(3)])
+    assert calls == []
+    entries = json.loads(str(stream))
+    assert calls == [0, 1, 2]
+    assert [entry['label'] for entry in entries] == ['0', '1', '2']
+    assert json.loads(entries[2]['text']) == {'label': '2', 'values': [2, 2, 2]}
+    str(stream)
+    assert calls == [0, 1, 2] * 2
+
+    # Compressed items are created once and reused for further writes
+    calls.clear()
+    stream = _template_system.LazyItemStream(
+        [lambda number=number: load_item(number) for number in range(3)], compress=True)
+    text = str(stream)
+    assert str(stream) == text
+    assert calls == [0, 1, 2]
+    assert [entry['label'] for entry in json.loads(text)] == ['0', '1', '2']
+
+
+def test_network_graph_metrics(my_outdir):
+    import numpy as np
+    from unified_plotting.javascript import _network_metrics, _plots_network
+
+    # Star around node 0 whose leaf 4 is part of the triangle 4, 5, 6
+    edges = [(0, 1), (0, 2), (0, 3), (0, 4), (4, 5), (5, 6), (6, 4)]
+    jgf = {'nodes': [{'id': i} for i in range(7)],
+           'edges': [{'source': source, 'target': target} for source, target in edges]}
+    edges_df = pd.DataFrame(edges, columns=['source', 'target'])
+    for plot_function in (up.javascript.network_d3, up.javascript.network_vis,
+                          up.javascript.network_webgl):
+        for metric in _network_metrics.NODE_METRICS:
+            fig = plot_function([{'graph': jgf}, edges_df], node_size_data_source=metric,
+                                edge_size_data_source='betweenness_approx',
+                                use_node_size_normalization=True)
+            assert '"{}"'.format(metric) in fig.html_text
+        filepath = create_output_filepath(
+            my_outdir, 'network_graph_metrics_{}'.format(plot_function.__name__))
+        export_all_available_formats(fig, filepath)
+
+    def node_values(graph, name):
+        return [node['metadata'][name] for node in graph['nodes']]
+
+    expected = {
+        'degree': [4, 1, 1, 1, 3, 2, 2],
+        'core_number': [1, 1, 1, 1, 2, 2, 2],
+        'betweenness_approx': [12, 0, 0, 0, 8, 0, 0],
+    }
+    for name, values in expected.items():
+        graph = _plots_network._add_graph_metrics([jgf], name, None, 'weight')[0]
+        assert node_values(graph, name) == values
+    graph = _plots_network._add_graph_metrics([jgf], 'pagerank', None, 'weight')[0]
+    ranks = node_values(graph, 'pagerank')
+    assert abs(sum(ranks) - 1.0) < 1e-3 and max(ranks) == ranks[0]
+    graph = _plots_network._add_graph_metrics(
+        [dict(jgf, directed=True)], 'in_degree', None, 'weight')[0]
+    assert node_values(graph, 'in_degree') == [0, 1, 1, 1, 2, 1, 1]
+    graph = _plots_network._add_graph_metrics([jgf], None, 'betweenness_approx', 'weight')[0]
+    assert [edge['metadata']['betweenness_approx'] for edge in graph['edges']] == [
+        6, 6, 6, 12, 5, 1, 5]
+    assert 'metadata' not in jgf['nodes'][0]
+
+    # Columnar graphs and properties in the data
+    columnar_graph = up.utilities.format_conversion.edges_to_columnar_graph(edges_df)['graph']
+    graph = _plots_network._add_graph_metrics(
+        [columnar_graph], 'core_number', 'betweenness_approx', 'weight')[0]
+    node_ids = graph['node_columns']['id'].tolist()
+    cores = graph['node_columns']['core_number'].tolist()
+    assert [cores[node_ids.index(i)] for i in range(7)] == [1, 1, 1, 1, 2, 2, 2]
+    assert graph['edge_columns']['betweenness_approx'].tolist() == [6, 6, 6, 12, 5, 1, 5]
+    given_graph = dict(jgf, nodes=[{'id': i, 'metadata': {'degree': -1}} for i in range(7)])
+    graph = _plots_network._add_graph_metrics([given_graph], 'degree', None, 'weight')[0]
+    assert node_values(graph, 'degree') == [-1] * 7
+
+    # Sampled betweenness approximates the exact values
+    rng = np.random.RandomState(0)
+    sources, targets = rng.randint(0, 300, 1500), rng.randint(0, 300, 1500)
+    exact = _network_metrics.betweenness_approx(300, sources, targets, num_samples=300)[0]
+    approx = _network_metrics.betweenness_approx(300, sources, targets, num_samples=50)[0]
+    assert np.corrcoef(exact, approx)[0, 1] > 0.8
+
+
 @pytest.mark.only_with_graph_libraries
 def test_network_library_conversion_and_result_equivalence(my_outdir):
     if TESTDATA_GRAPH_TOOL is None:
@@ -1475,3 +2018,219 @@ def test_image_viewer_svg(my_outdir):
     name = 'image_viewer_svg'
     out_filepath = create_output_filepath(my_outdir, name)
     export_all_available_formats(fig, out_filepath)
+
+
+# Template system
+
+def test_template_system_insert_and_render():
+    from unified_plotting.javascript import _template_system
+
+    template = _template_system.Template('<§A§|§B§|§A§|§C§>')
+    assert template.keys == ['A', 'B', 'A', 'C']
+    partial = _template_system.insert(template, {'A': 'a', 'C': '§B§'})
+    assert partial.keys == ['B']
+    assert partial.render({'B': 'b'}) == '<a|b|a|§B§>'
+    assert partial.render() == '<a|§B§|a|§B§>'
+    assert str(template) == '<§A§|§B§|§A§|§C§>'
+
+    # Templates and assets are parsed and read only once per process
+    path = 'templates/table_slickgrid.html'
+    assert _template_system.load_template(path) is _template_system.load_template(path)
+    path = 'third_party/require/require.min.js'
+    assert _template_system.load(path) is _template_system.load(path)
+
+
+def test_template_system_json_backends_and_streaming(my_outdir):
+    import json
+
+    import numpy as np
+    from unified_plotting.javascript import _template_system
+
+    data = {
+        'nodes': {str(i): {'metadata': {'x': np.float64(i / 3), 'n': np.int32(i)}}
+                  for i in range(30)},
+        'edges': [{'source': str(i), 'target': str(i+1), 'w': np.arange(3)} for i in range(29)],
+        'array': np.arange(25) / 7,
+        'strided': np.arange(12).reshape(3, 4)[:, ::2],
+        1: np.bool_(True),
+    }
+    expected = json.loads(_template_system.to_json(data, backend='stdlib'))
+    backends = ['auto', 'stdlib']
+    if _template_system._orjson is not None:
+        backends.append('orjson')
+    for backend in backends:
+        assert json.loads(_template_system.to_json(data, backend=backend)) == expected
+        stream = _template_system.JsonStream(data, backend=backend, chunk_size=7)
+        assert json.loads(str(stream)) == expected
+    with pytest.raises(ValueError):
+        _template_system.to_json(data, backend='nonsense')
+
+    # Non-finite floats are JavaScript literals or null with every backend
+    data = {'a': [1.0, float('nan'), None], 'b': np.array([np.inf, -np.inf]),
+            'c': np.float32('nan')}
+    for backend in backends:
+        assert _template_system.to_json(data, backend=backend) == (
+            '{"a": [1.0, NaN, null], "b": [Infinity, -Infinity], "c": NaN}')
+        assert json.loads(_template_system.to_json(data, backend=backend, allow_nan=False)) == {
+            'a': [1.0, None, None], 'b': [None, None], 'c': None}
+
+    # Float precision
+    data = {'a': [0.123456789, np.float32(1.23456)], 'b': np.array([1/3, 2/3]), 'c': 7}
+    for backend in backends:
+        text = _template_system.to_json(data, precision=3, backend=backend)
+        assert json.loads(text) == {'a': [0.123, 1.235], 'b': [0.333, 0.667], 'c': 7}
+
+    # Streaming mode writes the payload directly into the exported document
+    jgf = {'graph': {'nodes': {str(i): {} for i in range(50)},
+                     'edges': [{'source': str(i), 'target': str(i+1)} for i in range(49)]}}
+    try:
+        up.config.settings.json_streaming = True
+        fig = up.javascript.network_d3(jgf)
+        filepath = create_output_filepath(my_outdir, 'network_d3_streamed')
+        filepath = fig.export_html(filepath)
+    finally:
+        up.config.load_defaults()
+    with open(filepath, encoding='utf-8') as file_handle:
+        html_text = file_handle.read()
+    assert '§' not in html_text
+    assert len(html_text) == len(fig.html_text)
+
+
+def test_data_compression(my_outdir):
+    import json
+    import re
+    import zlib
+    from base64 import b64decode
+
+    from unified_plotting.javascript import _template_system
+
+    def decompress(html_text):
+        encoded = re.search('compressed: "([^"]*)"', html_text).group(1)
+        return json.loads(zlib.decompress(b64decode(encoded)).decode('utf-8'))
+
+    jgf = {'graph': {'nodes': {str(i): {'metadata': {'size': i / 3}} for i in range(40)},
+                     'edges': [{'source': str(i), 'target': str(i+1)} for i in range(39)]}}
+    figures = [
+        ('network_d3', up.javascript.network_d3, jgf),
+        ('network_vis', up.javascript.network_vis, jgf),
+        ('network_webgl', up.javascript.network_webgl, jgf),
+        ('pc_table', up.javascript.parallel_coordinates_table, [[1.0, 2.0], [3, 4]]),
+        ('table', up.javascript.table, [[1.0, 2.0], ['a', 'b']]),
+    ]
+    payload_module = _template_system.load_asset('shared/payload.def.js')
+    for name, func, data in figures:
+        fig_plain = func(data)
+        fig = func(data, data_compression=True)
+        assert 'compressed: null' in fig_plain.html_text
+        # Decompression is shared by all plots and has a fallback without DecompressionStream
+        assert payload_module in fig._html_template.assets
+        assert 'function inflate(' in fig.html_text
+        expected = json.loads(re.search(
+            r'JSON\.parse\(payload\.text\) : (.*?)\)?;\n', fig_plain.html_text).group(1))
+        assert decompress(fig.html_text) == expected
+        # Streaming mode produces the same compressed payload
+        try:
+            up.config.settings.json_streaming = True
+            filepath = create_output_filepath(my_outdir, name + '_compressed')
+            filepath = func(data, data_compression=True).export_html(filepath)
+        finally:
+            up.config.load_defaults()
+        with open(filepath, encoding='utf-8') as file_handle:
+            assert decompress(file_handle.read()) == expected
+
+
+def test_table_column_wise_data():
+    import json
+    import re
+    from base64 import b64decode
+
+    import numpy as np
+    from unified_plotting.javascript import _plots_nd
+
+    data = [[1, 2.5, np.float32(3.0)], ['b', 'a', 'b'], [1, 'x', True]]
+    names = ['num', 'str', 'mixed']
+    converted = _plots_nd._convert_data_for_table(data, names)
+    assert converted['num_rows'] == 3
+    num, string, mixed = converted['columns']
+    assert [col['name'] for col in converted['columns']] == names
+    assert num['type'] == 'float64'
+    values = np.frombuffer(b64decode(num['values']), dtype='<f8')
+    assert values.tolist() == [1.0, 2.5, 3.0]
+    assert string['type'] == 'category'
+    assert string['categories'] == ['b', 'a']
+    codes = np.frombuffer(b64decode(string['codes']), dtype='<i4')
+    assert [string['categories'][code] for code in codes] == ['b', 'a', 'b']
+    assert mixed['type'] == 'list'
+    assert mixed['values'] == [1, 'x', True]
+
+    # Arrays are typed by their dtype, single precision stays single precision
+    data = [np.array([1.5, 2.5], dtype=np.float32), np.arange(2), np.array(['b', 'a'])]
+    single, integer, string = _plots_nd._convert_data_for_table(data, names)['columns']
+    assert single['type'] == 'float32'
+    assert np.frombuffer(b64decode(single['values']), dtype='<f4').tolist() == [1.5, 2.5]
+    assert integer['type'] == 'float64'
+    codes = np.frombuffer(b64decode(string['codes']), dtype='<i4')
+    assert [string['categories'][code] for code in codes] == ['b', 'a']
+
+    # Numerical columns of a DataFrame are kept as arrays, non-finite rows still removed
+    df = pd.DataFrame({'a': np.array([1.0, np.nan, 3.0], dtype=np.float32),
+                       'b': [1, 2, 3], 'c': ['x', 'y', 'z']})
+    fig = up.javascript.table(df)
+    table = json.loads(re.search(
+        r'JSON\.parse\(payload\.text\) : (.*?)\)?;\n', fig.html_text).group(1))
+    assert table['num_rows'] == 2
+    assert [col['type'] for col in table['columns']] == ['float32', 'float64', 'category']
+
+
+def test_export_html_shared_assets(my_outdir):
+    from unified_plotting.javascript import _template_system
+
+    dirpath = os.path.join(my_outdir, 'shared_assets_javascript')
+    asset_dirpath = os.path.join(dirpath, 'shared')
+    figures = [
+        up.javascript.network_d3(TESTDATA_JGF['directed attributed']),
+        up.javascript.table([[1, 2], ['a', 'b']]),
+        up.javascript.table([[3, 4], ['c', 'd']]),
+    ]
+    for i, fig in enumerate(figures):
+        inline_filepath = fig.export_html(os.path.join(dirpath, 'inline_{}'.format(i)))
+        filepath = fig.export_html(os.path.join(dirpath, 'pages', 'page_{}'.format(i)),
+                                   assets='directory', asset_directory=asset_dirpath)
+        assert os.path.getsize(filepath) < os.path.getsize(inline_filepath)
+        with open(filepath, encoding='utf-8') as file_handle:
+            html_text = file_handle.read()
+        assert '§' not in html_text
+        for asset in [_template_system.load_asset('third_party/require/require.min.js')] + \
+                fig._html_template.assets:
+            assert asset.text not in html_text
+            assert 'src="../shared/{}.{}.js"'.format(asset.name, asset.digest[:16]) in html_text
+    # Each library is written only once: require, d3, jquery, slickgrid, payload decoding
+    assert len(os.listdir(asset_dirpath)) == 5
+    with pytest.raises(ValueError):
+        fig.export_html(filepath, assets='nonsense')
+
+
+def test_notebook_representation_loads_libraries_once():
+    from unified_plotting.javascript import _template_system
+
+    require = _template_system.load('third_party/require/require.min.js')
+    d3 = _template_system.load('third_party/d3/d3.v5.min.def.js')
+    jquery = _template_system.load('third_party/jquery/jquery.min.def.js')
+    jgf = TESTDATA_JGF['directed attributed']
+    Figure = up.javascript.network_d3(jgf).__class__
+    Figure._notebook_assets.clear()
+    try:
+        html_text_1 = up.javascript.network_d3(jgf)._repr_html_()
+        html_text_2 = up.javascript.network_d3(jgf)._repr_html_()
+        html_text_3 = up.javascript.table([[1, 2]])._repr_html_()
+    finally:
+        Figure._notebook_assets.clear()
+    assert require in html_text_1 and d3 in html_text_1
+    assert require not in html_text_2 and d3 not in html_text_2
+    assert len(html_text_2) < len(html_text_1) / 2
+    assert require not in html_text_3 and jquery in html_text_3
+    for html_text in (html_text_1, html_text_2, html_text_3):
+        assert '§' not in html_text
+    # Standalone and partial representations still contain all libraries
+    fig = up.javascript.network_d3(jgf)
+    assert d3 in fig.html_text_partial and d3 in fig.html_text_standalone
@@ -651,3 +651,48 @@ def test_violin_parameters(name, x, y, z):
 
 def test_violin_unknown_arg(caplog):
     try_unknown_argument(caplog, up.matplotlib.violin, dict(data=[[1, 2, 3], [1, 2, 3]]))
+
+
+# Batch export
+
+def test_export_batch(my_outdir, monkeypatch):
+    import numpy as np
+    large_array = np.linspace(0.0, 1.0, 2 ** 18)  # placed in shared memory
+    specs = [
+        dict(function='scatter', args=([1, 2, 3], [3, 1, 2]), filename='batch_scatter'),
+        dict(function='histogram', args=([large_array],), kwargs=dict(bin_number=20)),
+        dict(function='histogram', kwargs=dict(data=[large_array], title='Same data')),
+        dict(function='scatter', args=([1, 2, 3], [1, 2])),
+        dict(function='nonsense'),
+    ]
+    completed = []
+    dirpath = os.path.join(my_outdir, 'matplotlib_batch')
+    results = up.matplotlib.export_batch(
+        specs, dirpath, workers=2, formats=['png', 'svg'], callback=completed.append)
+    assert sorted(result['index'] for result in completed) == list(range(len(specs)))
+    assert [result['index'] for result in results] == list(range(len(specs)))
+    for result in results[:3]:
+        assert result['error'] is None
+        assert sorted(result['filepaths']) == ['png', 'svg']
+        assert all(os.path.isfile(filepath) for filepath in result['filepaths'].values())
+    assert results[0]['filepaths']['png'] == os.path.join(dirpath, 'batch_scatter.png')
+    assert results[1]['filepaths']['png'] == os.path.join(dirpath, 'plot_1.png')
+    for result in results[3:]:
+        assert result['error'] is not None
+        assert result['filepaths'] == {}
+
+    # Without Pillow the formats are saved with Matplotlib
+    from unified_plotting.matplotlib import _batch_export, _data_structures
+    monkeypatch.setattr(_data_structures, '_pil_image', None)
+    job = dict(function='scatter', args=([1, 2, 3], [3, 1, 2]), kwargs={},
+               filepath=os.path.join(dirpath, 'without_pillow'))
+    result = _batch_export._build_and_export(0, job, ['png', 'svg'])
+    assert result['error'] is None
+    assert sorted(result['filepaths']) == ['png', 'svg']
+    assert all(os.path.isfile(filepath) for filepath in result['filepaths'].values())
+    monkeypatch.undo()
+
+    with pytest.raises(ValueError):
+        up.matplotlib.export_batch([dict(args=[1, 2])], dirpath)
+    with pytest.raises(ValueError):
+        up.matplotlib.export_batch(specs, dirpath, workers=0)
@@ -810,6 +810,11 @@ def test_scatter_3d_parameters(name, x, y, z):
     up.plotly.scatter_3d(
         [x, x], [y, y], [z, z], show_stem_x=True, show_stem_y=False, show_stem_z=True,
         show_stem_line=False, stem_shift_factor=0.09)
+    fig = up.plotly.scatter_3d(
+        x, y, z, show_stem_x=True, show_stem_y=True, show_stem_z=True, marker_color=z)
+    trace_stems = fig.fig.data[0]
+    assert len(trace_stems.x) == len(trace_stems.y) == len(trace_stems.z) == 3 * 3 * len(x)
+    assert len(trace_stems.marker.color) == 3 * 3 * len(x)
 
     # interpolation
     up.plotly.scatter_3d(
@@ -0,0 +1,128 @@
+import os
+import re
+
+import pytest
+
+import unified_plotting as up
+
+
+X = [1, 2, 3, 4]
+Y = [4, 1, 3, 2]
+JGF = {
+    'graph': {
+        'nodes': {'a': {}, 'b': {}, 'c': {}},
+        'edges': [{'source': 'a', 'target': 'b'}, {'source': 'b', 'target': 'c'}],
+    }
+}
+
+
+def read_file(filepath):
+    with open(filepath, encoding='utf-8') as file_handle:
+        return file_handle.read()
+
+
+def test_report_export(my_outdir):
+    fig_plotly = up.plotly.scatter(X, Y)
+    fig_mpl = up.matplotlib.scatter(X, Y)
+    figures = [
+        fig_plotly,
+        fig_plotly,
+        fig_mpl,
+        fig_mpl,
+        up.javascript.network_d3(JGF),
+        up.javascript.network_d3(JGF),
+        up.javascript.network_vis(JGF),
+        up.javascript.table([X, Y]),
+        up.javascript.parallel_coordinates_table([X, Y]),
+    ]
+    report = up.report.Report(title='Report <1>')
+    report.add_heading('Figures')
+    report.add_text('Text with <special> characters & more')
+    report.add_html('<hr>')
+    for fig in figures:
+        report.add_figure(fig, caption='Caption')
+    assert report.figures == figures
+
+    filepath = os.path.join(my_outdir, 'report')
+    filepath = report.export_html(filepath)
+    assert filepath.endswith('.html')
+    html_text = read_file(filepath)
+    assert '§' not in html_text
+    assert '<title>Report &lt;1&gt;</title>' in html_text
+    assert '<p>Text with &lt;special&gt; characters &amp; more</p>' in html_text
+    assert html_text.count('class="up-report-caption"') == len(figures)
+
+    # Each library is included exactly once
+    from unified_plotting.javascript import _template_system
+    from unified_plotting.plotly._data_structures import _load_plotlyjs
+    assert html_text.count(_load_plotlyjs()[0]) == 1
+    libraries = [
+        'require/require.min.js',
+        'd3/d3.v5.min.def.js',
+        'vis-network/vis-network.min.def.js',
+        'jquery/jquery.min.def.js',
+        'slickgrid/slickgrid.combined.def.js',
+        'parcoords/parcoords.standalone.min.def.js',
+    ]
+    for library in libraries:
+        assert html_text.count(_template_system.load('third_party/' + library)) == 1
+
+    # Identical payloads are embedded once: plotly figure, graph, table data
+    payload_keys = re.findall(r'upReportPayloads\["(\w+)"\] = function', html_text)
+    assert len(payload_keys) == len(set(payload_keys)) == 3
+    assert html_text.count('upReportPayloads["{}"]()'.format(payload_keys[0])) == 2
+    # Repeated matplotlib figure is embedded once and copied in the browser
+    assert html_text.count('data-up-report-copy="') == 1
+
+    # Shared asset directory
+    filepath = report.export_html(os.path.join(my_outdir, 'report_assets'), assets='directory')
+    html_text = read_file(filepath)
+    assert 'src="assets/plotly.min.' in html_text
+    assert 'src="assets/require.min.' in html_text
+    assert len(html_text) < 0.2 * os.path.getsize(os.path.join(my_outdir, 'report.html'))
+
+
+def test_report_streaming_and_raster(my_outdir):
+    try:
+        up.config.settings.json_streaming = True
+        figures = [up.javascript.network_d3(JGF), up.javascript.network_webgl(JGF),
+                   up.matplotlib.scatter(X, Y)]
+        report = up.report.Report(figures, matplotlib_format='png')
+        filepath = report.export_html(os.path.join(my_outdir, 'report_streaming'))
+    finally:
+        up.config.load_defaults()
+    html_text = read_file(filepath)
+    assert len(re.findall(r'upReportPayloads\["(\w+)"\] = function', html_text)) == 1
+    assert html_text.count('<img src="data:image/png;base64,') == 1
+
+
+def test_report_converts_streams_once(my_outdir, monkeypatch):
+    from unified_plotting.javascript import _plots_network
+
+    calls = []
+    convert_graph = _plots_network._convert_graph
+
+    def counting_convert_graph(load_graph, convert):
+        calls.append(1)
+        return convert_graph(load_graph, convert)
+
+    monkeypatch.setattr(_plots_network, '_convert_graph', counting_convert_graph)
+    fig = up.javascript.network_d3([JGF, JGF], lazy_loading=True)
+    report = up.report.Report([fig, fig, up.javascript.network_vis([JGF], lazy_loading=True)])
+    filepath = report.export_html(os.path.join(my_outdir, 'report_lazy'))
+    html_text = read_file(filepath)
+    # Each graph is converted once per stream, a stream shared by two figures is written once
+    assert len(calls) == 3
+    assert len(re.findall(r'upReportPayloads\["(\w+)"\] = function', html_text)) == 2
+
+
+def test_report_invalid_arguments():
+    with pytest.raises(ValueError):
+        up.report.Report(matplotlib_format='jpg')
+    report = up.report.Report()
+    with pytest.raises(ValueError):
+        report.add_figure('not a figure')
+    with pytest.raises(ValueError):
+        report.add_heading('Heading', level=7)
+    with pytest.raises(ValueError):
+        report.export_html('report', assets='nonsense')
@@ -100,6 +100,67 @@ def test_json_file_loading():
     assert data
 
 
+def test_jgf_file_loading():
+    import io as stdlib_io
+    import json
+
+    import numpy as np
+    import pytest
+
+    for name in ('jgf_graph_single.json', 'jgf_graph_multiple.json'):
+        filepath = os.path.join(IN_DIR, name)
+        data = io.read_json_file(filepath)
+        jgf_graphs = data['graphs'] if 'graphs' in data else [data['graph']]
+        for chunk_size in (1, 7, 2**20):
+            graphs = io.read_jgf_file(filepath, chunk_size)
+            assert len(graphs) == len(jgf_graphs)
+            for graph, jgf_graph in zip(graphs, jgf_graphs):
+                assert graph.get('label') == jgf_graph.get('label')
+                assert graph['directed'] == (jgf_graph.get('directed') is True)
+                node_ids = [str(node['id']) for node in jgf_graph['nodes']]
+                assert [str(val) for val in graph['node_columns']['id']] == node_ids
+                edges = graph['edge_columns']
+                positions = [(node_ids.index(str(edge['source'])),
+                              node_ids.index(str(edge['target'])))
+                             for edge in jgf_graph['edges']]
+                assert list(zip(edges['source'].tolist(), edges['target'].tolist())) == positions
+
+    # Compact columns: typed numbers, missing values and strings stored once
+    text = json.dumps({'graph': {'nodes': [
+        {'id': 'a', 'metadata': {'size': 1, 'color': 'red', 'shape': 'dot'}},
+        {'id': 'b', 'label': 'B', 'metadata': {'size': 2.5, 'color': 'red', 'shape': True}},
+        {'id': 'c'},
+    ], 'edges': [{'source': 'a', 'target': 'c', 'metadata': {'weight': 3}}]}})
+    graph, = io.read_jgf_file(stdlib_io.StringIO(text), 5)
+    columns = graph['node_columns']
+    assert columns['size'].dtype == float and np.isnan(columns['size'][2])
+    assert columns['color'].tolist() == ['red', 'red', None]
+    assert columns['color'][0] is columns['color'][1]
+    assert columns['label'].tolist() == [None, 'B', None]
+    assert columns['shape'].tolist() == ['dot', True, None]
+    assert graph['edge_columns']['weight'].dtype == np.int64
+
+    # Repeated node ids and edges to unknown nodes are ignored as in JGF dicts
+    text = json.dumps({'graph': {'nodes': [
+        {'id': 'a', 'label': 'first'}, {'id': 'b'}, {'id': 'a', 'label': 'second'},
+    ], 'edges': [{'source': 'b', 'target': 'a'}, {'source': 'a', 'target': 'x'}]}})
+    graph, = io.read_jgf_file(stdlib_io.StringIO(text))
+    assert graph['node_columns']['id'].tolist() == ['a', 'b']
+    assert graph['node_columns']['label'].tolist() == ['first', None]
+    assert graph['edge_columns']['source'].tolist() == [1]
+    assert graph['edge_columns']['target'].tolist() == [0]
+
+    # Invalid structure is reported with its position
+    for invalid_text in ('{"graph": {"nodes": [{"id": 0}, {"label": "no id"}]}}',
+                         '{"graph": {"nodes": {}}}',
+                         '{"graph": {"edges": [{"source": 0, "target": 1}, 3]}}',
+                         '{"graph": {"nodes": [{"id": 0}] "edges": []}}',
+                         '{"graph": {"nodes": []}} {}',
+                         '{"other": 1}'):
+        with pytest.raises(ValueError):
+            io.read_jgf_file(stdlib_io.StringIO(invalid_text), 4)
+
+
 def test_ode_solver():
     import math
 
@@ -16,15 +16,17 @@ It contains the following subpackages.
 """
 
 __all__ = [
+    'cache',
     'config',
     'javascript',
     'matplotlib',
     'plotly',
+    'report',
     'ui',
     'utilities',
 ]
 
 __version__ = '0.5.0rc1'
 
-from . import javascript, matplotlib, plotly, ui, utilities
+from . import cache, javascript, matplotlib, plotly, report, ui, utilities
 from ._config import config
@@ -28,6 +28,11 @@ def warn_user(message):
     LOGGER.warning(message)
 
 
+def inform_user(message):
+    """General information displayed to the user."""
+    LOGGER.info(message)
+
+
 def report_missing_library(library_name, exception):
     """Warning to the user about missing library."""
     message = ('ImportError during loading of {}. Plots with this library are not '
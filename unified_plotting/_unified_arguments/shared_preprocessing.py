@@ -1,8 +1,9 @@
 """Preprocessing used by various subpackages."""
 
-import json as _json
+import functools as _functools
 from collections import OrderedDict as _OrderedDict
 from collections.abc import Iterable as _Iterable
+from io import StringIO as _StringIO
 from math import floor as _floor
 from math import log10 as _log10
 from numbers import Number as _Number
@@ -256,12 +257,20 @@ def prepare_vector_data_3d_multiple(x, y, z, kwargs):
     return xs, ys, zs, multiple_series
 
 
-def prepare_vector_data_nd(data, name, remove_non_numerical_vectors=True):
-    """Prepare vector data for standard nd plots."""
+def prepare_vector_data_nd(data, name, remove_non_numerical_vectors=True, keep_arrays=False):
+    """Prepare vector data for standard nd plots.
+
+    If keep_arrays is True, numerical arrays and pandas Series are kept as 1d numpy arrays
+    instead of being converted to lists, so that they can be processed as a whole.
+
+    """
     # Filepath or dataframe to list of vectors
     data, name = _to_list_of_vectors_and_names(data, name)
     # Convert various Iterables to list
-    data = [_try_to_list(vec) for vec in data]
+    if keep_arrays:
+        data = [_try_to_numerical_array(vec) for vec in data]
+    else:
+        data = [_try_to_list(vec) for vec in data]
     # Require vectors to be non-empty and to have equal length
     _check_if_nonempty(data)
     _check_if_equal_lengths(data)
@@ -368,6 +377,14 @@ def _try_to_list(vector):
     return result
 
 
+def _try_to_numerical_array(vector):
+    if hasattr(vector, 'dtype') and not isinstance(vector, (str, bytes)):
+        array = _np.asarray(vector)
+        if array.ndim == 1 and array.dtype.kind in 'fiu':
+            return array
+    return _try_to_list(vector)
+
+
 def _check_if_nonempty(data):
     """Check if a list of vectors is non-empty."""
     vector_lengths = set(len(vector) for vector in data)
@@ -562,20 +579,23 @@ def _remove_nonfinite_rows(data, ignored_vectors=None, consider_only_numbers=Fal
     else:
         is_accepted = _is_finite_number
 
-    new_data = []
-    count_removed = 0
-    for row in zip(*data):
-        skip_row = False
-        for ignore, element in zip(ignored_vectors, row):
-            if not ignore:
-                if not is_accepted(element):
-                    skip_row = True
-                    break
-        if skip_row:
-            count_removed += 1
-        else:
-            new_data.append(row)
-    new_data = list(list(col) for col in zip(*new_data))  # from rows back to column vectors
+    if any(isinstance(vector, _np.ndarray) for vector in data):
+        new_data, count_removed = _remove_rows_columnwise(data, ignored_vectors, is_accepted)
+    else:
+        new_data = []
+        count_removed = 0
+        for row in zip(*data):
+            skip_row = False
+            for ignore, element in zip(ignored_vectors, row):
+                if not ignore:
+                    if not is_accepted(element):
+                        skip_row = True
+                        break
+            if skip_row:
+                count_removed += 1
+            else:
+                new_data.append(row)
+        new_data = list(list(col) for col in zip(*new_data))  # from rows back to column vectors
 
     # Report if anything got removed
     if count_removed > 0:
@@ -592,6 +612,26 @@ def _remove_nonfinite_rows(data, ignored_vectors=None, consider_only_numbers=Fal
     return new_data
 
 
+def _remove_rows_columnwise(data, ignored_vectors, is_accepted):
+    """Remove rows from a mix of numerical arrays and lists, checking arrays as a whole."""
+    is_kept = _np.ones(len(data[0]), dtype=bool)
+    for ignore, vector in zip(ignored_vectors, data):
+        if ignore:
+            continue
+        if isinstance(vector, _np.ndarray):
+            if vector.dtype.kind == 'f':
+                is_kept &= _np.isfinite(vector)
+        else:
+            is_kept &= _np.fromiter(
+                (is_accepted(element) for element in vector), dtype=bool, count=len(vector))
+    count_removed = len(is_kept) - int(is_kept.sum())
+    if count_removed > 0:
+        data = [vector[is_kept] if isinstance(vector, _np.ndarray) else
+                [element for element, keep in zip(vector, is_kept) if keep]
+                for vector in data]
+    return data, count_removed
+
+
 # Part 3: Graph data
 
 def prepare_graph_data(data):
@@ -600,7 +640,26 @@ def prepare_graph_data(data):
     Parameters
     ----------
     data : dict conforming to JSON graph format, or graph object of a supported library,
-           or filepath to a JSON file
+           or filepath to a JSON file, or columnar graph data (pandas DataFrame or dict of
+           edge columns with "source" and "target", dict with "edges" and optional "nodes"
+           tables, scipy.sparse adjacency matrix)
+
+    Notes
+    -----
+    JSON files and strings are read incrementally with
+    :func:`~unified_plotting.utilities.io.read_jgf_file`, which provides the graphs in
+    columnar form instead of JGF. This keeps memory usage low for large files.
+
+    """
+    return [load_graph() for load_graph in prepare_graph_data_lazily(data)]
+
+
+def prepare_graph_data_lazily(data):
+    """Check graph data like :func:`prepare_graph_data` but defer the conversion of each graph.
+
+    Returns a list with a function for each graph, which converts it to JGF when called.
+    Graph objects, columnar graph data and JSON strings or files in an iterable are only
+    converted then, so that a caller can hold a single converted graph in memory at a time.
 
     """
     def raise_error(additional_message=None):
@@ -609,38 +668,22 @@ def prepare_graph_data(data):
             message += ' {}'.format(additional_message)
         raise ValueError(message)
 
-    def filepath_to_json_object(filepath):
-        with open(filepath) as file_handle:
-            return _json.load(file_handle)
-
-    def json_str_to_json_object(text):
-        return _json.loads(text)
-
-    def str_to_json_object(text):
-        if _operating_system.is_nonempty_file(text):
-            data = filepath_to_json_object(text)
-        else:
-            try:
-                data = json_str_to_json_object(text)
-            except Exception:
-                message = (
-                    'Given data is a string that is neither a filepath nor a valid JSON string.')
-                raise ValueError(message)
-        return data
-    # Case 0: A string that can be a filepath to a text file or a JSON string
+    def given(item):
+        return _functools.partial(_identity, item)
+    # Case 0: A string that can be a filepath to a JGF file or a JGF string
     if isinstance(data, str):
-        data = str_to_json_object(data)
-    # Case 1: Single graph object
-    if _is_known_graph_object(data):
-        data = _convert_graph_object_to_jgf(data)
-        data = [data]
+        loaders = [given(graph) for graph in _str_to_columnar_graphs(data)]
+    # Case 1: Single graph object or columnar graph data
+    elif _is_known_graph_object(data):
+        loaders = [_functools.partial(_convert_graph_object_to_jgf, data)]
+    elif _is_columnar_graph_data(data):
+        loaders = [_functools.partial(_convert_columnar_graph_data, data)]
     # Case 2: Single JGF dict (with single graph)
     elif isinstance(data, dict) and 'graph' in data:
-        data = data['graph']
-        data = [data]
+        loaders = [given(data['graph'])]
     # Case 3: Single JGF dict (with multiple graphs)
     elif isinstance(data, dict) and 'graphs' in data:
-        data = data['graphs']
+        loaders = [given(graph) for graph in data['graphs']]
     # Case 4: Iterable of multiple graph objects and/or JGF dicts (with single graph each)
     elif isinstance(data, _Iterable) and not isinstance(data, dict):
         try:
@@ -649,23 +692,49 @@ def prepare_graph_data(data):
             raise_error('Iterable with no length.')
         if num_items < 1:
             raise_error('Iterable with zero items.')
-        new_data = []
+        loaders = []
         for idx in range(num_items):
             item = data[idx]
             if _is_known_graph_object(item):
-                item = _convert_graph_object_to_jgf(item)
+                loader = _functools.partial(_convert_graph_object_to_jgf, item)
+            elif _is_columnar_graph_data(item):
+                loader = _functools.partial(_convert_columnar_graph_data, item)
             elif isinstance(item, str):
-                item = str_to_json_object(item)
+                loader = _functools.partial(_str_to_columnar_graph, item, idx)
             elif isinstance(item, dict) and 'graph' in item:
-                item = item['graph']
+                loader = given(item['graph'])
             else:
                 raise_error('Iterable with invalid item at position {}.'.format(idx))
-            new_data.append(item)
-        data = new_data
+            loaders.append(loader)
     # Case 5: Other unknown data
     else:
         raise_error()
-    return data
+    return loaders
+
+
+def _identity(item):
+    return item
+
+
+def _str_to_columnar_graphs(text):
+    """Read the graphs of a JGF file or JGF string incrementally into columnar graphs."""
+    if _operating_system.is_nonempty_file(text):
+        return _io.read_jgf_file(text)
+    if text.lstrip()[:1] not in ('{', '['):
+        message = 'Given data is a string that is neither a filepath nor a valid JSON string.'
+        raise ValueError(message)
+    return _io.read_jgf_file(_StringIO(text))
+
+
+def _str_to_columnar_graph(text, position):
+    """Read the single graph of a JGF file or JGF string that is an item of an iterable."""
+    graphs = _str_to_columnar_graphs(text)
+    if len(graphs) != 1:
+        message = ('Provided data is not in a valid graph format. Iterable with item at '
+                   'position {} that contains {} graphs instead of one.'.format(
+                       position, len(graphs)))
+        raise ValueError(message)
+    return graphs[0]
 
 
 def _is_known_graph_object(data):
@@ -710,6 +779,36 @@ def _convert_graph_object_to_jgf(data):
     return data['graph']
 
 
+def _is_columnar_graph_data(data):
+    """Check if the given data is a table of edges, a dict of tables or a sparse matrix."""
+    if 'scipy.sparse' in str(type(data)).lower():
+        return True
+    if hasattr(data, 'columns') and hasattr(data, 'to_numpy'):
+        return True  # pandas DataFrame, whose module path differs between pandas versions
+    if isinstance(data, dict) and 'graph' not in data and 'graphs' not in data:
+        has_edge_columns = 'source' in data and 'target' in data
+        has_edge_table = 'edges' in data and not isinstance(data['edges'], list)
+        return has_edge_columns or has_edge_table
+    return False
+
+
+def _convert_columnar_graph_data(data):
+    """Convert columnar graph data into a columnar graph without top-level graph key."""
+    if isinstance(data, dict) and 'edges' in data:
+        options = dict(nodes=data.get('nodes'), metadata=data.get('metadata'))
+        edges = data['edges']
+        if 'directed' in data:
+            options['directed'] = data['directed']
+    else:
+        options = dict()
+        edges = data
+    if 'scipy.sparse' in str(type(edges)).lower():
+        data = _format_conversion.sparse_matrix_to_columnar_graph(edges, **options)
+    else:
+        data = _format_conversion.edges_to_columnar_graph(edges, **options)
+    return data['graph']
+
+
 # Part 4: Different helper functions
 
 def warn_if_categorical_axis(kwargs):
@@ -1,8 +1,13 @@
 """Processing used by various subpackages."""
 
+import functools as _functools
+import os as _os
+from collections import OrderedDict as _OrderedDict
 from collections.abc import Iterable as _Iterable
 from numbers import Number as _Number
 
+import numpy as _np
+
 from .._config import config as _config
 from . import shared_preprocessing as _shared_preprocessing
 from .colors import conversion as _conversion
@@ -1002,3 +1007,144 @@ def calc_bins(data, bin_start=None, bin_end=None, bin_number=None, half_bin_onto
         bin_step = span / bin_number
 
     return bin_start, bin_end, bin_step
+
+
+# -) Fingerprint of plot data
+def update_fingerprint(digest, item, strict=False):
+    """Recursively feed a JSON-like item, which may contain numpy arrays, into a hash object.
+
+    Numerical or textual sequences are hashed as contiguous arrays instead of element by
+    element, which is fast even for large data. Pandas objects are hashed with their values,
+    index and column names, SciPy sparse matrices with their shape and stored entries.
+
+    With ``strict=True`` the fingerprint has to identify the item by its content: a string
+    that is a path to a file is hashed with the content of the file, and a TypeError is raised
+    for any other object that could only be hashed by its repr, e.g. a graph object.
+
+    """
+    if isinstance(item, dict):
+        digest.update(b'{')
+        for key, val in item.items():
+            digest.update(repr(key).encode())
+            update_fingerprint(digest, val, strict)
+        digest.update(b'}')
+    elif isinstance(item, (list, tuple, _np.ndarray)):
+        array = item if isinstance(item, _np.ndarray) else None
+        if array is None and item and not isinstance(item[0], (dict, list, tuple, _np.ndarray)):
+            if strict and isinstance(item[0], str) and _os.path.isfile(item[0]):
+                pass  # several filepaths, e.g. JGF files, are hashed with their content below
+            else:
+                try:
+                    array = _np.asarray(item)
+                    if array.dtype.kind == 'U' and not all(isinstance(val, str) for val in item):
+                        array = None  # mixed types would be converted to strings
+                except Exception:
+                    pass
+        if array is not None and array.dtype.kind in 'biufcmMSU':
+            digest.update('[{}{}'.format(array.dtype.str, array.shape).encode())
+            digest.update(_np.ascontiguousarray(array).tobytes())
+        else:
+            digest.update(b'[')
+            for val in item:
+                update_fingerprint(digest, val, strict)
+        digest.update(b']')
+    elif hasattr(item, 'to_numpy') and hasattr(item, 'index'):
+        # Pandas Series or DataFrame, whose repr would be truncated
+        digest.update('{}<'.format(type(item).__name__).encode())
+        update_fingerprint(digest, [
+            getattr(item, 'name', None), list(getattr(item, 'columns', [])),
+            item.index.to_numpy(), item.to_numpy()], strict)
+        digest.update(b'>')
+    elif 'scipy.sparse' in type(item).__module__:
+        # Sparse matrix, whose repr only contains shape, dtype and number of stored entries
+        matrix = item.tocsr(copy=True)
+        matrix.sum_duplicates()
+        digest.update('{}<'.format(type(item).__name__).encode())
+        update_fingerprint(
+            digest, [matrix.shape, matrix.data, matrix.indices, matrix.indptr], strict)
+        digest.update(b'>')
+    elif strict and isinstance(item, str) and _os.path.isfile(item):
+        digest.update('file<{}:'.format(_os.path.getsize(item)).encode())
+        with open(item, 'rb') as file_handle:
+            for chunk in iter(_functools.partial(file_handle.read, 2 ** 20), b''):
+                digest.update(chunk)
+        digest.update(b'>')
+    elif strict and not (item is None or isinstance(item, (bool, _Number, str, bytes, _np.generic))):
+        message = 'Object of type {} can not be identified by its content.'.format(
+            type(item).__name__)
+        raise TypeError(message)
+    else:
+        digest.update('{}:{!r};'.format(type(item).__name__, item).encode())
+
+
+# -) Cache for rendered representations of a figure
+class OutputCache:
+    """Memory-limited cache for rendered representations of a figure, e.g. images or HTML text.
+
+    All entries belong to one state of the wrapped figure object. If a different state is
+    passed to :py:meth:`get`, e.g. because the figure was modified in the meantime, all entries
+    are discarded. If the total size of all entries exceeds the setting
+    ``output_cache_max_mb``, the least recently used ones are discarded. A value of 0 disables
+    the cache and None removes the limit.
+
+    """
+
+    def __init__(self):
+        """Create an empty cache."""
+        self._entries = _OrderedDict()
+        self._num_bytes = 0
+        self._state = None
+
+    def __len__(self):
+        """Get the number of cached entries."""
+        return len(self._entries)
+
+    def get(self, key, function, state=None):
+        """Get a cached value or create it with a function call and cache it.
+
+        Parameters
+        ----------
+        key : hashable
+            Identifier of the representation, e.g. a tuple of format, size and resolution.
+        function : callable
+            Function without arguments that renders the representation as str, bytes or
+            numpy array.
+        state : hashable
+            Identifier of the current state of the figure object. All entries are discarded
+            if it differs from the state of the previous call.
+
+        """
+        if state != self._state:
+            self.clear()
+            self._state = state
+        try:
+            value = self._entries[key]
+            self._entries.move_to_end(key)
+        except KeyError:
+            value = function()
+            self._add(key, value)
+        return value
+
+    def clear(self):
+        """Discard all cached entries."""
+        self._entries.clear()
+        self._num_bytes = 0
+
+    def _add(self, key, value):
+        max_mb = _config.settings.output_cache_max_mb
+        max_bytes = float('inf') if max_mb is None else max_mb * 1e6
+        num_bytes = self._num_bytes_of(value)
+        if num_bytes > max_bytes:
+            return
+        self._entries[key] = value
+        self._num_bytes += num_bytes
+        while self._num_bytes > max_bytes:
+            _, old_value = self._entries.popitem(last=False)
+            self._num_bytes -= self._num_bytes_of(old_value)
+
+    @staticmethod
+    def _num_bytes_of(value):
+        try:
+            return value.nbytes  # numpy array
+        except AttributeError:
+            return len(value)  # str or bytes
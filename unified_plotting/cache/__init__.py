@@ -0,0 +1,23 @@
+"""This is the subpackage :py:mod:`unified_plotting.cache`.
+
+It provides a persistent cache for the output of plot function calls.
+Exported images or HTML documents are stored in a local directory under
+a hash of the data, arguments, global settings and library versions,
+so that a repeated call with identical content is answered from disk
+without creating the figure again.
+
+It contains the following classes.
+"""
+
+from .. import _logging
+
+
+try:
+    __all__ = [
+        'RenderCache',
+    ]
+
+    from ._render_cache import RenderCache
+except ImportError as excp:
+    __all__ = []
+    _logging.report_missing_library('Cache subpackage', excp)
@@ -0,0 +1,240 @@
+"""Content-addressed cache on disk for the rendered output of plot function calls."""
+
+import inspect as _inspect
+import json as _json
+import os as _os
+import sys as _sys
+import tempfile as _tempfile
+import threading as _threading
+import warnings as _warnings
+from hashlib import blake2b as _blake2b
+
+from .._config import config as _config
+from .._unified_arguments import shared_processing as _shared_processing
+
+
+_LIBRARIES = ['unified_plotting', 'numpy', 'plotly', 'matplotlib']
+
+
+class RenderCache:
+    """Persistent cache that stores the rendered output of plot function calls in a directory.
+
+    Each call is identified by a hash of the plot function, its arguments after resolving
+    default values, the current :py:obj:`unified_plotting.config.settings` and the versions of
+    the involved libraries. Data buffers such as lists or numpy arrays are hashed as a whole,
+    which is fast even for large data, and filepaths, e.g. of JGF files, are hashed with the
+    content of the file. If all requested formats of a call are present in the cache, they are
+    read from disk without calling the plot function, i.e. without any work done by Plotly or
+    Matplotlib. Otherwise the figure is created once and the missing formats are rendered and
+    stored. Calls with arguments that can not be identified by their content, e.g. graph
+    objects of other libraries, bypass the cache and count as misses.
+
+    Files are written atomically, so that several processes can share a directory. If its total
+    size exceeds ``max_mb``, the least recently used files are removed.
+
+    Parameters
+    ----------
+    directory : str
+        Directory in which the rendered files are stored. It is created if it does not exist.
+    max_mb : float, optional
+        Maximum total size of the stored files in MB. Default: no limit.
+
+    Examples
+    --------
+    >>> cache = up.cache.RenderCache('plot_cache', max_mb=500)
+    >>> outputs = cache.render(up.plotly.scatter, x, y, title='Daily', formats=['html', 'png'])
+    >>> html_bytes = outputs['html']
+    >>> cache.stats
+    {'hits': 1, 'misses': 0, 'hit_rate': 1.0, 'bytes_saved': 3650541, 'size_bytes': 3650541}
+
+    """
+
+    def __init__(self, directory, max_mb=None):
+        """Create a cache that uses the files in a directory."""
+        if max_mb is not None and max_mb < 0:
+            message = 'Argument "max_mb" needs to be None or a non-negative number.'
+            raise ValueError(message)
+        _os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_mb = max_mb
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = _threading.Lock()
+        self._size_bytes = sum(size for _, _, size in self._scan())
+
+    @property
+    def hit_rate(self):
+        """Fraction of render calls that were answered completely from the cache."""
+        num_calls = self.hits + self.misses
+        return self.hits / num_calls if num_calls else 0.0
+
+    @property
+    def stats(self):
+        """Dict with hits, misses, hit rate, bytes read from the cache and total size on disk."""
+        return dict(hits=self.hits, misses=self.misses, hit_rate=self.hit_rate,
+                    bytes_saved=self.bytes_saved, size_bytes=self._size_bytes)
+
+    def render(self, function, *args, formats='html', **kwargs):
+        """Call a plot function and render its figure, or get the result from the cache.
+
+        Parameters
+        ----------
+        function : callable
+            Plot function of this package, e.g. :py:func:`unified_plotting.plotly.scatter`.
+        *args
+            Positional arguments of the plot function.
+        formats : str or list of str
+            Output formats. Possible values: "html", "json" (Plotly only), "svg" and the
+            image formats of the figure type, e.g. "png" or "pdf".
+        **kwargs
+            Keyword arguments of the plot function.
+
+        Returns
+        -------
+        outputs : dict
+            Mapping of each format to the rendered output as bytes. Text formats are encoded
+            with UTF-8.
+
+        """
+        # Argument processing
+        if isinstance(formats, str):
+            formats = [formats]
+        formats = [data_format.lower() for data_format in formats]
+        key = self._key(function, args, kwargs)
+
+        # Transformation
+        outputs = dict()
+        for data_format in formats:
+            binary_data = None if key is None else self._read(key, data_format)
+            if binary_data is not None:
+                outputs[data_format] = binary_data
+        with self._lock:
+            if len(outputs) == len(formats):
+                self.hits += 1
+                self.bytes_saved += sum(len(val) for val in outputs.values())
+                return outputs
+            self.misses += 1
+        fig = function(*args, **kwargs)
+        for data_format in formats:
+            if data_format not in outputs:
+                outputs[data_format] = _render(fig, data_format)
+                if key is not None:
+                    self._write(key, data_format, outputs[data_format])
+        return {data_format: outputs[data_format] for data_format in formats}
+
+    def clear(self):
+        """Remove all stored files and reset the statistics."""
+        for filepath, _, _ in self._scan():
+            _remove(filepath)
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.bytes_saved = 0
+            self._size_bytes = 0
+
+    def _key(self, function, args, kwargs):
+        """Calculate a hash of everything that determines the output of a plot function call.
+
+        None is returned if an argument can not be identified by its content.
+
+        """
+        arguments = _inspect.signature(function).bind(*args, **kwargs)
+        arguments.apply_defaults()
+        settings = _json.dumps(
+            _config.settings, sort_keys=True, default=lambda obj: obj.__dict__)
+        digest = _blake2b(digest_size=20)
+        with _warnings.catch_warnings():
+            _warnings.simplefilter('ignore')  # numpy warns about ragged nested sequences
+            try:
+                _shared_processing.update_fingerprint(digest, [
+                    function.__module__, function.__qualname__, _library_versions(), settings,
+                    dict(arguments.arguments)], strict=True)
+            except TypeError:
+                return None
+        return digest.hexdigest()
+
+    def _filepath(self, key, data_format):
+        return _os.path.join(self.directory, '{}.{}'.format(key, data_format))
+
+    def _read(self, key, data_format):
+        filepath = self._filepath(key, data_format)
+        try:
+            with open(filepath, 'rb') as file_handle:
+                binary_data = file_handle.read()
+            _os.utime(filepath)  # modification time marks the last use for LRU eviction
+        except OSError:
+            return None  # not cached or removed in the meantime by another process
+        return binary_data
+
+    def _write(self, key, data_format, binary_data):
+        """Write a file atomically by renaming a completely written temporary file."""
+        file_descriptor, temp_filepath = _tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with _os.fdopen(file_descriptor, 'wb') as file_handle:
+                file_handle.write(binary_data)
+            _os.replace(temp_filepath, self._filepath(key, data_format))
+        except BaseException:
+            _remove(temp_filepath)
+            raise
+        with self._lock:
+            self._size_bytes += len(binary_data)
+            exceeded = self.max_mb is not None and self._size_bytes > self.max_mb * 1e6
+        if exceeded:
+            self._evict()
+
+    def _evict(self):
+        """Remove least recently used files until the total size is below the limit."""
+        entries = sorted(self._scan(), key=lambda entry: entry[1])
+        size_bytes = sum(size for _, _, size in entries)
+        for filepath, _, size in entries:
+            if size_bytes <= self.max_mb * 1e6:
+                break
+            _remove(filepath)
+            size_bytes -= size
+        with self._lock:
+            self._size_bytes = size_bytes
+
+    def _scan(self):
+        """List path, last use and size of each stored file, ignoring unfinished ones."""
+        entries = []
+        for entry in _os.scandir(self.directory):
+            if entry.name.startswith('.'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((entry.path, stat.st_mtime, stat.st_size))
+        return entries
+
+
+def _render(fig, data_format):
+    """Create the representation of a figure in a format as bytes."""
+    if data_format == 'html':
+        if hasattr(fig, 'html_text_standalone'):
+            text = fig.html_text_standalone
+        else:
+            text = fig.html_text
+    elif data_format == 'json' and hasattr(fig, 'json_text'):
+        text = fig.json_text
+    elif data_format == 'svg' and hasattr(fig, 'svg_text'):
+        text = fig.svg_text
+    elif hasattr(fig, '_to_binary_data'):
+        return fig._to_binary_data(data_format)
+    else:
+        message = 'Format "{}" is not available for a figure of type {}.'.format(
+            data_format, type(fig).__module__)
+        raise ValueError(message)
+    return text.encode('utf-8')
+
+
+def _library_versions():
+    return [getattr(_sys.modules.get(name), '__version__', None) for name in _LIBRARIES]
+
+
+def _remove(filepath):
+    try:
+        _os.remove(filepath)
+    except OSError:
+        pass
@@ -1,5 +1,6 @@
 """Data structures for representing JavaScript plots."""
 
+import os as _os
 import random as _random
 import string as _string
 
@@ -17,8 +18,14 @@ except ImportError:
 class Figure:
     """Data structure for wrapping, displaying and exporting a JavaScript figure."""
 
+    # class variable to load the code of each library into a Jupyter notebook once per kernel
+    # session, not for each plot: digests of the assets that were already sent to the notebook
+    _notebook_assets = set()
+
     def __init__(self, html_template):
         """Initialize a figure with a partly filled HTML template containing a visualization."""
+        if not isinstance(html_template, _template_system.Template):
+            html_template = _template_system.Template(html_template)
         self._html_template = html_template
 
     # IPython integration
@@ -31,7 +38,39 @@ class Figure:
         - https://ipython.readthedocs.io/en/stable/api/generated/IPython.core.formatters.html#IPython.core.formatters.HTMLFormatter
 
         """
-        return self.html_text_partial
+        return self._html_text_notebook()
+
+    def _html_text_notebook(self):
+        """Create a HTML text that contains only the libraries not yet loaded into the notebook.
+
+        The first plot that needs a library defines it as module of require.js in the browser,
+        all later plots of the kernel session only contain their data and the code to use it.
+        Caution: If the output cell that defined a library is cleared and the page reloaded,
+        the plots in later cells can not find it anymore, similar to Plotly in notebooks.
+
+        """
+        registered = self.__class__._notebook_assets
+        require = _template_system.load_asset('third_party/require/require.min.js')
+        new_assets = set()
+
+        def include_new_asset(value):
+            if isinstance(value, _template_system.Asset):
+                if value.digest in registered or value.digest in new_assets:
+                    return ''
+                new_assets.add(value.digest)
+            return value
+
+        template = self._html_template.map_values(include_new_asset)
+        data = {
+            'RANDOM_ID': self._generate_random_id(),
+            'PREFIX': '',
+            'LOAD_REQUIRE': '' if require.digest in registered else require.text,
+            'SUFFIX': '',
+        }
+        html_text = template.render(data)
+        registered.update(new_assets)
+        registered.add(require.digest)
+        return html_text
 
     # Display in browser or notebook
     def display(self, inline=False):
@@ -44,7 +83,7 @@ class Figure:
 
         """
         if inline:
-            _display(_HTML(self.html_text_partial))
+            _display(_HTML(self._html_text_notebook()))
         else:
             _operating_system.open_html_text_in_webbrowser(self.html_text_standalone)
 
@@ -57,19 +96,7 @@ class Figure:
     @property
     def html_text_standalone(self):
         """Create a standalone HTML text representation that has all javascript code embedded."""
-        data = {
-            'RANDOM_ID': self._generate_random_id(),
-            'PREFIX': """<!DOCTYPE html>
-<html>
-<head>
-  <meta charset="utf-8">
-</head>
-<body style="margin:0;">""",
-            'LOAD_REQUIRE': _template_system.load('third_party/require/require.min.js'),
-            'SUFFIX': """</body>
-</html>""",
-        }
-        html_text = _template_system.insert(self._html_template, data)
+        html_text = self._html_template.render(self._standalone_data())
         return html_text
 
     @property
@@ -82,11 +109,11 @@ class Figure:
             'LOAD_REQUIRE': _template_system.load('third_party/require/require.min.js'),
             'SUFFIX': '',
         }
-        html_text = _template_system.insert(self._html_template, data)
+        html_text = self._html_template.render(data)
         return html_text
 
     # Export as HTML file (interactive)
-    def export_html(self, filepath):
+    def export_html(self, filepath, assets='inline', asset_directory=None):
         """Export the plot as HTML file.
 
         Parameters
@@ -96,6 +123,18 @@ class Figure:
             If the file exists it will be overwritten without warning.
             If the path does not end with ".html" it will be changed to do so.
             If the parent directory does not exist it will be created.
+        assets : str
+            Possible values: "inline", "directory".
+            If "inline", the code of all required JavaScript libraries is embedded in the
+            HTML file, so that it is fully self-contained.
+            If "directory", each library is written only once into a shared directory, with
+            a hash of its content in the filename, and the HTML file refers to it with a
+            relative script tag. This considerably reduces the total size when many plots
+            are exported. Both variants work offline, but in the second one the HTML file
+            and the asset directory need to be moved together.
+        asset_directory : str
+            Directory for the library files if assets is "directory".
+            If None, a directory named "assets" next to the HTML file is used.
 
         Returns
         -------
@@ -105,12 +144,54 @@ class Figure:
         """
         # Precondition
         used_filepath = _operating_system.ensure_file_extension(filepath, 'html')
+        _operating_system.ensure_parent_directory(used_filepath)
 
         # Transformation
-        with open(used_filepath, 'w') as file_handle:
-            file_handle.write(self.html_text)
+        if assets == 'inline':
+            data = self._standalone_data()
+        elif assets == 'directory':
+            if asset_directory is None:
+                asset_directory = _os.path.join(
+                    _operating_system.get_parent_directory(used_filepath), 'assets')
+            script_tags = self._write_assets(asset_directory, used_filepath)
+            data = self._standalone_data(head=script_tags)
+            data['LOAD_REQUIRE'] = ''
+        else:
+            message = 'Value "{}" for assets is invalid. Possible values: {}'.format(
+                assets, ['inline', 'directory'])
+            raise ValueError(message)
+        inline_assets = assets == 'inline'
+        with open(used_filepath, 'w', encoding='utf-8') as file_handle:
+            self._html_template.write(file_handle, data, inline_assets)
         return used_filepath
 
+    def _write_assets(self, asset_directory, html_filepath):
+        require = _template_system.load_asset('third_party/require/require.min.js')
+        script_tags = []
+        unique_assets = {asset.digest: asset for asset in [require] + self._html_template.assets}
+        for asset in unique_assets.values():
+            asset_filepath = _operating_system.write_content_addressed_file(
+                asset.text, asset_directory, asset.name, 'js', asset.digest)
+            url = _operating_system.get_relative_url(asset_filepath, html_filepath)
+            script_tag = '  <script charset="utf-8" type="text/javascript" src="{}"></script>'
+            script_tags.append(script_tag.format(url))
+        return ''.join(tag + '\n' for tag in script_tags)
+
+    def _standalone_data(self, head=''):
+        data = {
+            'RANDOM_ID': self._generate_random_id(),
+            'PREFIX': """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+{}</head>
+<body style="margin:0;">""".format(head),
+            'LOAD_REQUIRE': _template_system.load('third_party/require/require.min.js'),
+            'SUFFIX': """</body>
+</html>""",
+        }
+        return data
+
     @staticmethod
     def _generate_random_id(length=32):
         symbols = _string.ascii_letters + _string.digits
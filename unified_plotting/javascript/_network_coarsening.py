@@ -0,0 +1,198 @@
+"""Coarsening of large graphs into communities that network plots show as single nodes."""
+
+import math as _math
+
+import numpy as _np
+import scipy.sparse as _sparse
+import scipy.sparse.csgraph as _csgraph
+
+
+_MAX_ITERATIONS = 20
+
+
+def partition(num_nodes, sources, targets, max_groups):
+    """Divide the nodes of a graph into at most max_groups groups of densely connected nodes.
+
+    Communities are found by label propagation on a sparse adjacency matrix. If there are
+    still too many, the graph of communities is partitioned in the same way, and so on.
+    Where label propagation makes too little progress, e.g. for sparse or fragmented graphs,
+    each community with fewer than num_nodes / max_groups nodes is merged into the community
+    it shares the most edges with. Communities without edges to others, e.g. isolated nodes,
+    are collected in buckets of similar size instead. If one community contains most nodes,
+    the graph is instead split into chunks of nodes that are close to each other in the
+    reverse Cuthill–McKee order, so that each level of groups is considerably smaller.
+
+    Parameters
+    ----------
+    num_nodes : int
+        Number of nodes, which needs to be larger than max_groups.
+    sources, targets : array of int
+        Position of the source and target node of each edge.
+    max_groups : int
+        Maximum number of groups, at least 2.
+
+    Returns
+    -------
+    labels : array of int
+        Group of each node, numbered from 0.
+    num_groups : int
+
+    """
+    labels = _np.arange(num_nodes)
+    num_groups = num_nodes
+    group_sources, group_targets = sources, targets
+    group_weights = _np.ones(len(sources))
+    target_size = int(_math.ceil(num_nodes / max_groups))
+    while num_groups > max_groups:
+        group_labels = _label_propagation(num_groups, group_sources, group_targets, group_weights)
+        if group_labels.max() + 1 > num_groups / 2:
+            group_labels = _merge_small_communities(
+                group_labels, group_sources, group_targets, group_weights,
+                _np.bincount(labels, minlength=num_groups), target_size)
+        num_new_groups = int(group_labels.max()) + 1
+        labels = group_labels[labels]
+        group_sources, group_targets, group_weights = aggregate_edges(
+            group_labels, group_sources, group_targets, group_weights)
+        num_groups = num_new_groups
+    if _np.bincount(labels).max() > num_nodes / 2:
+        num_groups = min(max_groups, max(2, int(_math.ceil(num_nodes / max_groups))))
+        adjacency = _sparse.csr_matrix(
+            (_np.ones(len(sources)), (sources, targets)), shape=(num_nodes, num_nodes))
+        order = _csgraph.reverse_cuthill_mckee(adjacency + adjacency.T, symmetric_mode=True)
+        labels = _np.empty(num_nodes, dtype=_np.int64)
+        labels[order] = _np.arange(num_nodes) * num_groups // num_nodes
+    return labels, num_groups
+
+
+def aggregate_edges(labels, sources, targets, weights=None):
+    """Combine the edges between each pair of groups into one undirected weighted edge.
+
+    Edges within a group are dropped. The weight of a combined edge is the sum of the weights
+    of its edges, by default their number.
+
+    """
+    if weights is None:
+        weights = _np.ones(len(sources))
+    first = labels[sources]
+    second = labels[targets]
+    is_between = first != second
+    lower = _np.minimum(first, second)[is_between]
+    upper = _np.maximum(first, second)[is_between]
+    num_labels = int(labels.max()) + 1 if len(labels) else 0
+    keys, inverse = _np.unique(lower * num_labels + upper, return_inverse=True)
+    summed_weights = _np.bincount(inverse, weights[is_between], len(keys))
+    return keys // num_labels, keys % num_labels, summed_weights
+
+
+def _merge_small_communities(labels, sources, targets, weights, node_sizes, target_size):
+    """Merge each community with fewer than target_size nodes along the edges of the graph.
+
+    A small community is merged into the community it shares the most edge weight with,
+    unless other communities are merged into it, so that merges do not chain along paths.
+    Small communities without edges to others are sorted by size and collected in buckets of
+    those that start within target_size nodes of each other, so that a bucket has fewer than
+    twice target_size nodes. Each call reduces the number of communities if at least two of
+    them are small, which is always the case while there are more than
+    num_nodes / target_size.
+
+    Parameters
+    ----------
+    labels : array of int
+        Community of each node of the graph, numbered from 0.
+    sources, targets, weights : array
+        Edges of the graph.
+    node_sizes : array of int
+        Number of original nodes represented by each node of the graph.
+    target_size : int
+        Number of original nodes a community needs to have to be left unchanged.
+
+    Returns
+    -------
+    labels : array of int
+        Merged community of each node of the graph, numbered from 0.
+
+    """
+    num_communities = int(labels.max()) + 1
+    sizes = _np.bincount(labels, node_sizes, num_communities)
+    lower, upper, summed_weights = aggregate_edges(labels, sources, targets, weights)
+    adjacency = _sparse.csr_matrix(
+        (_np.concatenate([summed_weights, summed_weights]),
+         (_np.concatenate([lower, upper]), _np.concatenate([upper, lower]))),
+        shape=(num_communities, num_communities))
+    communities = _np.arange(num_communities)
+    strongest_neighbors = _row_argmax(adjacency, communities, _np.random.RandomState(0))
+    is_small = sizes < target_size
+    is_isolated = _np.diff(adjacency.indptr) == 0
+
+    # Links from small communities to the one they are merged with. A community that others
+    # are merged into keeps its own link only if it is the lower one of a mutual pair, which
+    # prevents long chains of merges that would join unrelated parts of the graph.
+    is_linking = is_small & ~is_isolated
+    is_target = _np.zeros(num_communities, dtype=bool)
+    is_target[strongest_neighbors[is_linking]] = True
+    is_mutual = strongest_neighbors[strongest_neighbors] == communities
+    keeps_link = is_linking & (
+        ~is_target | (is_mutual & (communities < strongest_neighbors)))
+    if is_linking.any() and not keeps_link.any():
+        keeps_link[_np.flatnonzero(is_linking)[0]] = True  # cycle of equally strong edges
+    merged = _np.flatnonzero(keeps_link)
+    link_sources = [merged]
+    link_targets = [strongest_neighbors[merged]]
+    isolated = _np.flatnonzero(is_small & is_isolated)
+    isolated = isolated[_np.argsort(sizes[isolated], kind='stable')]
+    starts = _np.cumsum(sizes[isolated]) - sizes[isolated]
+    buckets = (starts // target_size).astype(_np.int64)
+    link_sources.append(isolated)
+    link_targets.append(isolated[_np.searchsorted(buckets, buckets)])
+
+    # Communities that are connected by links form a merged community
+    link_sources = _np.concatenate(link_sources)
+    links = _sparse.csr_matrix(
+        (_np.ones(len(link_sources)), (link_sources, _np.concatenate(link_targets))),
+        shape=(num_communities, num_communities))
+    _, merged_labels = _csgraph.connected_components(links, directed=False)
+    return merged_labels[labels]
+
+
+def _label_propagation(num_nodes, sources, targets, weights):
+    """Find communities by letting each node adopt the label with most weight among its neighbors.
+
+    Only a random half of the nodes is updated in each round, which prevents labels from
+    oscillating between two sets of nodes. Ties are broken randomly.
+
+    """
+    rng = _np.random.RandomState(0)
+    adjacency = _sparse.csr_matrix(
+        (_np.concatenate([weights, weights]),
+         (_np.concatenate([sources, targets]), _np.concatenate([targets, sources]))),
+        shape=(num_nodes, num_nodes))
+    node_indices = _np.arange(num_nodes)
+    labels = node_indices.copy()
+    for _ in range(_MAX_ITERATIONS):
+        membership = _sparse.csr_matrix(
+            (_np.ones(num_nodes), (node_indices, labels)), shape=(num_nodes, num_nodes))
+        label_weights = (adjacency @ membership).tocsr()
+        best_labels = _row_argmax(label_weights, labels, rng)
+        wants_change = best_labels != labels
+        if not wants_change.any():
+            break
+        is_changed = wants_change & (rng.random_sample(num_nodes) < 0.5)
+        labels[is_changed] = best_labels[is_changed]
+    return _np.unique(labels, return_inverse=True)[1]
+
+
+def _row_argmax(matrix, default, rng):
+    """Get the column of the largest entry in each row of a CSR matrix, ties broken randomly."""
+    result = default.copy()
+    row_counts = _np.diff(matrix.indptr)
+    is_nonempty = row_counts > 0
+    if not is_nonempty.any():
+        return result
+    values = matrix.data * (1.0 + 1e-9 * rng.random_sample(len(matrix.data)))
+    row_maxima = _np.maximum.reduceat(values, matrix.indptr[:-1][is_nonempty])
+    rows = _np.repeat(_np.arange(matrix.shape[0]), row_counts)
+    row_max_per_entry = _np.repeat(row_maxima, row_counts[is_nonempty])
+    best_entries = _np.flatnonzero(values == row_max_per_entry)
+    best_rows, first = _np.unique(rows[best_entries], return_index=True)
+    result[best_rows] = matrix.indices[best_entries[first]]
+    return result
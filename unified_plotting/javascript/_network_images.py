@@ -0,0 +1,51 @@
+"""Reduction of node images of network plots before they are embedded."""
+
+import base64 as _stdlib_base64
+import functools as _functools
+import io as _io
+import re as _re
+
+try:
+    from PIL import Image as _pil_image
+except ImportError:
+    _pil_image = None
+
+from ..utilities import base64 as _base64
+
+
+# Raster formats that can be reduced, GIF is excluded to keep animations
+_DATA_URL_PATTERN = _re.compile(r'data:image/(png|jpeg|jpg|webp|bmp);base64,(.*)', _re.DOTALL)
+_SAVED_FORMATS = {'png': 'png', 'jpeg': 'jpeg', 'jpg': 'jpeg', 'webp': 'webp', 'bmp': 'png'}
+
+
+def is_downscaling_available():
+    """Check if the package Pillow, which is required for downscaling images, is installed."""
+    return _pil_image is not None
+
+
+@_functools.lru_cache(maxsize=256)
+def downscale_data_url(url, max_pixels):
+    """Reduce a raster image in a data URL so that its larger side has at most max_pixels.
+
+    Other URLs, vector graphics, images that are small enough and images that can not be
+    decoded are returned unchanged, as well as images whose reduced form would be larger.
+
+    """
+    match = _DATA_URL_PATTERN.fullmatch(url.strip())
+    if match is None:
+        return url
+    data_format = _SAVED_FORMATS[match.group(1)]
+    try:
+        image = _pil_image.open(_io.BytesIO(_stdlib_base64.b64decode(match.group(2))))
+        if max(image.size) <= max_pixels:
+            return url
+        image.thumbnail((max_pixels, max_pixels), _pil_image.LANCZOS)
+        if data_format == 'jpeg' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        buffer = _io.BytesIO()
+        image.save(buffer, format=data_format.upper())
+    except Exception:
+        return url
+    base64_text = _base64.binary_data_to_base64_text(buffer.getvalue())
+    new_url = _base64.base64_text_to_data_url(base64_text, data_format)
+    return new_url if len(new_url) < len(url) else url
@@ -0,0 +1,538 @@
+"""Force-directed layouts of network plots computed in Python before embedding the data."""
+
+import itertools as _itertools
+import math as _math
+
+import numpy as _np
+from scipy.spatial import cKDTree as _cKDTree
+
+from .. import _logging
+
+
+# Defaults of d3-force and vis.js that are not exposed as arguments of the plots
+_D3_ALPHA_DECAY = 1.0 - 0.001 ** (1.0 / 300.0)
+_D3_INITIAL_RADIUS = 10.0
+_VIS_TIMESTEP = 0.5
+_VIS_MAX_VELOCITY = 50.0
+_VIS_MIN_VELOCITY = 0.1
+
+# Grid of the many-body approximation: deepest level and nodes per cell at the finest level
+_MAX_DEPTH = 16
+_TARGET_OCCUPANCY = 4.0
+
+
+def d3_force_layout(num_nodes, sources, targets, fixed_positions=None, num_dimensions=2,
+                    many_body_strength=-70.0, many_body_theta=0.9,
+                    many_body_min_distance=None, many_body_max_distance=None,
+                    links_distance=50.0, links_strength=0.5,
+                    collision_radius=None, collision_strength=0.7,
+                    positioning_strengths=None, use_centering=True,
+                    velocity_decay=0.4, alpha_min=None):
+    """Compute node positions with the force simulation of d3-force.
+
+    Each force follows its definition in d3-force and is scaled by the same cooling schedule,
+    but it is applied to all nodes at once with numpy operations. The many-body force is
+    approximated as described in :func:`_many_body_forces`.
+
+    Parameters
+    ----------
+    num_nodes : int
+        Number of nodes.
+    sources, targets : array of int
+        Position of the source and target node of each edge.
+    fixed_positions : array of float with shape (num_nodes, num_dimensions), optional
+        Coordinates at which nodes are fixed, NaN for coordinates that are free.
+    num_dimensions : int
+        2 for d3.js or 3 for 3d-force-graph.
+    many_body_strength : float or None
+        Strength of the many-body force per node. None means that the force is not used.
+    links_strength : float or None
+        Strength of the links force, which is divided by the smaller number of edges of
+        both nodes as in the plots. None means that the force is not used.
+    collision_radius : float or None
+        Radius of each node in the collision force. None means that the force is not used.
+    positioning_strengths : list of float or None, optional
+        Strength of the force towards 0.0 along each axis, None for an unused axis.
+    alpha_min : float, optional
+        Value of alpha at which the simulation stops, which determines the number of ticks.
+        Default: the value the plots use for the initial layout of this number of nodes.
+
+    Returns
+    -------
+    positions : array of float with shape (num_nodes, num_dimensions)
+
+    """
+    positions, fixed, is_fixed = _initial_positions(num_nodes, num_dimensions, fixed_positions)
+    velocities = _np.zeros_like(positions)
+    rng = _np.random.RandomState(0)
+    links = _Links(num_nodes, sources, targets)
+    if positioning_strengths is None:
+        positioning_strengths = []
+    if alpha_min is None:
+        alpha_min = _d3_alpha_min(num_nodes)
+
+    num_ticks = int(_math.ceil(_math.log(alpha_min) / _math.log(1.0 - _D3_ALPHA_DECAY)))
+    alpha = 1.0
+    for _ in range(num_ticks):
+        alpha -= alpha * _D3_ALPHA_DECAY
+        # Forces in the order in which the plots register them
+        if use_centering:
+            positions -= positions.mean(axis=0)
+        if collision_radius is not None:
+            _apply_collision_force(positions, velocities, collision_radius, collision_strength,
+                                   rng)
+        if links_strength is not None:
+            links.apply_d3_force(positions, velocities, alpha, links_distance, links_strength,
+                                 rng)
+        if many_body_strength is not None:
+            velocities += alpha * _many_body_forces(
+                positions, many_body_strength, 1, many_body_theta,
+                many_body_min_distance, many_body_max_distance, rng)
+        for axis, strength in enumerate(positioning_strengths):
+            if strength is not None:
+                velocities[:, axis] -= positions[:, axis] * strength * alpha
+        # Movement with friction, fixed nodes stay in place
+        velocities *= 1.0 - velocity_decay
+        positions += velocities
+        positions[is_fixed] = fixed[is_fixed]
+        velocities[is_fixed] = 0.0
+    return positions
+
+
+def vis_force_layout(num_nodes, sources, targets, fixed_positions=None,
+                     gravitational_constant=-2000.0, central_gravity=0.1, spring_length=70.0,
+                     spring_constant=0.01, damping=0.25, max_iterations=None):
+    """Compute node positions with the Barnes–Hut solver of vis.js.
+
+    Nodes repel each other with a force that falls off with the squared distance, connected
+    nodes are pulled together by springs and all nodes are pulled towards the origin.
+    The simulation stops after a maximum number of iterations or when all nodes come to rest.
+
+    Parameters
+    ----------
+    num_nodes : int
+        Number of nodes.
+    sources, targets : array of int
+        Position of the source and target node of each edge.
+    fixed_positions : array of float with shape (num_nodes, 2), optional
+        Coordinates at which nodes are fixed, NaN for coordinates that are free.
+    spring_constant : float
+        Spring constant as passed to vis.js, which is a tenth of the plot argument.
+    max_iterations : int, optional
+        Maximum number of simulation steps.
+        Default: the number the plots use for the initial layout of this number of nodes.
+
+    Returns
+    -------
+    positions : array of float with shape (num_nodes, 2)
+
+    """
+    positions, fixed, is_fixed = _initial_positions(num_nodes, 2, fixed_positions)
+    velocities = _np.zeros_like(positions)
+    rng = _np.random.RandomState(0)
+    links = _Links(num_nodes, sources, targets)
+    if max_iterations is None:
+        max_iterations = _vis_iterations(num_nodes)
+
+    for _ in range(max_iterations):
+        forces = _many_body_forces(
+            positions, gravitational_constant, 2, 0.5, None, None, rng)
+        distances = _np.sqrt((positions ** 2).sum(axis=1, keepdims=True))
+        forces -= central_gravity * positions / _np.maximum(distances, 1e-9)
+        links.add_vis_spring_forces(positions, forces, spring_length, spring_constant)
+        # Movement with damping and bounded velocity, fixed nodes stay in place
+        velocities += (forces - damping * velocities) * _VIS_TIMESTEP
+        _np.clip(velocities, -_VIS_MAX_VELOCITY, _VIS_MAX_VELOCITY, out=velocities)
+        velocities[is_fixed] = 0.0
+        positions += velocities * _VIS_TIMESTEP
+        positions[is_fixed] = fixed[is_fixed]
+        if num_nodes == 0 or _np.abs(velocities).max() < _VIS_MIN_VELOCITY:
+            break
+    return positions
+
+
+def library_layout(library, num_nodes, sources, targets, num_dimensions=2):
+    """Compute node positions with the default force-directed layout of a graph library.
+
+    Parameters
+    ----------
+    library : str
+        "igraph" for its DrL layout or "graph_tool" for its SFDP layout, which is
+        two-dimensional and placed in the plane z=0 for three dimensions.
+    num_nodes : int
+        Number of nodes.
+    sources, targets : array of int
+        Position of the source and target node of each edge.
+    num_dimensions : int
+        2 or 3.
+
+    Returns
+    -------
+    positions : array of float with shape (num_nodes, num_dimensions), or None if the library
+        is not installed.
+
+    """
+    edges = _np.column_stack([sources, targets]).astype(_np.int64)
+    try:
+        if library == 'igraph':
+            import igraph
+            graph = igraph.Graph(n=num_nodes, edges=edges.tolist())
+            positions = _np.array(graph.layout_drl(dim=num_dimensions).coords, dtype=float)
+        elif library == 'graph_tool':
+            import graph_tool.all as gt
+            graph = gt.Graph(directed=False)
+            graph.add_vertex(num_nodes)
+            graph.add_edge_list(edges)
+            positions = gt.sfdp_layout(graph).get_2d_array([0, 1]).T
+            if num_dimensions == 3:
+                positions = _np.column_stack([positions, _np.zeros(num_nodes)])
+        else:
+            message = 'Unknown graph library "{}".'.format(library)
+            raise ValueError(message)
+    except ImportError:
+        return None
+    return positions.reshape(num_nodes, num_dimensions)
+
+
+def scale_to_edge_length(positions, sources, targets, edge_length):
+    """Scale positions around their center so that the median edge length has a given value."""
+    positions = positions - positions.mean(axis=0)
+    is_loop = sources == targets
+    lengths = _np.sqrt(((positions[sources] - positions[targets]) ** 2).sum(axis=1))[~is_loop]
+    median_length = _np.median(lengths) if len(lengths) else 0.0
+    if median_length > 0.0:
+        positions *= edge_length / median_length
+    return positions
+
+
+def report_missing_layout_library(library):
+    """Warn that a graph library for layout precomputation is not installed."""
+    message = ('The layout of "{}" is not available because the library is not installed. '
+               'The Barnes–Hut layout is used instead.'.format(library))
+    _logging.warn_user(message)
+
+
+def _d3_alpha_min(num_nodes):
+    """Get the alpha at which the plots stop the initial layout of a large network."""
+    if num_nodes >= 25000:
+        return 0.03
+    if num_nodes >= 10000:
+        return 0.02
+    if num_nodes >= 5000:
+        return 0.01
+    return 0.001
+
+
+def _vis_iterations(num_nodes):
+    """Get the number of stabilization iterations of the plots for a large network."""
+    if num_nodes >= 25000:
+        return 100
+    if num_nodes >= 10000:
+        return 300
+    if num_nodes >= 5000:
+        return 400
+    if num_nodes >= 2000:
+        return 500
+    if num_nodes >= 1000:
+        return 600
+    return 800
+
+
+class _Links:
+    """Edges between distinct nodes with the link strength and bias of the plots."""
+
+    def __init__(self, num_nodes, sources, targets):
+        sources = _np.asarray(sources, dtype=_np.int64)
+        targets = _np.asarray(targets, dtype=_np.int64)
+        is_loop = sources == targets
+        self.num_nodes = num_nodes
+        self.sources = sources[~is_loop]
+        self.targets = targets[~is_loop]
+        counts = (_np.bincount(self.sources, minlength=num_nodes)
+                  + _np.bincount(self.targets, minlength=num_nodes)).astype(float)
+        source_counts = counts[self.sources]
+        target_counts = counts[self.targets]
+        self.bias = source_counts / _np.maximum(source_counts + target_counts, 1.0)
+        self.connectivity = _np.minimum(source_counts, target_counts)
+
+    def apply_d3_force(self, positions, velocities, alpha, distance, strength, rng):
+        """Move connected nodes towards the preferred distance like d3.forceLink."""
+        if len(self.sources) == 0:
+            return
+        deltas = (positions[self.targets] + velocities[self.targets]
+                  - positions[self.sources] - velocities[self.sources])
+        lengths = _lengths_with_jiggle(deltas, rng)
+        factors = (lengths - distance) / lengths * alpha * 2.0 * strength / self.connectivity
+        deltas *= factors[:, None]
+        _add_at(velocities, self.targets, -deltas * self.bias[:, None])
+        _add_at(velocities, self.sources, deltas * (1.0 - self.bias[:, None]))
+
+    def add_vis_spring_forces(self, positions, forces, spring_length, spring_constant):
+        """Add the forces of springs between connected nodes like the spring solver of vis.js."""
+        if len(self.sources) == 0:
+            return
+        deltas = positions[self.sources] - positions[self.targets]
+        lengths = _np.maximum(_np.sqrt((deltas ** 2).sum(axis=1)), 0.01)
+        deltas *= (spring_constant * (spring_length - lengths) / lengths)[:, None]
+        _add_at(forces, self.sources, deltas)
+        _add_at(forces, self.targets, -deltas)
+
+
+def _initial_positions(num_nodes, num_dimensions, fixed_positions):
+    """Place free nodes in the phyllotaxis arrangement of d3-force and fixed ones in place."""
+    indices = _np.arange(num_nodes, dtype=float)
+    roll_angles = indices * _math.pi * (3.0 - _math.sqrt(5.0))
+    if num_dimensions == 2:
+        radii = _D3_INITIAL_RADIUS * _np.sqrt(indices)
+        positions = _np.column_stack([radii * _np.cos(roll_angles), radii * _np.sin(roll_angles)])
+    else:
+        yaw_angles = indices * _math.pi * 20.0 / (9.0 + _math.sqrt(221.0))
+        radii = _D3_INITIAL_RADIUS * _np.cbrt(indices)
+        positions = _np.column_stack([radii * _np.cos(roll_angles), radii * _np.sin(roll_angles),
+                                      radii * _np.sin(yaw_angles)])
+    if fixed_positions is None:
+        fixed = _np.full(positions.shape, _np.nan)
+    else:
+        fixed = _np.asarray(fixed_positions, dtype=float).reshape(positions.shape)
+    is_fixed = ~_np.isnan(fixed)
+    positions[is_fixed] = fixed[is_fixed]
+    return positions, fixed, is_fixed
+
+
+def _apply_collision_force(positions, velocities, radius, strength, rng):
+    """Push overlapping nodes apart like d3.forceCollide with a uniform radius."""
+    predicted = positions + velocities
+    pairs = _cKDTree(predicted).query_pairs(2.0 * radius, output_type='ndarray')
+    if len(pairs) == 0:
+        return
+    first, second = pairs[:, 0], pairs[:, 1]
+    deltas = predicted[first] - predicted[second]
+    lengths = _lengths_with_jiggle(deltas, rng)
+    deltas *= ((2.0 * radius - lengths) / lengths * strength * 0.5)[:, None]
+    _add_at(velocities, first, deltas)
+    _add_at(velocities, second, -deltas)
+
+
+def _many_body_forces(positions, strength, exponent, theta, min_distance, max_distance, rng):
+    """Approximate the sum of the forces between all pairs of nodes.
+
+    Each node acts on each other node with a force ``strength * d / |d| ** (exponent + 1)``
+    along their difference vector d, i.e. a negative strength leads to repulsion.
+
+    As in the Barnes–Hut algorithm, distant nodes are grouped into cells that act with their
+    total strength from their center of mass. The cells come from a grid that is refined level
+    by level until it contains few nodes per cell. Nodes in neighboring cells at the finest
+    level interact directly. On each level, a cell interacts with the cells that are not its
+    neighbors but children of the neighbors of its parent. As in the fast multipole method,
+    the field of these cells is expanded to first order around the center of mass of the
+    cell and passed on to its children, which keeps the error small for all of its nodes.
+    This replaces the traversal of a tree per node by a few numpy operations per level.
+
+    The opening angle theta determines how many cells count as neighbors in each direction.
+
+    """
+    num_nodes, num_dimensions = positions.shape
+    forces = _np.zeros_like(positions)
+    if num_nodes < 2:
+        return forces
+    neighbor_radius = 1 if theta >= 0.5 else 2
+    min_distance = 0.0 if min_distance is None else float(min_distance)
+    max_distance = _np.inf if max_distance is None else float(max_distance)
+
+    # Integer coordinates of each node on the finest possible grid
+    lower = positions.min(axis=0)
+    extent = float((positions.max(axis=0) - lower).max())
+    if not extent > 0.0:
+        extent = 1.0
+    num_finest_cells = 2 ** _MAX_DEPTH
+    grid_coords = ((positions - lower) * (num_finest_cells / extent)).astype(_np.int64)
+    _np.clip(grid_coords, 0, num_finest_cells - 1, out=grid_coords)
+
+    # Far field: expansion of each cell, passed on from parents to children
+    parent_cells = parent_field = parent_gradient = None
+    for level in range(1, _MAX_DEPTH + 1):
+        cells = _Cells(positions, grid_coords >> (_MAX_DEPTH - level), level)
+        field, gradient = _far_field_expansion(
+            cells, strength, exponent, neighbor_radius, max_distance)
+        if parent_cells is not None:
+            parents = parent_cells.find(cells.coords >> 1)
+            shifts = cells.centers - parent_cells.centers[parents]
+            field += parent_field[parents] + _np.einsum(
+                'cij,cj->ci', parent_gradient[parents], shifts)
+            gradient += parent_gradient[parents]
+        if num_nodes / cells.num_cells <= _TARGET_OCCUPANCY:
+            break
+        parent_cells, parent_field, parent_gradient = cells, field, gradient
+    node_offsets = positions - cells.centers[cells.node_cells]
+    forces += field[cells.node_cells] + _np.einsum(
+        'nij,nj->ni', gradient[cells.node_cells], node_offsets)
+
+    # Near field: direct interactions at the finest level
+    _add_near_field(forces, positions, cells, strength, exponent, neighbor_radius,
+                    min_distance, max_distance, rng)
+    return forces
+
+
+class _Cells:
+    """Non-empty cells of a grid level with the nodes they contain and their center of mass."""
+
+    def __init__(self, positions, coords, level):
+        num_dimensions = coords.shape[1]
+        self.level = level
+        self.size = 2 ** level
+        keys = _cell_keys(coords, self.size)
+        self.keys, first_indices, self.node_cells, self.counts = _np.unique(
+            keys, return_index=True, return_inverse=True, return_counts=True)
+        self.num_cells = len(self.keys)
+        self.coords = coords[first_indices]
+        self.centers = _np.column_stack([
+            _np.bincount(self.node_cells, positions[:, axis], self.num_cells)
+            for axis in range(num_dimensions)]) / self.counts[:, None]
+
+    def find(self, coords):
+        """Get the index of the cell at each of the given coordinates, or -1 if it is empty."""
+        is_inside = ((coords >= 0) & (coords < self.size)).all(axis=-1)
+        keys = _cell_keys(_np.clip(coords, 0, self.size - 1), self.size)
+        indices = _np.searchsorted(self.keys, keys).clip(0, self.num_cells - 1)
+        return _np.where(is_inside & (self.keys[indices] == keys), indices, -1)
+
+
+def _cell_keys(coords, size):
+    keys = _np.zeros(coords.shape[:-1], dtype=_np.int64)
+    for axis in range(coords.shape[-1]):
+        keys = keys * size + coords[..., axis]
+    return keys
+
+
+def _far_field_expansion(cells, strength, exponent, neighbor_radius, max_distance):
+    """Expand the field of the interaction list of each cell to first order around its center.
+
+    Returns the field at the center of mass of each cell and its derivative with respect to
+    the position.
+
+    """
+    num_dimensions = cells.coords.shape[1]
+    field = _np.zeros((cells.num_cells, num_dimensions))
+    gradient = _np.zeros((cells.num_cells, num_dimensions, num_dimensions))
+    targets, sources = [], []
+    parities = cells.coords & 1
+    for parity, offsets in _interaction_offsets(num_dimensions, neighbor_radius).items():
+        target_cells = _np.flatnonzero((parities == parity).all(axis=1))
+        if len(target_cells) == 0 or len(offsets) == 0:
+            continue
+        source_cells = cells.find(cells.coords[target_cells][:, None, :] + offsets[None, :, :])
+        rows, cols = _np.nonzero(source_cells >= 0)
+        targets.append(target_cells[rows])
+        sources.append(source_cells[rows, cols])
+    if not targets:
+        return field, gradient
+    targets = _np.concatenate(targets)
+    sources = _np.concatenate(sources)
+
+    deltas = cells.centers[sources] - cells.centers[targets]
+    squared_distances = (deltas ** 2).sum(axis=1)
+    masses = strength * cells.counts[sources] * (squared_distances < max_distance ** 2)
+    field_factors = masses / squared_distances ** ((exponent + 1) / 2.0)
+    gradient_factors = (exponent + 1) * field_factors / squared_distances
+    diagonal = _np.bincount(targets, field_factors, cells.num_cells)
+    for axis in range(num_dimensions):
+        field[:, axis] = _np.bincount(targets, field_factors * deltas[:, axis], cells.num_cells)
+        gradient[:, axis, axis] = -diagonal
+        for other_axis in range(axis, num_dimensions):
+            values = _np.bincount(
+                targets, gradient_factors * deltas[:, axis] * deltas[:, other_axis],
+                cells.num_cells)
+            gradient[:, axis, other_axis] += values
+            if other_axis != axis:
+                gradient[:, other_axis, axis] = values
+    return field, gradient
+
+
+def _interaction_offsets(num_dimensions, neighbor_radius):
+    """Get the offsets to the cells in the interaction list, depending on the cell parity.
+
+    A cell at an offset belongs to the interaction list if it is not a neighbor of the cell
+    itself, but the child of a neighbor of its parent.
+
+    """
+    reach = 2 * neighbor_radius + 1
+    candidates = _np.array(list(_itertools.product(
+        range(-reach, reach + 1), repeat=num_dimensions)), dtype=_np.int64)
+    is_neighbor = (_np.abs(candidates) <= neighbor_radius).all(axis=1)
+    result = dict()
+    for parity in _itertools.product([0, 1], repeat=num_dimensions):
+        parent_offsets = (_np.array(parity) + candidates) >> 1
+        is_parent_neighbor = (_np.abs(parent_offsets) <= neighbor_radius).all(axis=1)
+        result[tuple(parity)] = candidates[is_parent_neighbor & ~is_neighbor]
+    return result
+
+
+def _add_near_field(forces, positions, cells, strength, exponent, neighbor_radius,
+                    min_distance, max_distance, rng):
+    """Add the forces between nodes in the same or neighboring cells of the finest level."""
+    num_dimensions = positions.shape[1]
+    # Each unordered pair of neighboring cells once, and each cell with itself
+    offsets = _np.array(list(_itertools.product(
+        range(-neighbor_radius, neighbor_radius + 1), repeat=num_dimensions)), dtype=_np.int64)
+    offsets = offsets[[tuple(offset) > (0,) * num_dimensions for offset in offsets.tolist()]]
+    neighbor_cells = cells.find(cells.coords[:, None, :] + offsets[None, :, :])
+    rows, cols = _np.nonzero(neighbor_cells >= 0)
+    first_cells = _np.concatenate([_np.arange(cells.num_cells), rows])
+    second_cells = _np.concatenate([_np.arange(cells.num_cells), neighbor_cells[rows, cols]])
+
+    # All pairs of nodes from each pair of cells, i.e. for each node in the first cell all
+    # nodes in the second one, or only the following ones if both cells are the same
+    order = _np.argsort(cells.node_cells, kind='stable')
+    starts = _np.cumsum(cells.counts) - cells.counts
+    first_counts = cells.counts[first_cells]
+    first_entries = _np.repeat(_np.arange(len(first_cells)), first_counts)
+    first_local = _ragged_arange(first_counts)
+    is_same_cell = (first_cells == second_cells)[first_entries]
+    second_starts = starts[second_cells][first_entries] + is_same_cell * (first_local + 1)
+    repeats = _np.where(is_same_cell, first_counts[first_entries] - first_local - 1,
+                        cells.counts[second_cells][first_entries])
+    first = _np.repeat(starts[first_cells][first_entries] + first_local, repeats)
+    second = _np.repeat(second_starts, repeats) + _ragged_arange(repeats)
+
+    # Forces between the pairs, computed on coordinates in order of the cells
+    sorted_coords = positions[order].T.copy()
+    deltas = _np.array([coords.take(second) - coords.take(first) for coords in sorted_coords])
+    distances = _np.sqrt((deltas ** 2).sum(axis=0))
+    is_zero = distances == 0.0
+    if is_zero.any():
+        deltas[:, is_zero] = _jiggle(rng, (num_dimensions, is_zero.sum()))
+        distances[is_zero] = _np.sqrt((deltas[:, is_zero] ** 2).sum(axis=0))
+    factors = strength / (distances * _np.maximum(distances, min_distance) ** exponent)
+    factors[distances >= max_distance] = 0.0
+    num_nodes = len(positions)
+    for axis in range(num_dimensions):
+        pair_forces = deltas[axis] * factors
+        forces[order, axis] += (_np.bincount(first, pair_forces, num_nodes)
+                                - _np.bincount(second, pair_forces, num_nodes))
+
+
+def _ragged_arange(counts):
+    """Concatenate the ranges from 0 to each count."""
+    ends = _np.cumsum(counts)
+    return _np.arange(ends[-1] if len(ends) else 0) - _np.repeat(ends - counts, counts)
+
+
+def _lengths_with_jiggle(deltas, rng):
+    """Get the length of each vector, after moving coincident points slightly apart."""
+    lengths = _np.sqrt((deltas ** 2).sum(axis=1))
+    is_zero = lengths == 0.0
+    if is_zero.any():
+        deltas[is_zero] = _jiggle(rng, (is_zero.sum(), deltas.shape[1]))
+        lengths[is_zero] = _np.sqrt((deltas[is_zero] ** 2).sum(axis=1))
+    return lengths
+
+
+def _jiggle(rng, shape):
+    """Get tiny random numbers to separate coincident points, as d3-force does."""
+    return (rng.random_sample(shape) - 0.5) * 1e-6
+
+
+def _add_at(array, indices, values):
+    """Add rows of values to the rows of an array at the given, possibly repeated indices."""
+    for axis in range(array.shape[1]):
+        array[:, axis] += _np.bincount(indices, values[:, axis], len(array))
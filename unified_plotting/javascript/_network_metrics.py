@@ -0,0 +1,290 @@
+"""Graph metrics that network plots can calculate for node and edge size mapping."""
+
+import numpy as _np
+import scipy.sparse as _sparse
+import scipy.sparse.csgraph as _csgraph
+
+
+NODE_METRICS = ('degree', 'in_degree', 'out_degree', 'pagerank', 'betweenness_approx',
+                'core_number')
+EDGE_METRICS = ('betweenness_approx', )
+
+_MAX_BATCH_ENTRIES = 2**22
+_SAMPLING_BUDGET = 2**25
+
+
+def node_metric(name, num_nodes, sources, targets, weights, directed):
+    """Calculate a metric for each node of a graph.
+
+    Parameters
+    ----------
+    name : str
+        One of :data:`NODE_METRICS`.
+    num_nodes : int
+    sources, targets : array of int
+        Position of the source and target node of each edge.
+    weights : array of float
+        Weight of each edge, which is only used by pagerank.
+    directed : bool
+
+    Returns
+    -------
+    values : array of int or float
+
+    """
+    if name == 'degree':
+        return degree(num_nodes, sources, targets, 'all', directed)
+    if name == 'in_degree':
+        return degree(num_nodes, sources, targets, 'in', directed)
+    if name == 'out_degree':
+        return degree(num_nodes, sources, targets, 'out', directed)
+    if name == 'pagerank':
+        return pagerank(num_nodes, sources, targets, weights, directed)
+    if name == 'betweenness_approx':
+        return betweenness_approx(num_nodes, sources, targets, directed)[0]
+    if name == 'core_number':
+        return core_number(num_nodes, sources, targets)
+    message = 'Unknown node metric "{}".'.format(name)
+    raise ValueError(message)
+
+
+def edge_metric(name, num_nodes, sources, targets, weights, directed):
+    """Calculate a metric for each edge of a graph, see :func:`node_metric`."""
+    if name == 'betweenness_approx':
+        return betweenness_approx(num_nodes, sources, targets, directed)[1]
+    message = 'Unknown edge metric "{}".'.format(name)
+    raise ValueError(message)
+
+
+def degree(num_nodes, sources, targets, mode='all', directed=False):
+    """Count the edges of each node, where a self-loop counts twice for the degree.
+
+    In an undirected graph, the in- and out-degree are equal to the degree.
+
+    """
+    in_degrees = _np.bincount(targets, minlength=num_nodes)
+    out_degrees = _np.bincount(sources, minlength=num_nodes)
+    if mode == 'in' and directed:
+        return in_degrees
+    if mode == 'out' and directed:
+        return out_degrees
+    return in_degrees + out_degrees
+
+
+def pagerank(num_nodes, sources, targets, weights=None, directed=False, damping=0.85,
+             tolerance=1e-6, max_iterations=100):
+    """Calculate the PageRank of each node by power iteration on a sparse transition matrix.
+
+    Nodes without outgoing edges distribute their rank evenly to all nodes. Negative weights
+    count as zero. The ranks sum to 1.
+
+    References
+    ----------
+    - L. Page, S. Brin, R. Motwani, T. Winograd: The PageRank citation ranking: Bringing
+      order to the web. Technical report, Stanford InfoLab (1999)
+
+    """
+    if num_nodes == 0:
+        return _np.zeros(0)
+    weights = _np.ones(len(sources)) if weights is None else _np.maximum(weights, 0.0)
+    if not directed:
+        sources, targets = _np.concatenate([sources, targets]), _np.concatenate([targets, sources])
+        weights = _np.tile(weights, 2)
+    out_strengths = _np.bincount(sources, weights, num_nodes)
+    is_used = weights > 0
+    transition = _sparse.csr_matrix(
+        (weights[is_used] / out_strengths[sources[is_used]],
+         (targets[is_used], sources[is_used])), shape=(num_nodes, num_nodes))
+    is_dangling = out_strengths <= 0
+    ranks = _np.full(num_nodes, 1.0 / num_nodes)
+    for _ in range(max_iterations):
+        new_ranks = damping * (transition @ ranks + ranks[is_dangling].sum() / num_nodes)
+        new_ranks += (1.0 - damping) / num_nodes
+        converged = _np.abs(new_ranks - ranks).sum() < num_nodes * tolerance
+        ranks = new_ranks
+        if converged:
+            break
+    return ranks
+
+
+def core_number(num_nodes, sources, targets):
+    """Find the largest k for each node such that it is part of the k-core of the graph.
+
+    The k-core is the largest subgraph in which each node has at least k neighbors. Nodes are
+    peeled off in rounds, where each round only checks the neighbors of the nodes removed
+    before. Directions, self-loops and repeated edges are ignored.
+
+    References
+    ----------
+    - V. Batagelj, M. Zaversnik: An O(m) algorithm for cores decomposition of networks.
+      arXiv:cs/0310049 (2003)
+
+    """
+    adjacency = _symmetric_adjacency(num_nodes, sources, targets)
+    adjacency.data[:] = 1
+    degrees = _np.diff(adjacency.indptr)
+    cores = _np.zeros(num_nodes, dtype=_np.int64)
+    is_removed = _np.zeros(num_nodes, dtype=bool)
+    num_removed = 0
+    k = 0
+    candidates = _np.arange(num_nodes)
+    while num_removed < num_nodes:
+        peeled = candidates[(degrees[candidates] <= k) & ~is_removed[candidates]]
+        if len(peeled) == 0:
+            candidates = _np.flatnonzero(~is_removed)
+            k = int(degrees[candidates].min())
+            continue
+        is_removed[peeled] = True
+        cores[peeled] = k
+        num_removed += len(peeled)
+        neighbors = adjacency.indices[_row_entries(adjacency.indptr, peeled)]
+        candidates, counts = _np.unique(neighbors[~is_removed[neighbors]], return_counts=True)
+        degrees[candidates] -= counts
+    return cores
+
+
+def betweenness_approx(num_nodes, sources, targets, directed=False, num_samples=None, seed=0):
+    """Estimate the betweenness centrality of nodes and edges from a sample of source nodes.
+
+    Brandes' algorithm accumulates the dependencies on shortest paths starting at each
+    sampled node, and the sums are extrapolated to all nodes. The distances are found by
+    breadth-first search for a batch of sources at once, and paths are counted and
+    dependencies accumulated level by level for all of them. Edge weights are ignored. As
+    usual, each pair of nodes of an undirected graph is counted once.
+
+    Parameters
+    ----------
+    num_nodes : int
+    sources, targets : array of int
+        Position of the source and target node of each edge.
+    directed : bool
+    num_samples : int, optional
+        Number of sampled source nodes. By default 64, and fewer for graphs with millions of
+        edges, but at least 16. If it is at least the number of nodes, the result is exact.
+    seed : int
+        Seed of the random choice of source nodes.
+
+    Returns
+    -------
+    node_betweenness, edge_betweenness : array of float
+
+    References
+    ----------
+    - U. Brandes: A faster algorithm for betweenness centrality. Journal of Mathematical
+      Sociology 25 (2), 163-177 (2001) https://doi.org/10.1080/0022250X.2001.9990249
+    - U. Brandes, C. Pich: Centrality estimation in large networks. International Journal of
+      Bifurcation and Chaos 17 (7), 2303-2318 (2007) https://doi.org/10.1142/S0218127407018403
+
+    """
+    num_edges = len(sources)
+    node_values = _np.zeros(num_nodes)
+    edge_values = _np.zeros(num_edges)
+    if num_nodes == 0:
+        return node_values, edge_values
+    tails, heads, arc_edges = sources, targets, _np.arange(num_edges)
+    if not directed:
+        tails, heads = _np.concatenate([sources, targets]), _np.concatenate([targets, sources])
+        arc_edges = _np.tile(arc_edges, 2)
+    is_loop = tails == heads
+    tails, heads, arc_edges = tails[~is_loop], heads[~is_loop], arc_edges[~is_loop]
+    adjacency = _sparse.csr_matrix(
+        (_np.ones(len(tails)), (tails, heads)), shape=(num_nodes, num_nodes))
+    if num_samples is None:
+        num_samples = min(64, max(16, _SAMPLING_BUDGET // (num_nodes + len(tails))))
+    rng = _np.random.RandomState(seed)
+    samples = _np.sort(rng.choice(num_nodes, min(num_nodes, num_samples), replace=False))
+    batch_size = max(1, _MAX_BATCH_ENTRIES // (num_nodes + len(tails)))
+    for start in range(0, len(samples), batch_size):
+        batch = samples[start:start + batch_size]
+        distances = _csgraph.shortest_path(
+            adjacency, directed=True, unweighted=True, indices=batch)
+        node_dependencies, arc_dependencies = _accumulate_dependencies(
+            distances, batch, tails, heads)
+        node_values += node_dependencies
+        edge_values += _np.bincount(arc_edges, arc_dependencies, num_edges)
+    scale = num_nodes / len(samples) / (1.0 if directed else 2.0)
+    return node_values * scale, edge_values * scale
+
+
+def _accumulate_dependencies(distances, batch, tails, heads):
+    """Sum the dependencies of nodes and arcs on the shortest paths from each batch source."""
+    batch_size, num_nodes = distances.shape
+    tail_distances = distances[:, tails]
+    rows, arcs = _np.nonzero(
+        _np.isfinite(tail_distances) & (distances[:, heads] == tail_distances + 1))
+    levels = tail_distances[rows, arcs].astype(_np.int64)
+    flat_tails = rows * num_nodes + tails[arcs]
+    flat_heads = rows * num_nodes + heads[arcs]
+    flat_sources = _np.arange(batch_size) * num_nodes + batch
+
+    # Number of shortest paths to each node, level by level away from the sources
+    path_counts = _np.zeros(batch_size * num_nodes)
+    path_counts[flat_sources] = 1.0
+    order, bounds, run_starts, run_bounds = _level_runs(levels, flat_heads)
+    sorted_tails, sorted_heads = flat_tails[order], flat_heads[order]
+    for level in range(len(bounds) - 1):
+        starts = run_starts[run_bounds[level]:run_bounds[level + 1]]
+        path_counts[sorted_heads[starts]] = _np.add.reduceat(
+            path_counts[sorted_tails[bounds[level]:bounds[level + 1]]],
+            starts - bounds[level])
+
+    # Dependencies, level by level towards the sources
+    dependencies = _np.zeros(batch_size * num_nodes)
+    arc_dependencies = _np.zeros(len(levels))
+    order, bounds, run_starts, run_bounds = _level_runs(levels, flat_tails)
+    sorted_tails, sorted_heads = flat_tails[order], flat_heads[order]
+    sorted_ratios = path_counts[sorted_tails] / path_counts[sorted_heads]
+    for level in reversed(range(len(bounds) - 1)):
+        segment = slice(bounds[level], bounds[level + 1])
+        values = sorted_ratios[segment] * (1.0 + dependencies[sorted_heads[segment]])
+        arc_dependencies[order[segment]] = values
+        starts = run_starts[run_bounds[level]:run_bounds[level + 1]]
+        dependencies[sorted_tails[starts]] += _np.add.reduceat(values, starts - bounds[level])
+    dependencies[flat_sources] = 0.0
+    arc_sums = _np.bincount(arcs, arc_dependencies, len(tails))
+    return dependencies.reshape(batch_size, num_nodes).sum(axis=0), arc_sums
+
+
+def _level_runs(levels, nodes):
+    """Sort arcs by level and node and find where each level and each run of a node begins.
+
+    Returns
+    -------
+    order : array of int
+        Arcs in sorted order.
+    bounds : array of int
+        Position of the first sorted arc of each level, followed by the number of arcs.
+    run_starts : array of int
+        Position of the first sorted arc of each run of arcs with the same level and node.
+    run_bounds : array of int
+        Position of the first run of each level in run_starts, followed by their number.
+
+    """
+    num_levels = int(levels.max()) + 1 if len(levels) else 0
+    order = _np.argsort(levels * (int(nodes.max()) + 1 if len(nodes) else 1) + nodes)
+    sorted_levels, sorted_nodes = levels[order], nodes[order]
+    bounds = _np.searchsorted(sorted_levels, _np.arange(num_levels + 1))
+    run_starts = _np.flatnonzero(_np.concatenate([
+        [True], (sorted_levels[1:] != sorted_levels[:-1]) | (sorted_nodes[1:] != sorted_nodes[:-1])
+    ])) if len(order) else _np.zeros(0, dtype=_np.int64)
+    run_bounds = _np.searchsorted(run_starts, bounds)
+    return order, bounds, run_starts, run_bounds
+
+
+def _symmetric_adjacency(num_nodes, sources, targets):
+    """Get an undirected adjacency matrix without self-loops in CSR format."""
+    is_loop = sources == targets
+    sources, targets = sources[~is_loop], targets[~is_loop]
+    adjacency = _sparse.csr_matrix(
+        (_np.ones(len(sources)), (sources, targets)), shape=(num_nodes, num_nodes))
+    adjacency = (adjacency + adjacency.T).tocsr()
+    adjacency.sum_duplicates()
+    return adjacency
+
+
+def _row_entries(indptr, rows):
+    """Get the positions of all entries of the given rows of a CSR matrix."""
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    offsets = _np.cumsum(counts) - counts
+    return _np.repeat(starts - offsets, counts) + _np.arange(counts.sum())
@@ -0,0 +1,108 @@
+"""Selection of the most important edges of dense weighted graphs before they are embedded."""
+
+import numpy as _np
+
+
+def strongest_edges(weights, max_edges):
+    """Find the edges with the largest weights in the whole graph.
+
+    Parameters
+    ----------
+    weights : array of float
+        Weight of each edge.
+    max_edges : int
+        Number of edges to keep. Among edges of equal weight, earlier ones are preferred.
+
+    Returns
+    -------
+    is_kept : array of bool
+
+    """
+    is_kept = _np.zeros(len(weights), dtype=bool)
+    is_kept[_np.argsort(-weights, kind='stable')[:max_edges]] = True
+    return is_kept
+
+
+def strongest_edges_per_node(num_nodes, sources, targets, weights, max_edges):
+    """Find the edges that are among the ones with the largest weights of at least one end.
+
+    The direction of edges is ignored, i.e. incoming and outgoing edges of a node compete
+    with each other. Among edges of equal weight, earlier ones are preferred.
+
+    Parameters
+    ----------
+    num_nodes : int
+    sources, targets : array of int
+        Position of the source and target node of each edge.
+    weights : array of float
+        Weight of each edge.
+    max_edges : int
+        Number of edges to keep for each node.
+
+    Returns
+    -------
+    is_kept : array of bool
+
+    """
+    num_edges = len(weights)
+    ends = _np.concatenate([sources, targets])
+    edges = _np.tile(_np.arange(num_edges), 2)
+    order = _np.lexsort((edges, -_np.tile(weights, 2), ends))
+    counts = _np.bincount(ends, minlength=num_nodes)
+    ranks = _np.arange(2 * num_edges) - _np.repeat(_np.cumsum(counts) - counts, counts)
+    is_kept = _np.zeros(num_edges, dtype=bool)
+    is_kept[edges[order[ranks < max_edges]]] = True
+    return is_kept
+
+
+def disparity_backbone(num_nodes, sources, targets, weights, significance, directed=False):
+    """Find the edges of the backbone of a weighted graph by the disparity filter.
+
+    For each end of an edge, the null hypothesis is that the strength of the node, i.e. the
+    sum of the weights of its edges, is distributed uniformly at random among its k edges.
+    The probability that an edge gets a fraction p or more of it is then (1 - p)**(k - 1).
+    An edge is kept if this probability is below the significance level for at least one
+    of its ends. In a directed graph, the outgoing edges of the source and the incoming
+    edges of the target are considered. Negative weights count as zero.
+
+    Parameters
+    ----------
+    num_nodes : int
+    sources, targets : array of int
+        Position of the source and target node of each edge.
+    weights : array of float
+        Weight of each edge.
+    significance : float
+        Significance level between 0 and 1, where smaller values lead to fewer edges.
+    directed : bool
+
+    Returns
+    -------
+    is_kept : array of bool
+
+    References
+    ----------
+    - M. A. Serrano, M. Boguñá, A. Vespignani: Extracting the multiscale backbone of complex
+      weighted networks. PNAS 106 (16), 6483-6488 (2009)
+      https://doi.org/10.1073/pnas.0808904106
+
+    """
+    weights = _np.maximum(weights, 0.0)
+    if directed:
+        source_strengths = _np.bincount(sources, weights, num_nodes)
+        target_strengths = _np.bincount(targets, weights, num_nodes)
+        source_degrees = _np.bincount(sources, minlength=num_nodes)
+        target_degrees = _np.bincount(targets, minlength=num_nodes)
+    else:
+        ends = _np.concatenate([sources, targets])
+        source_strengths = target_strengths = _np.bincount(
+            ends, _np.tile(weights, 2), num_nodes)
+        source_degrees = target_degrees = _np.bincount(ends, minlength=num_nodes)
+    is_kept = _np.zeros(len(weights), dtype=bool)
+    for ends, strengths, degrees in [(sources, source_strengths, source_degrees),
+                                     (targets, target_strengths, target_degrees)]:
+        with _np.errstate(divide='ignore', invalid='ignore'):
+            fractions = weights / strengths[ends]
+        probabilities = (1.0 - fractions) ** (degrees[ends] - 1)
+        is_kept |= probabilities < significance  # False for NaN of nodes with zero strength
+    return is_kept
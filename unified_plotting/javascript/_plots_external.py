@@ -182,7 +182,7 @@ def image_viewer(data, mime_type=None, width=None, height=None,
             'alt="Image can not be displayed.">'
             '</object>'.format(mime_type=mime_type, data_url=data_url)
         )
-    site_template = _template_system.load('templates/image_viewer.html')
+    site_template = _template_system.load_template('templates/image_viewer.html')
     insert_data = {
         'CONTAINER_STYLE': container_style,
         'DATA': html_element,
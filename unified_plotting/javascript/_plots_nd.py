@@ -1,9 +1,13 @@
 """JavaScript plots for n-dimensional vector data."""
 
 from collections.abc import Iterable as _Iterable
+from numbers import Number as _Number
+
+import numpy as _np
 
 from .._unified_arguments import colormaps as _colormaps
 from .._unified_arguments import shared_preprocessing as _shared_preprocessing
+from ..utilities import base64 as _base64
 from . import _data_structures, _template_system
 
 
@@ -18,7 +22,8 @@ def parallel_coordinates_table(data=None, name=None,
                                background_color="white", axis_color="black", tick_color="black",
                                title_font="sans", title_size=10, title_color="black",
                                label_font="sans", label_size=10, label_color="black",
-                               table_cell_width=50, table_cell_height=20):
+                               table_cell_width=50, table_cell_height=20,
+                               data_compression=False):
     """Create a parallel coordinate plot with d3.parcoords.js and linked table with slick.grid.js.
 
     Parameters
@@ -95,6 +100,11 @@ def parallel_coordinates_table(data=None, name=None,
         Width of a cell in the table in pixels (px).
     table_cell_height : float
         Height of a cell in the table in pixels (px).
+    data_compression : bool
+        If True, the data is embedded in compressed form (deflate and base64) instead of
+        plain JSON, which considerably reduces the size of the HTML text for large data.
+        It is decompressed in the browser with DecompressionStream, or in browsers that do
+        not support it with a slower JavaScript implementation of inflate.
 
     Returns
     -------
@@ -108,7 +118,7 @@ def parallel_coordinates_table(data=None, name=None,
     """
     # Shared argument processing
     data, name = _shared_preprocessing.prepare_vector_data_nd(
-        data, name, remove_non_numerical_vectors=False)
+        data, name, remove_non_numerical_vectors=False, keep_arrays=True)
 
     # Further argument processing
     name = _parse_names_for_table(name, num_names=len(data))
@@ -137,22 +147,24 @@ def parallel_coordinates_table(data=None, name=None,
     colormap = _colormaps.D3_BUILTIN_COLORMAPS[colormap.lower()]
 
     # Transformation
-    site_template = _template_system.load('templates/pc_table_parcoords_slickgrid.html')
+    site_template = _template_system.load_template(
+        'templates/pc_table_parcoords_slickgrid.html')
     insert_data = {
-        'DEFINE_D3_COLOR': _template_system.load(
+        'DEFINE_D3_COLOR': _template_system.load_asset(
             'third_party/d3-color/d3-color.v1.min.def.js'),
-        'DEFINE_D3_INTERPOLATE': _template_system.load(
+        'DEFINE_D3_INTERPOLATE': _template_system.load_asset(
             'third_party/d3-interpolate/d3-interpolate.v1.min.def.js'),
-        'DEFINE_D3_SCALE_CHROMATIC': _template_system.load(
+        'DEFINE_D3_SCALE_CHROMATIC': _template_system.load_asset(
             'third_party/d3-scale-chromatic/d3-scale-chromatic.v1.min.def.js'),
-        'DEFINE_PARCOORDS': _template_system.load(
+        'DEFINE_PARCOORDS': _template_system.load_asset(
             'third_party/parcoords/parcoords.standalone.min.def.js'),
-        'DEFINE_JQUERY': _template_system.load(
+        'DEFINE_JQUERY': _template_system.load_asset(
             'third_party/jquery/jquery.min.def.js'),
-        'DEFINE_SLICKGRID': _template_system.load(
+        'DEFINE_SLICKGRID': _template_system.load_asset(
             'third_party/slickgrid/slickgrid.combined.def.js'),
+        'DEFINE_PAYLOAD': _template_system.load_asset('shared/payload.def.js'),
 
-        'DATA': _template_system.to_json(data),
+        **_template_system.to_payload(data, data_compression),
         'COLUMN_NAME': _template_system.to_json(name),
         'COLUMN_HTML': _template_system.to_json(column_html),
         'COLUMN_HIDDEN': _template_system.to_json(column_finally_hidden),
@@ -190,7 +202,7 @@ def parallel_coordinates_table(data=None, name=None,
 
 def table(data=None, name=None, column_html=None,
           table_height=350, table_cell_width=50, table_cell_height=22,
-          show_menu=True, show_menu_toggle_button=True):
+          show_menu=True, show_menu_toggle_button=True, data_compression=False):
     """Create an interactive table with slick.grid.js.
 
     Parameters
@@ -217,6 +229,11 @@ def table(data=None, name=None, column_html=None,
         If True, the menu container is shown on load, otherwise hidden.
     show_menu_toggle_button : bool
         If True, a button is shown that allows to toggle the visibility of the menu container.
+    data_compression : bool
+        If True, the data is embedded in compressed form (deflate and base64) instead of
+        plain JSON, which considerably reduces the size of the HTML text for large data.
+        It is decompressed in the browser with DecompressionStream, or in browsers that do
+        not support it with a slower JavaScript implementation of inflate.
 
     Returns
     -------
@@ -229,7 +246,7 @@ def table(data=None, name=None, column_html=None,
     """
     # Shared argument processing
     data, name = _shared_preprocessing.prepare_vector_data_nd(
-        data, name, remove_non_numerical_vectors=False)
+        data, name, remove_non_numerical_vectors=False, keep_arrays=True)
 
     # Further argument processing
     name = _parse_names_for_table(name, num_names=len(data))
@@ -238,13 +255,14 @@ def table(data=None, name=None, column_html=None,
     column_html = _check_column(column_html, default=[], allowed=column_full)
 
     # Transformation
-    site_template = _template_system.load('templates/table_slickgrid.html')
+    site_template = _template_system.load_template('templates/table_slickgrid.html')
     insert_data = {
-        'DEFINE_JQUERY': _template_system.load(
+        'DEFINE_JQUERY': _template_system.load_asset(
             'third_party/jquery/jquery.min.def.js'),
-        'DEFINE_SLICKGRID': _template_system.load(
+        'DEFINE_SLICKGRID': _template_system.load_asset(
             'third_party/slickgrid/slickgrid.combined.def.js'),
-        'DATA': _template_system.to_json(data),
+        'DEFINE_PAYLOAD': _template_system.load_asset('shared/payload.def.js'),
+        **_template_system.to_payload(data, data_compression),
         'COLUMN_NAME': _template_system.to_json(name),
         'COLUMN_HTML': _template_system.to_json(column_html),
         'TABLE_HEIGHT': _template_system.to_json(table_height),
@@ -274,17 +292,60 @@ def _parse_names_for_table(names, num_names):
 
 
 def _convert_data_for_table(data, names):
-    num_rows = len(data[0])
-    new_data = []
-    for row_id in range(num_rows):
-        row_dict = {
-            'id': row_id,
-            'checkbox': 0,
+    """Convert the data vectors to a column-wise representation that is compact in JSON.
+
+    Numerical columns are encoded as base64 text of a little-endian typed array, which is a
+    Float32 array for single precision data and otherwise a Float64 array. String columns
+    become a list of unique strings and base64 text of an Int32 array with indices into it.
+    Columns with mixed types remain plain lists. The rows are assembled in the browser.
+
+    """
+    columns = [_convert_column_for_table(vec, col) for vec, col in zip(data, names)]
+    return {'num_rows': len(data[0]), 'columns': columns}
+
+
+def _convert_column_for_table(vector, name):
+    if isinstance(vector, _np.ndarray):
+        # The type of an array is known from its dtype, no need to inspect each element
+        is_numerical = vector.dtype.kind in 'fiu'
+        is_string = vector.dtype.kind == 'U'
+    else:
+        is_numerical = all(isinstance(val, _Number) and not isinstance(val, bool)
+                           for val in vector)
+        is_string = not is_numerical and all(isinstance(val, str) for val in vector)
+    if is_numerical:
+        array = _np.asarray(vector)
+        if array.dtype in (_np.float32, _np.float16):
+            column_type, dtype = 'float32', '<f4'
+        else:
+            column_type, dtype = 'float64', '<f8'
+        column = {
+            'name': name,
+            'type': column_type,
+            'values': _base64.binary_data_to_base64_text(array.astype(dtype).tobytes()),
+        }
+    elif is_string:
+        if isinstance(vector, _np.ndarray):
+            categories, codes = _np.unique(vector, return_inverse=True)
+            categories = categories.tolist()
+        else:
+            lookup = {}
+            codes = [lookup.setdefault(val, len(lookup)) for val in vector]
+            categories = list(lookup)
+        column = {
+            'name': name,
+            'type': 'category',
+            'categories': categories,
+            'codes': _base64.binary_data_to_base64_text(
+                _np.asarray(codes, dtype='<i4').tobytes()),
+        }
+    else:
+        column = {
+            'name': name,
+            'type': 'list',
+            'values': vector.tolist() if isinstance(vector, _np.ndarray) else vector,
         }
-        for col_id, col in enumerate(names):
-            row_dict[col] = data[col_id][row_id]
-        new_data.append(row_dict)
-    return new_data
+    return column
 
 
 def _check_column(column_list, default, allowed):
@@ -1,7 +1,26 @@
 """JavaScript plots for graph data."""
 
+import functools as _functools
+import math as _math
+import numbers as _numbers
+
+import numpy as _np
+
+from .. import _logging
 from .._unified_arguments import shared_preprocessing as _shared_preprocessing
-from . import _data_structures, _template_system
+from ..utilities import base64 as _base64
+from . import (
+    _data_structures, _network_coarsening, _network_images, _network_layout, _network_metrics,
+    _network_sparsification, _template_system)
+
+
+# Data and metadata fields of nodes and edges that the network plots interpret
+_NODE_DATA_KEYS = ['id', 'label']
+_NODE_METADATA_KEYS = [
+    'color', 'opacity', 'size', 'shape', 'border_color', 'border_size', 'label_color',
+    'label_size', 'hover', 'click', 'image', 'x', 'y', 'z']
+_EDGE_DATA_KEYS = ['id', 'label', 'relation', 'directed']
+_EDGE_METADATA_KEYS = ['color', 'opacity', 'size', 'label_color', 'label_size', 'hover', 'click']
 
 
 def network_d3(data,
@@ -32,15 +51,21 @@ def network_d3(data,
                collision_force_strength=0.7,
                use_x_positioning_force=False, x_positioning_force_strength=0.2,
                use_y_positioning_force=False, y_positioning_force_strength=0.2,
-               use_centering_force=True):
+               use_centering_force=True, data_compression=False,
+               layout_precomputation=None, coarsening_threshold=None,
+               edge_weight_data_source='weight', max_edges=None,
+               max_edges_per_node=None, backbone_significance=None,
+               payload_optimization=False,
+               node_image_downscaling=False, lazy_loading=False):
     """Create an interactive network plot from JSON graph format (JGF) data with d3.v5.js.
 
     Parameters
     ----------
-    data : str, dict or graph object
+    data : str, dict, graph object or table
         Graph data in :ref:`JSON graph format (JGF) <jgf-format>` as JSON string (*str*),
         JSON object (*dict*),
         :ref:`graph object of a supported graph library <supported-graph-libraries>`,
+        :ref:`columnar graph data <columnar-graph-data>` such as a table of edges,
         or a list of multiple graphs, each defined in any of the previous ways.
         If the provided data contains multiple graphs, only the first one is shown on load,
         while the other ones can be chosen in the data selection menu in order to be displayed.
@@ -62,6 +87,11 @@ def network_d3(data,
         A scaling factor that modifies node size.
     node_size_data_source : str
         Name of the numerical node property that is used as source for node size on load.
+        If the nodes have no such property, it can also be the name of a graph metric that
+        is then calculated in Python: "degree", "in_degree", "out_degree", "pagerank" (with
+        edge weights from edge_weight_data_source), "betweenness_approx" (estimated from
+        shortest paths of a sample of nodes) or "core_number". Since their ranges differ
+        widely, they are best combined with use_node_size_normalization.
     use_node_size_normalization : bool
         If True, node sizes are normalized to lie in an interval between a
         chosen min and max value.
@@ -102,6 +132,8 @@ def network_d3(data,
         A scaling factor that modifies edge size (=edge width).
     edge_size_data_source : str
         Name of the edge property that is used as source for edge size on load.
+        If the edges have no such property, it can also be "betweenness_approx", the edge
+        betweenness that is then estimated in Python like the node metric of the same name.
     use_edge_size_normalization : bool
         If True, edge sizes are normalized to lie in an interval between a
         chosen min and max value.
@@ -189,6 +221,83 @@ def network_d3(data,
         This force attracts each node towards the center of the coordinate system at (0, 0)
         to keep the graph in the display area. It may lead to unexpected repulsion effects
         if all nodes are fixed and then a single one is released by dragging it.
+    data_compression : bool
+        If True, the data is embedded in compressed form (deflate and base64) instead of
+        plain JSON, which considerably reduces the size of the HTML text for large data.
+        It is decompressed in the browser with DecompressionStream, or in browsers that do
+        not support it with a slower JavaScript implementation of inflate.
+    layout_precomputation : str, optional
+        If not None, the positions of the nodes are calculated in Python before the data is
+        embedded, so that the browser does not need to compute an initial layout, which takes
+        long for large graphs and is repeated on each page load. The nodes are fixed at these
+        positions and the simulation starts frozen. The button "Release fixed nodes" lets the
+        layout algorithm move them again. Nodes that already have coordinates keep them.
+        Caution: With lazy_loading and without data_compression, the layout is calculated
+        again each time the figure is exported or displayed.
+        Possible values:
+
+        - "barnes_hut": The force simulation of d3.js with the forces and parameters given
+          above, where the many-body force is approximated similar to the Barnes–Hut method.
+        - "igraph": The DrL layout of python-igraph, scaled to the links force distance.
+        - "graph_tool": The SFDP layout of graph-tool, scaled to the links force distance.
+
+        If a library is not installed, "barnes_hut" is used instead.
+    coarsening_threshold : int, optional
+        If not None, each graph with more nodes than this number is shown as a graph of its
+        communities, which are found in Python by label propagation. Each community is a
+        single node with its number of members in the metadata field "members", and the
+        edges between two communities are combined into one edge with their number in the
+        metadata field "weight". Clicking a community shows its members as a further network,
+        which is coarsened in the same way if it is still too large. The network selection
+        in the menu leads back to all previously shown levels. This bounds the number of
+        nodes that the browser needs to draw and simulate at once, independent of the size
+        of the graph. The members of a community are embedded as text that is only parsed
+        when they are shown.
+    edge_weight_data_source : str
+        Name of the edge metadata field with the weights that the edge filters below use.
+        Edges without a numerical weight get the weight 1.
+    max_edges : int, optional
+        If not None, only this number of edges with the largest weights is kept in each
+        graph.
+    max_edges_per_node : int, optional
+        If not None, an edge is only kept if it is among this number of edges with the
+        largest weights of its source or its target, regardless of its direction.
+    backbone_significance : float, optional
+        If not None, only the edges of the backbone found by the disparity filter are kept.
+        An edge belongs to it if its weight is an unexpectedly large fraction of the summed
+        weights of its source or its target, compared to a uniform distribution of that sum
+        among their edges. The value is the significance level between 0 and 1, where
+        smaller values lead to fewer edges.
+
+        The edge filters make dense weighted graphs, e.g. of pairwise similarities, readable
+        and fast to render. They are applied in Python before the data is embedded, in the
+        order backbone, edges per node, total number of edges. The number of removed edges
+        is reported. Edges that refer to unknown nodes are removed as well.
+    payload_optimization : bool
+        If True, the graph data is reduced to what the plot uses before it is embedded.
+        Metadata fields of nodes and edges are removed, unless the plot interprets them,
+        like "color", "size" or "hover", or they are a data source chosen above. Therefore
+        the menu offers no other data sources. Nodes with a repeated id and edges to
+        unknown nodes are removed as well. Graphs in JGF are embedded in columnar form,
+        which stores each distinct string only once and numbers in binary form. This
+        considerably reduces the size of the HTML text for graphs with many attributes.
+    node_image_downscaling : bool
+        If True, raster images in data URLs, e.g. PNG or JPEG, are downscaled before they are
+        embedded, so that their larger side is at most twice the largest node size times
+        node_size_factor and node_image_size_factor in pixels. This keeps them sharp on
+        high-resolution screens and considerably reduces the size of the HTML text for large
+        images. It requires the package Pillow. Independent of this setting, each distinct
+        node image of a graph is embedded and decoded only once.
+    lazy_loading : bool
+        If True and data contains several graphs, each graph is embedded as separate JSON
+        text, which is compressed if data_compression is True. The browser parses a graph
+        only when it is chosen and releases it when another graph is chosen, which reduces
+        memory usage and startup time for many large graphs. The graphs are prepared and
+        converted one after another only when the figure is written or displayed, so that
+        Python holds at most one converted graph at a time. Without data_compression, this is
+        repeated for each export or display, including layout_precomputation, and the
+        arguments data refers to need to remain unchanged until then. With data_compression,
+        the compressed graphs are kept after the first export or display.
 
     Returns
     -------
@@ -201,14 +310,50 @@ def network_d3(data,
 
     """
     # Argument processing
-    data = _shared_preprocessing.prepare_graph_data(data)
+    force_layout = _functools.partial(
+        _network_layout.d3_force_layout, num_dimensions=2, velocity_decay=0.4,
+        many_body_strength=many_body_force_strength if use_many_body_force else None,
+        many_body_theta=many_body_force_theta,
+        many_body_min_distance=(
+            many_body_force_min_distance if use_many_body_force_min_distance else None),
+        many_body_max_distance=(
+            many_body_force_max_distance if use_many_body_force_max_distance else None),
+        links_distance=links_force_distance,
+        links_strength=links_force_strength if use_links_force else None,
+        collision_radius=collision_force_radius if use_collision_force else None,
+        collision_strength=collision_force_strength,
+        positioning_strengths=[
+            x_positioning_force_strength if use_x_positioning_force else None,
+            y_positioning_force_strength if use_y_positioning_force else None],
+        use_centering=use_centering_force)
+
+    def finalize(graphs):
+        graphs = _precompute_layouts(
+            graphs, layout_precomputation, 2, links_force_distance, force_layout)
+        graphs = _deduplicate_node_images(
+            graphs, node_image_downscaling, node_size_data_source,
+            node_size_normalization_max if use_node_size_normalization else None,
+            node_size_factor * node_image_size_factor)
+        return _encode_columnar_graphs(graphs)
+
+    def convert(graphs):
+        graphs = _add_graph_metrics(graphs, node_size_data_source, edge_size_data_source,
+                                    edge_weight_data_source)
+        graphs = _sparsify_graphs(graphs, edge_weight_data_source, max_edges,
+                                  max_edges_per_node, backbone_significance)
+        graphs = _optimize_payloads(
+            graphs, payload_optimization, [node_size_data_source, node_label_data_source],
+            [edge_size_data_source, edge_label_data_source])
+        return finalize(_coarsen_graphs(graphs, coarsening_threshold, finalize))
+    payload = _graph_payload(data, convert, lazy_loading, data_compression)
 
     # Transformation
-    site_template = _template_system.load('templates/network_d3.html')
+    site_template = _template_system.load_template('templates/network_d3.html')
     insert_data = {
-        'DEFINE_D3': _template_system.load('third_party/d3/d3.v5.min.def.js'),
+        'DEFINE_D3': _template_system.load_asset('third_party/d3/d3.v5.min.def.js'),
+        'DEFINE_PAYLOAD': _template_system.load_asset('shared/payload.def.js'),
 
-        'DATA': _template_system.to_json(data),
+        **payload,
         'NETWORK_HEIGHT': _template_system.to_json(network_height),
         'DETAILS_HEIGHT': _template_system.to_json(details_height),
         'SHOW_DETAILS': _template_system.to_json(show_details),
@@ -256,6 +401,7 @@ def network_d3(data,
         'LARGE_NETWORK_THRESHOLD': _template_system.to_json(large_network_threshold),
 
         'LAYOUT_ALGORITHM_ACTIVE': _template_system.to_json(layout_algorithm_active),
+        'LAYOUT_PRECOMPUTED': _template_system.to_json(layout_precomputation is not None),
         'USE_MANY_BODY_FORCE': _template_system.to_json(use_many_body_force),
         'MANY_BODY_FORCE_STRENGTH': _template_system.to_json(many_body_force_strength),
         'MANY_BODY_FORCE_THETA': _template_system.to_json(many_body_force_theta),
@@ -302,7 +448,12 @@ def network_vis(data,
                 zoom_factor=0.75, large_network_threshold=500,
                 layout_algorithm_active=True, layout_algorithm='barnesHut',
                 gravitational_constant=-2000.0, central_gravity=0.1, spring_length=70.0,
-                spring_constant=0.1, avoid_overlap=0.0):
+                spring_constant=0.1, avoid_overlap=0.0, data_compression=False,
+                layout_precomputation=None,
+                edge_weight_data_source='weight', max_edges=None,
+                max_edges_per_node=None, backbone_significance=None,
+                payload_optimization=False,
+                node_image_downscaling=False, lazy_loading=False):
     """Create an interactive network plot from JSON graph format (JGF) data with vis.js.
 
     Note
@@ -343,10 +494,11 @@ def network_vis(data,
 
     Parameters
     ----------
-    data : str, dict or graph object
+    data : str, dict, graph object or table
         Graph data in :ref:`JSON graph format (JGF) <jgf-format>` as JSON string (*str*),
         JSON object (*dict*),
         :ref:`graph object of a supported graph library <supported-graph-libraries>`,
+        :ref:`columnar graph data <columnar-graph-data>` such as a table of edges,
         or a list of multiple graphs, each defined in any of the previous ways.
         If the provided data contains multiple graphs, only the first one is shown on load,
         while the other ones can be chosen in the data selection menu in order to be displayed.
@@ -368,6 +520,11 @@ def network_vis(data,
         A scaling factor that modifies node size.
     node_size_data_source : str
         Name of the numerical node property that is used as source for node size on load.
+        If the nodes have no such property, it can also be the name of a graph metric that
+        is then calculated in Python: "degree", "in_degree", "out_degree", "pagerank" (with
+        edge weights from edge_weight_data_source), "betweenness_approx" (estimated from
+        shortest paths of a sample of nodes) or "core_number". Since their ranges differ
+        widely, they are best combined with use_node_size_normalization.
     use_node_size_normalization : bool
         If True, node sizes are normalized to lie in an interval between a
         chosen min and max value.
@@ -409,6 +566,8 @@ def network_vis(data,
         A scaling factor that modifies edge size (=edge width).
     edge_size_data_source : str
         Name of the edge property that is used as source for edge size on load.
+        If the edges have no such property, it can also be "betweenness_approx", the edge
+        betweenness that is then estimated in Python like the node metric of the same name.
     use_edge_size_normalization : bool
         If True, edge sizes are normalized to lie in an interval between a
         chosen min and max value.
@@ -464,6 +623,72 @@ def network_vis(data,
         if they come too close together.
         Only active if layout_algorithm is "barnesHut", "forceAtlas2Based" or
         "hierarchicalRepulsion".
+    data_compression : bool
+        If True, the data is embedded in compressed form (deflate and base64) instead of
+        plain JSON, which considerably reduces the size of the HTML text for large data.
+        It is decompressed in the browser with DecompressionStream, or in browsers that do
+        not support it with a slower JavaScript implementation of inflate.
+    layout_precomputation : str, optional
+        If not None, the positions of the nodes are calculated in Python before the data is
+        embedded, so that the browser does not need to compute an initial layout, which takes
+        long for large graphs and is repeated on each page load. The nodes are fixed at these
+        positions and the simulation starts frozen. The button "Release fixed nodes" lets the
+        layout algorithm move them again. Nodes that already have coordinates keep them.
+        Caution: With lazy_loading and without data_compression, the layout is calculated
+        again each time the figure is exported or displayed.
+        Possible values:
+
+        - "barnes_hut": The "barnesHut" layout algorithm of vis.js with the parameters given
+          above, independent of the chosen layout_algorithm. Overlap avoidance is ignored.
+        - "igraph": The DrL layout of python-igraph, scaled to the spring length.
+        - "graph_tool": The SFDP layout of graph-tool, scaled to the spring length.
+
+        If a library is not installed, "barnes_hut" is used instead.
+    edge_weight_data_source : str
+        Name of the edge metadata field with the weights that the edge filters below use.
+        Edges without a numerical weight get the weight 1.
+    max_edges : int, optional
+        If not None, only this number of edges with the largest weights is kept in each
+        graph.
+    max_edges_per_node : int, optional
+        If not None, an edge is only kept if it is among this number of edges with the
+        largest weights of its source or its target, regardless of its direction.
+    backbone_significance : float, optional
+        If not None, only the edges of the backbone found by the disparity filter are kept.
+        An edge belongs to it if its weight is an unexpectedly large fraction of the summed
+        weights of its source or its target, compared to a uniform distribution of that sum
+        among their edges. The value is the significance level between 0 and 1, where
+        smaller values lead to fewer edges.
+
+        The edge filters make dense weighted graphs, e.g. of pairwise similarities, readable
+        and fast to render. They are applied in Python before the data is embedded, in the
+        order backbone, edges per node, total number of edges. The number of removed edges
+        is reported. Edges that refer to unknown nodes are removed as well.
+    payload_optimization : bool
+        If True, the graph data is reduced to what the plot uses before it is embedded.
+        Metadata fields of nodes and edges are removed, unless the plot interprets them,
+        like "color", "size" or "hover", or they are a data source chosen above. Therefore
+        the menu offers no other data sources. Nodes with a repeated id and edges to
+        unknown nodes are removed as well. Graphs in JGF are embedded in columnar form,
+        which stores each distinct string only once and numbers in binary form. This
+        considerably reduces the size of the HTML text for graphs with many attributes.
+    node_image_downscaling : bool
+        If True, raster images in data URLs, e.g. PNG or JPEG, are downscaled before they are
+        embedded, so that their larger side is at most twice the largest node size times
+        node_size_factor and node_image_size_factor in pixels. This keeps them sharp on
+        high-resolution screens and considerably reduces the size of the HTML text for large
+        images. It requires the package Pillow. Independent of this setting, each distinct
+        node image of a graph is embedded and decoded only once.
+    lazy_loading : bool
+        If True and data contains several graphs, each graph is embedded as separate JSON
+        text, which is compressed if data_compression is True. The browser parses a graph
+        only when it is chosen and releases it when another graph is chosen, which reduces
+        memory usage and startup time for many large graphs. The graphs are prepared and
+        converted one after another only when the figure is written or displayed, so that
+        Python holds at most one converted graph at a time. Without data_compression, this is
+        repeated for each export or display, including layout_precomputation, and the
+        arguments data refers to need to remain unchanged until then. With data_compression,
+        the compressed graphs are kept after the first export or display.
 
     Returns
     -------
@@ -476,15 +701,34 @@ def network_vis(data,
 
     """
     # Argument processing
-    data = _shared_preprocessing.prepare_graph_data(data)
+    def convert(graphs):
+        graphs = _add_graph_metrics(graphs, node_size_data_source, edge_size_data_source,
+                                    edge_weight_data_source)
+        graphs = _sparsify_graphs(graphs, edge_weight_data_source, max_edges,
+                                  max_edges_per_node, backbone_significance)
+        graphs = _optimize_payloads(
+            graphs, payload_optimization, [node_size_data_source, node_label_data_source],
+            [edge_size_data_source, edge_label_data_source])
+        graphs = _precompute_layouts(
+            graphs, layout_precomputation, 2, spring_length, _functools.partial(
+                _network_layout.vis_force_layout, gravitational_constant=gravitational_constant,
+                central_gravity=central_gravity, spring_length=spring_length,
+                spring_constant=spring_constant / 10.0))
+        graphs = _deduplicate_node_images(
+            graphs, node_image_downscaling, node_size_data_source,
+            node_size_normalization_max if use_node_size_normalization else None,
+            node_size_factor * node_image_size_factor)
+        return _encode_columnar_graphs(graphs)
+    payload = _graph_payload(data, convert, lazy_loading, data_compression)
 
     # Transformation
-    site_template = _template_system.load('templates/network_vis.html')
+    site_template = _template_system.load_template('templates/network_vis.html')
     insert_data = {
-        'DEFINE_VIS': _template_system.load(
+        'DEFINE_VIS': _template_system.load_asset(
             'third_party/vis-network/vis-network.min.def.js'),
+        'DEFINE_PAYLOAD': _template_system.load_asset('shared/payload.def.js'),
 
-        'DATA': _template_system.to_json(data),
+        **payload,
         'NETWORK_HEIGHT': _template_system.to_json(network_height),
         'DETAILS_HEIGHT': _template_system.to_json(details_height),
         'SHOW_DETAILS': _template_system.to_json(show_details),
@@ -532,6 +776,7 @@ def network_vis(data,
         'LARGE_NETWORK_THRESHOLD': _template_system.to_json(large_network_threshold),
 
         'LAYOUT_ALGORITHM_ACTIVE': _template_system.to_json(layout_algorithm_active),
+        'LAYOUT_PRECOMPUTED': _template_system.to_json(layout_precomputation is not None),
         'LAYOUT_ALGORITHM': _template_system.to_json(layout_algorithm),
         'GRAVITATIONLAL_CONSTANT': _template_system.to_json(gravitational_constant),
         'CENTRAL_GRAVITY': _template_system.to_json(central_gravity),
@@ -571,7 +816,12 @@ def network_webgl(data,
                   use_x_positioning_force=False, x_positioning_force_strength=0.2,
                   use_y_positioning_force=False, y_positioning_force_strength=0.2,
                   use_z_positioning_force=False, z_positioning_force_strength=0.2,
-                  use_centering_force=True):
+                  use_centering_force=True, data_compression=False,
+                  layout_precomputation=None,
+                  edge_weight_data_source='weight', max_edges=None,
+                  max_edges_per_node=None, backbone_significance=None,
+                  payload_optimization=False,
+                  node_image_downscaling=False, lazy_loading=False):
     """Create an interactive network plot from JSON graph format (JGF) data with 3d-force-graph.js.
 
     Note
@@ -593,10 +843,11 @@ def network_webgl(data,
 
     Parameters
     ----------
-    data : str, dict or graph object
+    data : str, dict, graph object or table
         Graph data in :ref:`JSON graph format (JGF) <jgf-format>` as JSON string (*str*),
         JSON object (*dict*),
         :ref:`graph object of a supported graph library <supported-graph-libraries>`,
+        :ref:`columnar graph data <columnar-graph-data>` such as a table of edges,
         or a list of multiple graphs, each defined in any of the previous ways.
         If the provided data contains multiple graphs, only the first one is shown on load,
         while the other ones can be chosen in the data selection menu in order to be displayed.
@@ -618,6 +869,11 @@ def network_webgl(data,
         A scaling factor that modifies node size.
     node_size_data_source : str
         Name of the numerical node property that is used as source for node size on load.
+        If the nodes have no such property, it can also be the name of a graph metric that
+        is then calculated in Python: "degree", "in_degree", "out_degree", "pagerank" (with
+        edge weights from edge_weight_data_source), "betweenness_approx" (estimated from
+        shortest paths of a sample of nodes) or "core_number". Since their ranges differ
+        widely, they are best combined with use_node_size_normalization.
     use_node_size_normalization : bool
         If True, node sizes are normalized to lie in an interval between a
         chosen min and max value.
@@ -660,6 +916,8 @@ def network_webgl(data,
         A scaling factor that modifies edge size (=edge width).
     edge_size_data_source : str
         Name of the edge property that is used as source for edge size on load.
+        If the edges have no such property, it can also be "betweenness_approx", the edge
+        betweenness that is then estimated in Python like the node metric of the same name.
     use_edge_size_normalization : bool
         If True, edge sizes are normalized to lie in an interval between a
         chosen min and max value.
@@ -759,6 +1017,75 @@ def network_webgl(data,
         This force attracts each node towards the center of the coordinate system at (0, 0, 0)
         to keep the graph in the display area. It may lead to unexpected repulsion effects
         if all nodes are fixed and then a single one is released by dragging it.
+    data_compression : bool
+        If True, the data is embedded in compressed form (deflate and base64) instead of
+        plain JSON, which considerably reduces the size of the HTML text for large data.
+        It is decompressed in the browser with DecompressionStream, or in browsers that do
+        not support it with a slower JavaScript implementation of inflate.
+    layout_precomputation : str, optional
+        If not None, the positions of the nodes are calculated in Python before the data is
+        embedded, so that the browser does not need to compute an initial layout, which takes
+        long for large graphs and is repeated on each page load. The nodes are fixed at these
+        positions and the simulation starts frozen. The button "Release fixed nodes" lets the
+        layout algorithm move them again. Nodes that already have coordinates keep them.
+        Caution: With lazy_loading and without data_compression, the layout is calculated
+        again each time the figure is exported or displayed.
+        Possible values:
+
+        - "barnes_hut": The three-dimensional force simulation of 3d-force-graph.js with the
+          forces and parameters given above, where the many-body force is approximated
+          similar to the Barnes–Hut method.
+        - "igraph": The three-dimensional DrL layout of python-igraph, scaled to the links
+          force distance.
+        - "graph_tool": The SFDP layout of graph-tool in the plane z=0, scaled to the links
+          force distance.
+
+        If a library is not installed, "barnes_hut" is used instead.
+    edge_weight_data_source : str
+        Name of the edge metadata field with the weights that the edge filters below use.
+        Edges without a numerical weight get the weight 1.
+    max_edges : int, optional
+        If not None, only this number of edges with the largest weights is kept in each
+        graph.
+    max_edges_per_node : int, optional
+        If not None, an edge is only kept if it is among this number of edges with the
+        largest weights of its source or its target, regardless of its direction.
+    backbone_significance : float, optional
+        If not None, only the edges of the backbone found by the disparity filter are kept.
+        An edge belongs to it if its weight is an unexpectedly large fraction of the summed
+        weights of its source or its target, compared to a uniform distribution of that sum
+        among their edges. The value is the significance level between 0 and 1, where
+        smaller values lead to fewer edges.
+
+        The edge filters make dense weighted graphs, e.g. of pairwise similarities, readable
+        and fast to render. They are applied in Python before the data is embedded, in the
+        order backbone, edges per node, total number of edges. The number of removed edges
+        is reported. Edges that refer to unknown nodes are removed as well.
+    payload_optimization : bool
+        If True, the graph data is reduced to what the plot uses before it is embedded.
+        Metadata fields of nodes and edges are removed, unless the plot interprets them,
+        like "color", "size" or "hover", or they are a data source chosen above. Therefore
+        the menu offers no other data sources. Nodes with a repeated id and edges to
+        unknown nodes are removed as well. Graphs in JGF are embedded in columnar form,
+        which stores each distinct string only once and numbers in binary form. This
+        considerably reduces the size of the HTML text for graphs with many attributes.
+    node_image_downscaling : bool
+        If True, raster images in data URLs, e.g. PNG or JPEG, are downscaled before they are
+        embedded, so that their larger side is at most twice the largest node size times
+        node_size_factor and node_image_size_factor in pixels. This keeps them sharp on
+        high-resolution screens and considerably reduces the size of the HTML text for large
+        images. It requires the package Pillow. Independent of this setting, each distinct
+        node image of a graph is embedded and decoded only once.
+    lazy_loading : bool
+        If True and data contains several graphs, each graph is embedded as separate JSON
+        text, which is compressed if data_compression is True. The browser parses a graph
+        only when it is chosen and releases it when another graph is chosen, which reduces
+        memory usage and startup time for many large graphs. The graphs are prepared and
+        converted one after another only when the figure is written or displayed, so that
+        Python holds at most one converted graph at a time. Without data_compression, this is
+        repeated for each export or display, including layout_precomputation, and the
+        arguments data refers to need to remain unchanged until then. With data_compression,
+        the compressed graphs are kept after the first export or display.
 
     Returns
     -------
@@ -770,16 +1097,46 @@ def network_webgl(data,
 
     """
     # Argument processing
-    data = _shared_preprocessing.prepare_graph_data(data)
+    def convert(graphs):
+        graphs = _add_graph_metrics(graphs, node_size_data_source, edge_size_data_source,
+                                    edge_weight_data_source)
+        graphs = _sparsify_graphs(graphs, edge_weight_data_source, max_edges,
+                                  max_edges_per_node, backbone_significance)
+        graphs = _optimize_payloads(
+            graphs, payload_optimization, [node_size_data_source, node_label_data_source],
+            [edge_size_data_source, edge_label_data_source])
+        graphs = _precompute_layouts(
+            graphs, layout_precomputation, 3, links_force_distance * 2.0, _functools.partial(
+                _network_layout.d3_force_layout, num_dimensions=3, velocity_decay=0.3,
+                many_body_strength=many_body_force_strength if use_many_body_force else None,
+                many_body_theta=many_body_force_theta,
+                many_body_min_distance=(
+                    many_body_force_min_distance if use_many_body_force_min_distance else None),
+                many_body_max_distance=(
+                    many_body_force_max_distance if use_many_body_force_max_distance else None),
+                links_distance=links_force_distance * 2.0,
+                links_strength=links_force_strength if use_links_force else None,
+                positioning_strengths=[
+                    x_positioning_force_strength if use_x_positioning_force else None,
+                    y_positioning_force_strength if use_y_positioning_force else None,
+                    z_positioning_force_strength if use_z_positioning_force else None],
+                use_centering=use_centering_force))
+        graphs = _deduplicate_node_images(
+            graphs, node_image_downscaling, node_size_data_source,
+            node_size_normalization_max if use_node_size_normalization else None,
+            node_size_factor * node_image_size_factor)
+        return _encode_columnar_graphs(graphs)
+    payload = _graph_payload(data, convert, lazy_loading, data_compression)
 
     # Transformation
-    site_template = _template_system.load('templates/network_webgl.html')
+    site_template = _template_system.load_template('templates/network_webgl.html')
     insert_data = {
-        'DEFINE_THREE': _template_system.load('third_party/three/three.min.def.js'),
-        'DEFINE_3D_FORCE_GRAPH': _template_system.load(
+        'DEFINE_THREE': _template_system.load_asset('third_party/three/three.min.def.js'),
+        'DEFINE_3D_FORCE_GRAPH': _template_system.load_asset(
             'third_party/3d-force-graph/3d-force-graph.min.def.js'),
+        'DEFINE_PAYLOAD': _template_system.load_asset('shared/payload.def.js'),
 
-        'DATA': _template_system.to_json(data),
+        **payload,
         'NETWORK_HEIGHT': _template_system.to_json(network_height),
         'DETAILS_HEIGHT': _template_system.to_json(details_height),
         'SHOW_DETAILS': _template_system.to_json(show_details),
@@ -827,6 +1184,7 @@ def network_webgl(data,
         'LARGE_NETWORK_THRESHOLD': _template_system.to_json(large_network_threshold),
 
         'LAYOUT_ALGORITHM_ACTIVE': _template_system.to_json(layout_algorithm_active),
+        'LAYOUT_PRECOMPUTED': _template_system.to_json(layout_precomputation is not None),
         'USE_MANY_BODY_FORCE': _template_system.to_json(use_many_body_force),
         'MANY_BODY_FORCE_STRENGTH': _template_system.to_json(many_body_force_strength),
         'MANY_BODY_FORCE_THETA': _template_system.to_json(many_body_force_theta),
@@ -850,3 +1208,645 @@ def network_webgl(data,
     site_template = _template_system.insert(site_template, insert_data)
     fig = _data_structures.Figure(site_template)
     return fig
+
+
+def _graph_payload(data, convert, lazy_loading, data_compression):
+    """Get the data placeholders of a template with the converted graphs.
+
+    Without lazy loading, all graphs are prepared and converted at once. Otherwise each
+    graph is only prepared and converted when the payload is written, and the arguments of
+    the conversion are checked right away by converting an empty list of graphs.
+
+    """
+    if not lazy_loading:
+        graphs = convert(_shared_preprocessing.prepare_graph_data(data))
+        payload = _template_system.to_payload(graphs, data_compression)
+    else:
+        convert([])
+        loaders = [
+            _functools.partial(_convert_graph, load_graph, convert)
+            for load_graph in _shared_preprocessing.prepare_graph_data_lazily(data)]
+        payload = _template_system.to_lazy_payload(loaders, data_compression)
+    return dict(payload, LAZY_LOADING=_template_system.to_json(bool(lazy_loading)))
+
+
+def _convert_graph(load_graph, convert):
+    """Prepare and convert a single graph."""
+    return convert([load_graph()])[0]
+
+
+def _precompute_layouts(graphs, layout_precomputation, num_dimensions, edge_length,
+                        force_layout):
+    """Calculate the positions of the nodes in Python and store them as fixed coordinates.
+
+    Nodes that already have coordinates keep them. Graphs whose metadata places all nodes
+    with "node_x", "node_y" or "node_z" are left unchanged.
+
+    """
+    # Argument processing
+    possible_values = [None, 'barnes_hut', 'igraph', 'graph_tool']
+    _shared_preprocessing.check_categorical_argument(
+        layout_precomputation, 'layout_precomputation', possible_values)
+    if layout_precomputation is None:
+        return graphs
+
+    # Transformation
+    library = None if layout_precomputation == 'barnes_hut' else layout_precomputation
+    axes = ['x', 'y', 'z'][:num_dimensions]
+    new_graphs = []
+    for graph in graphs:
+        structure = _graph_structure(graph, axes)
+        if structure is None:
+            new_graphs.append(graph)
+            continue
+        num_nodes, sources, targets, fixed_positions = structure
+        positions = None
+        if library is not None:
+            positions = _network_layout.library_layout(
+                library, num_nodes, sources, targets, num_dimensions)
+            if positions is None:
+                _network_layout.report_missing_layout_library(library)
+                library = None
+            else:
+                positions = _network_layout.scale_to_edge_length(
+                    positions, sources, targets, edge_length)
+                is_fixed = ~_np.isnan(fixed_positions)
+                positions[is_fixed] = fixed_positions[is_fixed]
+        if positions is None:
+            positions = force_layout(num_nodes, sources, targets, fixed_positions)
+        new_graphs.append(_with_node_values(graph, axes, _np.round(positions, 2)))
+    return new_graphs
+
+
+def _add_graph_metrics(graphs, node_size_data_source, edge_size_data_source,
+                       weight_data_source):
+    """Calculate the graph metrics chosen as size data sources that are missing in the data.
+
+    The values are added to the metadata of the nodes or edges, so that size normalization
+    applies to them like to any other property. Properties in the data take precedence.
+
+    """
+    node_metric = edge_metric = None
+    if node_size_data_source in _network_metrics.NODE_METRICS:
+        node_metric = node_size_data_source
+    if edge_size_data_source in _network_metrics.EDGE_METRICS:
+        edge_metric = edge_size_data_source
+    if node_metric is None and edge_metric is None:
+        return graphs
+
+    new_graphs = []
+    for graph in graphs:
+        shown_items = _shown_items(graph)
+        if shown_items is None:
+            new_graphs.append(graph)
+            continue
+        node_indices, edge_indices, sources, targets = shown_items
+        num_nodes = len(node_indices)
+        directed = graph.get('directed') is True
+        if node_metric is not None and not _has_property(graph, 'node', node_metric):
+            weights = None
+            if node_metric == 'pagerank':
+                weights = _edge_weights(graph, edge_indices, weight_data_source)
+            values = _network_metrics.node_metric(
+                node_metric, num_nodes, sources, targets, weights, directed)
+            graph = _with_node_values(graph, [node_metric], _round_significant(values)[:, None])
+        if edge_metric is not None and not _has_property(graph, 'edge', edge_metric):
+            values = _network_metrics.edge_metric(
+                edge_metric, num_nodes, sources, targets, None, directed)
+            graph = _with_edge_values(graph, edge_indices, edge_metric, _round_significant(values))
+        new_graphs.append(graph)
+    return new_graphs
+
+
+def _has_property(graph, kind, name):
+    """Check if any node or edge of a graph has a property in its data or metadata."""
+    if 'node_columns' in graph:
+        return name in (graph.get(kind + '_columns') or {})
+    return any(name in item or name in (item.get('metadata') or {})
+               for item in graph[kind + 's'])
+
+
+def _round_significant(values, num_digits=4):
+    """Round floats to a number of significant digits, which shortens their JSON text."""
+    values = _np.asarray(values)
+    if values.dtype.kind != 'f':
+        return values
+    with _np.errstate(divide='ignore'):
+        magnitudes = _np.floor(_np.log10(_np.abs(values)))
+    magnitudes[~_np.isfinite(magnitudes)] = 0.0
+    factors = 10.0 ** (num_digits - 1 - magnitudes)
+    return _np.round(values * factors) / factors
+
+
+def _sparsify_graphs(graphs, weight_data_source, max_edges, max_edges_per_node,
+                     backbone_significance):
+    """Remove all edges from each graph that do not pass the given edge filters."""
+    # Argument processing
+    for value, name in [(max_edges, 'max_edges'), (max_edges_per_node, 'max_edges_per_node')]:
+        if value is not None and (
+                not isinstance(value, _numbers.Integral) or isinstance(value, bool)
+                or value < 0):
+            message = 'Argument "{}" needs to be None or a non-negative int.'.format(name)
+            raise ValueError(message)
+    if backbone_significance is not None and not 0.0 <= backbone_significance <= 1.0:
+        message = 'Argument "backbone_significance" needs to be None or between 0 and 1.'
+        raise ValueError(message)
+    if max_edges is None and max_edges_per_node is None and backbone_significance is None:
+        return graphs
+
+    # Transformation
+    new_graphs = []
+    for number, graph in enumerate(graphs, 1):
+        shown_items = _shown_items(graph)
+        if shown_items is None:
+            new_graphs.append(graph)
+            continue
+        node_indices, edge_indices, sources, targets = shown_items
+        num_nodes = len(node_indices)
+        weights = _edge_weights(graph, edge_indices, weight_data_source)
+        kept = _np.arange(len(edge_indices))
+        if backbone_significance is not None:
+            kept = kept[_network_sparsification.disparity_backbone(
+                num_nodes, sources[kept], targets[kept], weights[kept], backbone_significance,
+                directed=graph.get('directed') is True)]
+        if max_edges_per_node is not None:
+            kept = kept[_network_sparsification.strongest_edges_per_node(
+                num_nodes, sources[kept], targets[kept], weights[kept], max_edges_per_node)]
+        if max_edges is not None:
+            kept = kept[_network_sparsification.strongest_edges(weights[kept], max_edges)]
+        kept = _np.sort(kept)
+        if 'node_columns' in graph:
+            num_edges = len((graph.get('edge_columns') or {}).get('source', []))
+        else:
+            num_edges = len(graph['edges'])
+        if len(kept) < num_edges:
+            message = 'The edge filters removed {} of {} edges of graph {}.'.format(
+                num_edges - len(kept), num_edges, number)
+            _logging.inform_user(message)
+        new_graphs.append(_subgraph(
+            graph, node_indices, edge_indices[kept], sources[kept], targets[kept]))
+    return new_graphs
+
+
+def _edge_weights(graph, edge_indices, weight_data_source):
+    """Get the weight of each given edge, 1 if it has no numerical weight."""
+    if 'node_columns' in graph:
+        column = (graph.get('edge_columns') or {}).get(weight_data_source)
+        if column is None:
+            return _np.ones(len(edge_indices))
+        values = _np.asarray(column)[edge_indices]
+        if values.dtype.kind in 'iuf':
+            weights = values.astype(float)
+        else:
+            weights = _np.array([_to_number(value) for value in values.tolist()], dtype=float)
+    else:
+        edges = graph['edges']
+        weights = _np.array([
+            _to_number((edges[index].get('metadata') or {}).get(weight_data_source))
+            for index in edge_indices.tolist()], dtype=float)
+    weights[~_np.isfinite(weights)] = 1.0
+    return weights
+
+
+def _coarsen_graphs(graphs, coarsening_threshold, finalize):
+    """Replace each graph with more nodes than the threshold by a graph of its communities.
+
+    Each community becomes a node whose members are stored as a separate graph in JSON text,
+    which is coarsened in the same way if it is still too large. The text is only parsed in
+    the browser when the community is expanded. The function finalize is applied to each
+    member graph before it is converted to text.
+
+    """
+    # Argument processing
+    if coarsening_threshold is None:
+        return graphs
+    if (not isinstance(coarsening_threshold, _numbers.Integral)
+            or isinstance(coarsening_threshold, bool) or coarsening_threshold < 2):
+        message = 'Argument "coarsening_threshold" needs to be None or an int larger than 1.'
+        raise ValueError(message)
+
+    # Transformation
+    return [_coarsened_graph(graph, coarsening_threshold, finalize) for graph in graphs]
+
+
+def _coarsened_graph(graph, max_nodes, finalize):
+    """Get the graph of communities of a graph, or the graph itself if it is small enough."""
+    shown_items = _shown_items(graph)
+    if shown_items is None or len(shown_items[0]) <= max_nodes:
+        return graph
+    node_indices, edge_indices, sources, targets = shown_items
+    num_nodes = len(node_indices)
+    labels, num_groups = _network_coarsening.partition(num_nodes, sources, targets, max_nodes)
+
+    # Members of each community, ordered by degree, and their position within it
+    degrees = _np.bincount(_np.concatenate([sources, targets]), minlength=num_nodes)
+    member_order = _np.lexsort((-degrees, labels))
+    member_counts = _np.bincount(labels, minlength=num_groups)
+    member_starts = _np.cumsum(member_counts) - member_counts
+    local_positions = _np.empty(num_nodes, dtype=_np.int64)
+    local_positions[member_order] = _np.arange(num_nodes) - _np.repeat(
+        member_starts, member_counts)
+    # Edges within each community
+    edge_labels = labels[sources]
+    inner_edges = _np.flatnonzero(edge_labels == labels[targets])
+    inner_edges = inner_edges[_np.argsort(edge_labels[inner_edges], kind='stable')]
+    inner_edge_counts = _np.bincount(edge_labels[inner_edges], minlength=num_groups)
+    inner_edge_starts = _np.cumsum(inner_edge_counts) - inner_edge_counts
+
+    # Graph of communities
+    names = _node_names(graph, node_indices)
+    coarse_graph = {key: val for key, val in graph.items()
+                    if key not in ('nodes', 'edges', 'node_columns', 'edge_columns')}
+    coarse_graph['directed'] = False
+    coarse_graph['nodes'] = []
+    coarse_graph['subgraphs'] = dict()
+    for group in range(num_groups):
+        members = member_order[member_starts[group]:member_starts[group] + member_counts[group]]
+        edges = inner_edges[inner_edge_starts[group]:
+                            inner_edge_starts[group] + inner_edge_counts[group]]
+        node_id = 'community {}'.format(group + 1)
+        label = '{} ({} nodes)'.format(names[members[0]], len(members))
+        subgraph = _subgraph(graph, node_indices[members], edge_indices[edges],
+                             local_positions[sources[edges]], local_positions[targets[edges]])
+        subgraph['label'] = label
+        if graph.get('label'):
+            subgraph['label'] = '{} > {}'.format(graph['label'], label)
+        subgraph = finalize([_coarsened_graph(subgraph, max_nodes, finalize)])[0]
+        coarse_graph['subgraphs'][node_id] = _template_system.to_json(subgraph, allow_nan=False)
+        coarse_graph['nodes'].append({'id': node_id, 'label': label, 'metadata': {
+            'size': 10.0 + 5.0 * float(_np.log2(len(members))),
+            'members': len(members),
+            'hover': 'Click to show the {} nodes of this community.'.format(len(members)),
+        }})
+    coarse_graph['edges'] = [
+        {'source': 'community {}'.format(source + 1), 'target': 'community {}'.format(target + 1),
+         'metadata': {'size': 1.0 + float(_np.log2(weight)), 'weight': int(weight)}}
+        for source, target, weight in zip(*_network_coarsening.aggregate_edges(
+            labels, sources, targets))]
+    return coarse_graph
+
+
+def _node_names(graph, node_indices):
+    """Get the label of each shown node, or its id if it has no label."""
+    if 'node_columns' in graph:
+        node_columns = graph['node_columns']
+        names = _np.asarray(node_columns.get('label', node_columns['id'])).tolist()
+        ids = _np.asarray(node_columns['id']).tolist()
+        return [str(ids[index] if name is None or name != name else name)  # NaN != NaN
+                for index, name in enumerate(names)]
+    nodes = graph['nodes']
+    return [str(nodes[index].get('label') or nodes[index].get('id')) for index in node_indices]
+
+
+def _subgraph(graph, node_indices, edge_indices, sources, targets):
+    """Get a graph with the given nodes and edges of another graph."""
+    subgraph = {key: val for key, val in graph.items() if key != 'subgraphs'}
+    if 'node_columns' in graph:
+        edge_columns = graph.get('edge_columns') or {}
+        subgraph['node_columns'] = {
+            name: _np.asarray(vector)[node_indices]
+            for name, vector in graph['node_columns'].items()}
+        subgraph['edge_columns'] = {
+            name: _np.asarray(vector)[edge_indices] for name, vector in edge_columns.items()}
+        subgraph['edge_columns']['source'] = sources
+        subgraph['edge_columns']['target'] = targets
+    else:
+        subgraph['nodes'] = [graph['nodes'][index] for index in node_indices]
+        subgraph['edges'] = [graph['edges'][index] for index in edge_indices]
+    return subgraph
+
+
+def _graph_structure(graph, axes):
+    """Get the number of nodes, the edges as node positions and the given node coordinates.
+
+    Returns None if the graph has no nodes or if its layout is determined by its metadata.
+
+    """
+    shown_items = _shown_items(graph)
+    if shown_items is None:
+        return None
+    node_indices, _, sources, targets = shown_items
+    num_nodes = len(node_indices)
+    metadata = graph.get('metadata') or {}
+    if num_nodes == 0 or any(
+            _np.isfinite(_to_number(metadata.get('node_' + axis))) for axis in axes):
+        return None
+    fixed_positions = _np.full((num_nodes, len(axes)), _np.nan)
+    if 'node_columns' in graph:
+        node_columns = graph['node_columns']
+        for column, axis in enumerate(axes):
+            if axis in node_columns:
+                fixed_positions[:, column] = [
+                    _to_number(value) for value in _np.asarray(node_columns[axis]).tolist()]
+    else:
+        for position, index in enumerate(node_indices):
+            node_metadata = graph['nodes'][index].get('metadata') or {}
+            for column, axis in enumerate(axes):
+                fixed_positions[position, column] = _to_number(node_metadata.get(axis))
+    fixed_positions[~_np.isfinite(fixed_positions)] = _np.nan
+    return num_nodes, sources, targets, fixed_positions
+
+
+def _shown_items(graph):
+    """Get the nodes and edges of a graph that are shown by the plots.
+
+    Nodes with a repeated id and edges to unknown nodes are ignored by the plots.
+
+    Returns
+    -------
+    node_indices, edge_indices : array of int
+        Positions of the shown nodes and edges in the data of the graph.
+    sources, targets : array of int
+        Source and target of each shown edge as position among the shown nodes.
+
+    None is returned if the graph does not contain nodes and edges in a known form.
+
+    """
+    if not isinstance(graph, dict):
+        return None
+    if 'node_columns' in graph:
+        edge_columns = graph.get('edge_columns') or {}
+        node_indices = _np.arange(len(graph['node_columns'].get('id', [])))
+        sources = _np.asarray(edge_columns.get('source', []), dtype=_np.int64)
+        targets = _np.asarray(edge_columns.get('target', []), dtype=_np.int64)
+        return node_indices, _np.arange(len(sources)), sources, targets
+    nodes = graph.get('nodes') or []
+    edges = graph.get('edges') or []
+    if not isinstance(nodes, list) or not isinstance(edges, list):
+        return None
+    node_positions = dict()
+    node_indices = []
+    for index, node in enumerate(nodes):
+        node_id = str(node.get('id'))
+        if node_id not in node_positions:
+            node_positions[node_id] = len(node_indices)
+            node_indices.append(index)
+    edge_items = []
+    for index, edge in enumerate(edges):
+        source = node_positions.get(str(edge.get('source')))
+        target = node_positions.get(str(edge.get('target')))
+        if source is not None and target is not None:
+            edge_items.append((index, source, target))
+    edge_indices, sources, targets = _np.array(edge_items, dtype=_np.int64).reshape(-1, 3).T
+    return _np.array(node_indices, dtype=_np.int64), edge_indices, sources, targets
+
+
+def _to_number(value):
+    """Interpret a coordinate like the plots do, NaN if it is not a number."""
+    if isinstance(value, bool):
+        return _np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return _np.nan
+
+
+def _with_node_values(graph, names, values):
+    """Get a copy of a graph whose shown nodes have the given values in their metadata.
+
+    values is an array with a row for each shown node and a column for each name.
+
+    """
+    graph = dict(graph)
+    if 'node_columns' in graph:
+        graph['node_columns'] = dict(graph['node_columns'])
+        for column, name in enumerate(names):
+            graph['node_columns'][name] = values[:, column]
+    else:
+        rows = values.tolist()
+        node_positions = dict()
+        new_nodes = []
+        for node in graph['nodes']:
+            node_id = str(node.get('id'))
+            if node_id not in node_positions:
+                node_positions[node_id] = len(node_positions)
+                node = dict(node)
+                node['metadata'] = dict(node.get('metadata') or {})
+                node['metadata'].update(zip(names, rows[node_positions[node_id]]))
+            new_nodes.append(node)
+        graph['nodes'] = new_nodes
+    return graph
+
+
+def _with_edge_values(graph, edge_indices, name, values):
+    """Get a copy of a graph whose given edges have a value in their metadata."""
+    graph = dict(graph)
+    if 'node_columns' in graph:
+        edge_columns = dict(graph.get('edge_columns') or {})
+        column = _np.full(len(edge_columns.get('source', [])), _np.nan)
+        column[edge_indices] = values
+        edge_columns[name] = column
+        graph['edge_columns'] = edge_columns
+    else:
+        new_edges = list(graph['edges'])
+        for index, value in zip(edge_indices.tolist(), values.tolist()):
+            edge = dict(new_edges[index])
+            edge['metadata'] = dict(edge.get('metadata') or {})
+            edge['metadata'][name] = value
+            new_edges[index] = edge
+        graph['edges'] = new_edges
+    return graph
+
+
+def _optimize_payloads(graphs, payload_optimization, node_data_sources, edge_data_sources):
+    """Remove unused metadata fields and convert graphs in JGF to columnar form.
+
+    Columns of strings are encoded with each distinct string only once.
+
+    """
+    # Argument processing
+    if not payload_optimization:
+        return graphs
+    node_fields = set(_NODE_DATA_KEYS + _NODE_METADATA_KEYS + list(node_data_sources))
+    edge_fields = set(
+        ['source', 'target'] + _EDGE_DATA_KEYS + _EDGE_METADATA_KEYS + list(edge_data_sources))
+
+    # Transformation
+    new_graphs = []
+    for graph in graphs:
+        shown_items = _shown_items(graph)
+        if shown_items is None:
+            new_graphs.append(graph)
+            continue
+        node_indices, edge_indices, sources, targets = shown_items
+        new_graph = {key: val for key, val in graph.items()
+                     if key not in ('nodes', 'edges', 'node_columns', 'edge_columns')}
+        if 'node_columns' in graph:
+            node_columns = {name: vector for name, vector in graph['node_columns'].items()
+                            if name in node_fields}
+            edge_columns = {name: vector for name, vector in graph['edge_columns'].items()
+                            if name in edge_fields}
+        else:
+            node_columns = _jgf_to_columns(
+                [graph['nodes'][index] for index in node_indices], _NODE_DATA_KEYS, node_fields)
+            edge_columns = _jgf_to_columns(
+                [graph['edges'][index] for index in edge_indices], _EDGE_DATA_KEYS, edge_fields)
+            edge_columns.update(source=sources, target=targets)
+        new_graph['node_columns'] = node_columns
+        new_graph['edge_columns'] = edge_columns
+        new_graphs.append(new_graph)
+    return new_graphs
+
+
+def _jgf_to_columns(items, data_keys, fields):
+    """Get the given data and metadata fields of JGF nodes or edges as columns."""
+    columns = dict()
+    for position, item in enumerate(items):
+        values = [(key, item[key]) for key in data_keys if key in item]
+        values += [(key, val) for key, val in (item.get('metadata') or {}).items()
+                   if key in fields and key not in data_keys]
+        for key, val in values:
+            if key not in columns:
+                columns[key] = [None] * len(items)
+            columns[key][position] = val
+    return {key: _to_column(values) for key, values in columns.items()}
+
+
+def _to_column(values):
+    """Get an array of values that keeps their types, where None marks a missing value."""
+    present = [val for val in values if val is not None]
+    if all(isinstance(val, str) for val in present):
+        return _np.array(values, dtype=object)
+    if all(isinstance(val, _numbers.Real) and not isinstance(val, bool) for val in present):
+        if len(present) == len(values) and all(
+                isinstance(val, _numbers.Integral) for val in present):
+            try:
+                return _np.array(values, dtype=_np.int64)
+            except OverflowError:
+                pass
+        return _np.array([_np.nan if val is None else val for val in values], dtype=float)
+    column = _np.empty(len(values), dtype=object)
+    for position, val in enumerate(values):
+        column[position] = val
+    return column
+
+
+def _deduplicate_node_images(graphs, downscaling, size_data_source, max_normalized_size,
+                             image_size_factor):
+    """Store each distinct node image of a graph in JGF only once, in a table of the graph.
+
+    The nodes refer to an image by its position in the table. Columnar graphs already store
+    each distinct string only once. If downscaling is True, raster images in data URLs are
+    reduced to twice the largest node size in the graph times the given factor.
+
+    """
+    # Argument processing
+    if downscaling and not _network_images.is_downscaling_available():
+        message = 'Downscaling node images requires the package Pillow.'
+        raise ValueError(message)
+
+    # Transformation
+    new_graphs = []
+    for graph in graphs:
+        if not isinstance(graph, dict) or (
+                'node_columns' not in graph and not isinstance(graph.get('nodes'), list)):
+            new_graphs.append(graph)
+            continue
+        if downscaling:
+            max_pixels = max(1, int(_math.ceil(2.0 * image_size_factor * _max_node_size(
+                graph, size_data_source, max_normalized_size))))
+            reduce_image = _functools.partial(
+                _network_images.downscale_data_url, max_pixels=max_pixels)
+        else:
+            def reduce_image(image):
+                return image
+        graph = dict(graph)
+        metadata = graph.get('metadata')
+        if downscaling and isinstance(metadata, dict) and isinstance(
+                metadata.get('node_image'), str):
+            graph['metadata'] = dict(metadata, node_image=reduce_image(metadata['node_image']))
+        if 'node_columns' in graph:
+            if downscaling and 'image' in graph['node_columns']:
+                images = _np.asarray(graph['node_columns']['image']).tolist()
+                reduced_images = {image: reduce_image(image)
+                                  for image in set(images) if isinstance(image, str)}
+                graph['node_columns'] = dict(graph['node_columns'], image=_np.array(
+                    [reduced_images.get(image, image) for image in images], dtype=object))
+        else:
+            image_table = []
+            image_positions = dict()
+            new_nodes = []
+            for node in graph['nodes']:
+                node_metadata = node.get('metadata') if isinstance(node, dict) else None
+                image = node_metadata.get('image') if isinstance(node_metadata, dict) else None
+                if isinstance(image, str) and image:
+                    if image not in image_positions:
+                        image_positions[image] = len(image_table)
+                        image_table.append(reduce_image(image))
+                    node = dict(node, metadata=dict(node_metadata, image=image_positions[image]))
+                new_nodes.append(node)
+            if image_table:
+                graph['nodes'] = new_nodes
+                graph['node_images'] = image_table
+        new_graphs.append(graph)
+    return new_graphs
+
+
+def _max_node_size(graph, size_data_source, max_normalized_size):
+    """Get the largest size of a node in a graph, before the node size factor is applied."""
+    if max_normalized_size is not None:
+        return float(max_normalized_size)
+    default_size = _to_number((graph.get('metadata') or {}).get('node_size'))
+    sizes = [default_size if default_size > 0.0 else 10.0]  # False for NaN
+    if 'node_columns' in graph:
+        column = graph['node_columns'].get(size_data_source)
+        values = [] if column is None else _np.asarray(column).tolist()
+    elif size_data_source in _NODE_DATA_KEYS:
+        values = [node.get(size_data_source) for node in graph['nodes']]
+    else:
+        values = [(node.get('metadata') or {}).get(size_data_source) for node in graph['nodes']]
+    sizes += [_to_number(value) for value in values]
+    return float(_np.nanmax(sizes))
+
+
+def _encode_columnar_graphs(graphs):
+    """Encode the columns of columnar graphs in a form that is compact in JSON.
+
+    Integer columns that fit into 32 bits are encoded as base64 text of a little-endian Int32
+    array, single precision columns as Float32 array and other numerical columns as Float64
+    array, where NaN marks a missing value.
+    String columns become a list of unique strings and an Int32 array of indices into it,
+    where -1 marks a missing value. Other columns remain plain lists. The nodes and edges are
+    assembled in the browser.
+
+    """
+    encoded_graphs = []
+    for graph in graphs:
+        if isinstance(graph, dict) and 'node_columns' in graph:
+            graph = dict(graph)
+            for key in ('node_columns', 'edge_columns'):
+                columns = graph.get(key) or {}
+                graph[key] = {name: _encode_column(vector) for name, vector in columns.items()}
+        encoded_graphs.append(graph)
+    return encoded_graphs
+
+
+def _encode_column(vector):
+    array = _np.asarray(vector)
+    if array.dtype.kind in 'iu' and (array.size == 0 or (
+            array.min() >= -2**31 and array.max() < 2**31)):
+        column = {'type': 'int32', 'values': _to_base64(array, '<i4')}
+    elif array.dtype in (_np.float32, _np.float16):
+        column = {'type': 'float32', 'values': _to_base64(array, '<f4')}
+    elif array.dtype.kind in 'iuf' and (array.dtype.kind == 'f' or array.size == 0 or (
+            _np.abs(array).max() <= 2**53)):
+        column = {'type': 'float64', 'values': _to_base64(array, '<f8')}
+    elif array.dtype.kind == 'U' or (array.dtype.kind == 'O' and all(
+            isinstance(val, str) or val is None for val in array.tolist())):
+        is_string = array != None  # noqa: E711 (element-wise comparison)
+        categories, string_codes = _np.unique(
+            array[is_string].astype(str), return_inverse=True)
+        codes = _np.full(array.shape, -1)
+        codes[is_string] = string_codes
+        column = {
+            'type': 'category',
+            'categories': categories.tolist(),
+            'codes': _to_base64(codes, '<i4'),
+        }
+    else:
+        column = {'type': 'list', 'values': array.tolist()}
+    return column
+
+
+def _to_base64(array, dtype):
+    return _base64.binary_data_to_base64_text(array.astype(dtype).tobytes())
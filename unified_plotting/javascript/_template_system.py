@@ -1,32 +1,610 @@
 """Template system for using HTML template files and inserting data into them."""
 
+import hashlib as _hashlib
 import json as _json
+import math as _math
+import os as _os
+import re as _re
+import zlib as _zlib
+from base64 import b64encode as _b64encode
+from functools import lru_cache as _lru_cache
+from itertools import islice as _islice
 
 import numpy as _np
 import pkg_resources as _pkg_resources
 
+from .._config import config as _config
 
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+_TAG_PATTERN = _re.compile('§([A-Z0-9_]+)§')
+
+
+class Template:
+    """HTML template that is pre-split into literal segments and placeholder slots.
+
+    A template text contains placeholders of the form ``§KEY§``. Parsing happens once,
+    afterwards inserting data only requires a single join of the literal segments
+    and the inserted values, regardless of the number of placeholders.
+
+    """
+
+    __slots__ = ('_literals', '_slots')
+
+    def __init__(self, text):
+        """Parse a template text into literal segments and placeholder keys."""
+        parts = _TAG_PATTERN.split(text)
+        self._literals = parts[0::2]
+        self._slots = parts[1::2]
+
+    @classmethod
+    def _from_parts(cls, literals, slots):
+        template = cls.__new__(cls)
+        template._literals = literals
+        template._slots = slots
+        return template
+
+    @property
+    def keys(self):
+        """Names of all placeholders that are still unfilled, in order of appearance."""
+        return [slot for slot in self._slots if isinstance(slot, str)]
+
+    @property
+    def assets(self):
+        """All inserted :class:`Asset` objects, in order of appearance."""
+        return [slot for slot in self._slots if isinstance(slot, Asset)]
+
+    def insert(self, data):
+        """Fill some placeholders and return a new template with the remaining ones.
+
+        String values are merged into the literal segments. Other values, e.g. a
+        :class:`JsonStream` or an :class:`Asset`, are kept in their slot and only
+        converted to text when the template is rendered or written.
+
+        """
+        slots, is_text = [], []
+        for slot in self._slots:
+            if isinstance(slot, str) and slot in data:
+                slot = data[slot]
+                is_text.append(isinstance(slot, str))
+            else:
+                is_text.append(False)
+            slots.append(slot)
+        return self._merge(slots, is_text)
+
+    def map_values(self, function):
+        """Replace the values that were kept in their slots and return a new template.
+
+        The function is called with each such value, e.g. an :class:`Asset`. If it returns
+        a string, the string is merged into the literal segments, otherwise the returned
+        value is kept in the slot.
+
+        """
+        slots = [slot if isinstance(slot, str) else function(slot) for slot in self._slots]
+        is_text = [isinstance(new, str) and not isinstance(old, str)
+                   for new, old in zip(slots, self._slots)]
+        return self._merge(slots, is_text)
+
+    def _merge(self, slots, is_text):
+        literals, kept_slots = [], []
+        buffer = [self._literals[0]]
+        for slot, text, literal in zip(slots, is_text, self._literals[1:]):
+            if text:
+                buffer.append(slot)
+            else:
+                literals.append(''.join(buffer))
+                kept_slots.append(slot)
+                buffer = []
+            buffer.append(literal)
+        literals.append(''.join(buffer))
+        return self._from_parts(literals, kept_slots)
+
+    def render(self, data=None, inline_assets=True):
+        """Fill all placeholders and return the resulting text.
+
+        Placeholders without a corresponding entry in data are kept as they are.
+        If inline_assets is False, the code of assets is left out, so that it can be
+        loaded from external files instead, see :meth:`assets`.
+
+        """
+        parts = [self._literals[0]]
+        for slot, literal in zip(self._slots, self._literals[1:]):
+            parts.append(self._slot_to_text(slot, data, inline_assets))
+            parts.append(literal)
+        return ''.join(parts)
+
+    def write(self, file_handle, data=None, inline_assets=True):
+        """Fill all placeholders and write the resulting text piece by piece to a file.
+
+        In contrast to :meth:`render` the complete text is never held in memory.
+
+        """
+        file_handle.write(self._literals[0])
+        for slot, literal in zip(self._slots, self._literals[1:]):
+            if isinstance(slot, JsonStream):
+                slot.write(file_handle)
+            else:
+                file_handle.write(self._slot_to_text(slot, data, inline_assets))
+            file_handle.write(literal)
+
+    @staticmethod
+    def _slot_to_text(slot, data, inline_assets=True):
+        if isinstance(slot, str):
+            if data is not None and slot in data:
+                return str(data[slot])
+            return '§' + slot + '§'
+        if isinstance(slot, Asset) and not inline_assets:
+            return ''
+        return str(slot)
+
+    def __str__(self):
+        """Return the template text with all unfilled placeholders."""
+        return self.render()
+
+
+@_lru_cache(maxsize=None)
 def load(resource_path):
-    """Load a file in the same directory as the template system module."""
+    """Load a file in the same directory as the template system module.
+
+    The content is cached in memory, so each file is read only once per process.
+
+    """
     resource_package = __name__
     binary_data = _pkg_resources.resource_string(resource_package, resource_path)
     string = binary_data.decode('utf-8')
     return string
 
 
+@_lru_cache(maxsize=None)
+def load_template(resource_path):
+    """Load a template file and parse it into a cached :class:`Template`."""
+    return Template(load(resource_path))
+
+
+class Asset:
+    """JavaScript code, e.g. a library, that is either embedded inline or loaded from a file.
+
+    When inserted into a template, an asset keeps its slot. This allows an export to
+    decide whether the code is written inline into each document or only once into a
+    shared directory, from where it is referenced with a script tag.
+
+    """
+
+    __slots__ = ('resource_path', 'text', 'digest')
+
+    def __init__(self, resource_path, text):
+        """Initialize an asset with the path of its resource file and its code."""
+        self.resource_path = resource_path
+        self.text = text
+        self.digest = _hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @property
+    def name(self):
+        """Filename of the resource file without its extension."""
+        return _os.path.splitext(_os.path.basename(self.resource_path))[0]
+
+    def __str__(self):
+        """Return the code of the asset."""
+        return self.text
+
+
+@_lru_cache(maxsize=None)
+def load_asset(resource_path):
+    """Load a JavaScript code file as cached :class:`Asset`."""
+    return Asset(resource_path, load(resource_path))
+
+
 def insert(template, data):
     """Insert data into a template."""
-    for key, val in data.items():
-        tag = '§' + key + '§'
-        template = template.replace(tag, val)
-    return template
+    if not isinstance(template, Template):
+        template = Template(template)
+    return template.insert(data)
+
+
+# JSON serialization
 
+def to_json(data, precision=None, backend=None, allow_nan=True):
+    """Convert data to JSON.
 
-def to_json(data):
-    """Convert data to JSON."""
+    Parameters
+    ----------
+    data : object
+        Data consisting of dicts, lists, tuples, str, numbers, bools, None as well as
+        numpy arrays and scalars.
+    precision : int
+        Number of decimal digits that are kept for floating point numbers.
+        If None, the value of ``settings.json_float_precision`` is used, where None means
+        that floats are represented exactly.
+    backend : str
+        Possible values: "auto", "orjson", "stdlib".
+        If None, the value of ``settings.json_backend`` is used.
+        "auto" uses the accelerated library orjson if it is installed and otherwise
+        falls back to the json module of the standard library.
+    allow_nan : bool
+        If True, non-finite floats (NaN, +Inf, -Inf) are written as the JavaScript literals
+        NaN, Infinity and -Infinity. If False, the result is strict JSON that can be read
+        with ``JSON.parse``, which means non-finite floats are converted to null.
+        Both backends produce the same result in either case.
+
+    """
+    precision, backend = _resolve_json_options(precision, backend)
+    if precision is not None:
+        data = _round_floats(data, precision)
+    if backend == 'orjson':
+        try:
+            text = _orjson.dumps(data, default=_orjson_default, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            # e.g. integers outside of the 64-bit range, which only the stdlib can handle
+            text = None
+        # orjson writes non-finite floats as null, only the stdlib can write them as literals
+        if text is not None and not (
+                allow_nan and 'null' in text and _contains_nonfinite_floats(data)):
+            return text
+    if not allow_nan:
+        try:
+            return _json.dumps(data, cls=_NpEncoder, allow_nan=False)
+        except ValueError:
+            data = _replace_nonfinite_floats(data)
     return _json.dumps(data, cls=_NpEncoder)
 
 
+def to_payload(data, compress=False):
+    """Convert a potentially large data payload to JSON for embedding it in a template.
+
+    Parameters
+    ----------
+    data : object
+        Data that can be converted by :func:`to_json`.
+    compress : bool
+        If True, the JSON text is compressed with deflate and encoded with base64, which
+        is decoded in the browser by the shared module ``shared/payload.def.js``.
+
+    Returns
+    -------
+    insert_data : dict
+        Values for the placeholders DATA and DATA_COMPRESSED, of which the unused one
+        is null. The used one is a :class:`Payload`, or if ``settings.json_streaming``
+        is True a :class:`JsonStream`, where the conversion is deferred and the text is
+        later written piece by piece directly into the output document, so that it never
+        needs to be held in memory as a whole.
+
+    """
+    if compress:
+        if _config.settings.json_streaming:
+            compressed = CompressedJsonStream(data)
+        else:
+            json_text = to_json(data, allow_nan=False)
+            compressed = Payload('"{}"'.format(_deflate_base64(json_text.encode('utf-8'))))
+        return {'DATA': 'null', 'DATA_COMPRESSED': compressed}
+    if _config.settings.json_streaming:
+        return {'DATA': JsonStream(data), 'DATA_COMPRESSED': 'null'}
+    return {'DATA': Payload(to_json(data)), 'DATA_COMPRESSED': 'null'}
+
+
+def to_lazy_payload(item_loaders, compress=False):
+    """Convert items to separate JSON texts for embedding them in a template.
+
+    This allows the browser to parse each item only when it is needed, e.g. one of several
+    graphs when it is chosen in a menu.
+
+    Parameters
+    ----------
+    item_loaders : list of callable
+        A function for each item that creates it when called. This only happens when the
+        payload is written or converted to text, so that a single item needs to be held in
+        memory at a time.
+    compress : bool
+        If True, the JSON text of each item is compressed with deflate and encoded with
+        base64, which is decoded in the browser by the shared module ``shared/payload.def.js``.
+
+    Returns
+    -------
+    insert_data : dict
+        Values for the placeholders DATA and DATA_COMPRESSED, of which the latter is null.
+        The former is a :class:`LazyItemStream`.
+
+    """
+    return {'DATA': LazyItemStream(item_loaders, compress), 'DATA_COMPRESSED': 'null'}
+
+
+class Payload:
+    """JSON text of the data of a plot, which keeps its slot when inserted into a template.
+
+    This allows documents with several plots, such as reports, to recognize identical data
+    and include it only once.
+
+    """
+
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        """Initialize a payload with its JSON text."""
+        self.text = text
+
+    def __str__(self):
+        """Return the JSON text."""
+        return self.text
+
+
+def _deflate_base64(binary_data):
+    return _b64encode(_zlib.compress(binary_data)).decode('ascii')
+
+
+class JsonStream:
+    """Deferred JSON representation of data that can be written in chunks to a file.
+
+    Containers with more than ``chunk_size`` items are split into chunks that are encoded
+    one after the other, so the intermediate JSON text held in memory is limited to about
+    one chunk. Smaller containers are only split further if they contain large ones.
+    Caution: The data is read when the stream is written, not when it is created.
+
+    """
+
+    __slots__ = ('_data', '_precision', '_backend', '_allow_nan', '_chunk_size')
+
+    def __init__(self, data, precision=None, backend=None, allow_nan=True, chunk_size=10000):
+        """Initialize a stream with data and the options for its later conversion."""
+        self._data = data
+        self._precision, self._backend = _resolve_json_options(precision, backend)
+        self._allow_nan = allow_nan
+        self._chunk_size = chunk_size
+
+    def write(self, file_handle):
+        """Write the JSON text of the data to a file handle in chunks."""
+        for chunk in self._iter_chunks(self._data):
+            file_handle.write(chunk)
+
+    def __str__(self):
+        """Return the complete JSON text of the data."""
+        return ''.join(self._iter_chunks(self._data))
+
+    def _encode(self, obj):
+        return to_json(obj, self._precision, self._backend, self._allow_nan)
+
+    def _iter_chunks(self, obj):
+        size = self._chunk_size
+        if isinstance(obj, (list, tuple, _np.ndarray)) and len(obj) > size:
+            yield '['
+            for start in range(0, len(obj), size):
+                if start > 0:
+                    yield ','
+                yield self._encode(obj[start:start+size])[1:-1]
+            yield ']'
+        elif isinstance(obj, dict) and len(obj) > size:
+            items = iter(obj.items())
+            chunk = dict(_islice(items, size))
+            yield '{'
+            while chunk:
+                yield self._encode(chunk)[1:-1]
+                chunk = dict(_islice(items, size))
+                if chunk:
+                    yield ','
+            yield '}'
+        elif isinstance(obj, dict) and self._contains_large(obj):
+            yield '{'
+            for i, (key, val) in enumerate(obj.items()):
+                if i > 0:
+                    yield ','
+                yield self._encode(_json_key(key))
+                yield ':'
+                yield from self._iter_chunks(val)
+            yield '}'
+        elif isinstance(obj, (list, tuple)) and self._contains_large(obj):
+            yield '['
+            for i, val in enumerate(obj):
+                if i > 0:
+                    yield ','
+                yield from self._iter_chunks(val)
+            yield ']'
+        else:
+            yield self._encode(obj)
+
+    def _contains_large(self, obj):
+        # Walk through nested containers until more than chunk_size items were seen
+        budget = self._chunk_size
+        stack = [obj]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, dict):
+                values = item.values()
+            elif isinstance(item, (list, tuple)):
+                values = item
+            elif isinstance(item, _np.ndarray):
+                budget -= item.size
+                if budget < 0:
+                    return True
+                continue
+            else:
+                continue
+            budget -= len(values)
+            if budget < 0:
+                return True
+            stack.extend(values)
+        return False
+
+
+class CompressedJsonStream(JsonStream):
+    """Deferred JSON representation of data that is compressed with deflate and base64 encoded.
+
+    The result is a JavaScript string literal. Compression and encoding happen chunk by
+    chunk while writing, so the complete JSON text is never held in memory.
+
+    """
+
+    __slots__ = ()
+
+    def __init__(self, data, precision=None, backend=None, chunk_size=10000):
+        """Initialize a stream with data and the options for its later conversion."""
+        super().__init__(data, precision, backend, False, chunk_size)
+
+    def write(self, file_handle):
+        """Write the compressed and base64 encoded JSON text to a file handle in chunks."""
+        for chunk in self._iter_compressed_chunks():
+            file_handle.write(chunk)
+
+    def __str__(self):
+        """Return the complete compressed and base64 encoded JSON text as string literal."""
+        return ''.join(self._iter_compressed_chunks())
+
+    def _iter_compressed_chunks(self):
+        compressor = _zlib.compressobj()
+        remainder = b''
+        yield '"'
+        for chunk in self._iter_chunks(self._data):
+            binary_data = remainder + compressor.compress(chunk.encode('utf-8'))
+            # base64 encodes groups of 3 bytes, the rest is kept for the next chunk
+            cut = len(binary_data) - len(binary_data) % 3
+            yield _b64encode(binary_data[:cut]).decode('ascii')
+            remainder = binary_data[cut:]
+        yield _b64encode(remainder + compressor.flush()).decode('ascii')
+        yield '"'
+
+
+class LazyItemStream(JsonStream):
+    """Deferred JSON array of items that are created and encoded one by one while writing.
+
+    Each element is an object with the JSON text of an item under "text", or its compressed
+    and base64 encoded form under "compressed". If the item is a dict with a label, it is
+    also stored under "label", so that it is available without parsing the item.
+    Caution: Without compression, the items are created again each time the stream is
+    written. Compressed elements are small, so they are kept after the first complete write
+    and reused afterwards, which means later changes of the items are not picked up.
+
+    """
+
+    __slots__ = ('_item_loaders', '_compress', '_entries')
+
+    def __init__(self, item_loaders, compress=False, precision=None, backend=None):
+        """Initialize a stream with functions that create the items and conversion options."""
+        super().__init__(None, precision, backend, False)
+        self._item_loaders = list(item_loaders)
+        self._compress = compress
+        self._entries = None
+
+    def _iter_chunks(self, obj):
+        if self._entries is not None:
+            yield '[' + ','.join(self._entries) + ']'
+            return
+        entries = []
+        yield '['
+        for i, load_item in enumerate(self._item_loaders):
+            if i > 0:
+                yield ','
+            item = load_item()
+            json_text = self._encode(item)
+            entry = dict()
+            if isinstance(item, dict) and item.get('label') is not None:
+                entry['label'] = item['label']
+            del item
+            if self._compress:
+                entry['compressed'] = _deflate_base64(json_text.encode('utf-8'))
+                entries.append(self._encode(entry))
+                yield entries[-1]
+            else:
+                entry['text'] = json_text
+                yield self._encode(entry)
+        yield ']'
+        if self._compress:
+            self._entries = entries
+
+
+def _resolve_json_options(precision, backend):
+    if precision is None:
+        precision = _config.settings.json_float_precision
+    if backend is None:
+        backend = _config.settings.json_backend
+    if backend not in ('auto', 'orjson', 'stdlib'):
+        message = 'Value "{}" for JSON backend is invalid. Possible values: {}'.format(
+            backend, ['auto', 'orjson', 'stdlib'])
+        raise ValueError(message)
+    if backend == 'orjson' and _orjson is None:
+        message = 'The JSON backend "orjson" was requested but the library is not installed.'
+        raise ValueError(message)
+    if backend == 'auto':
+        backend = 'stdlib' if _orjson is None else 'orjson'
+    return precision, backend
+
+
+def _json_key(key):
+    # Dict keys are converted to str in the same way as by the json module
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    return str(key)
+
+
+def _round_floats(obj, precision):
+    if isinstance(obj, float):
+        return round(obj, precision)
+    if isinstance(obj, _np.ndarray):
+        if obj.dtype.kind == 'f':
+            return _np.round(obj, precision)
+        return obj
+    if isinstance(obj, _np.floating):
+        return round(float(obj), precision)
+    if isinstance(obj, dict):
+        return {key: _round_floats(val, precision) for key, val in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_round_floats(val, precision) for val in obj]
+    return obj
+
+
+def _replace_nonfinite_floats(obj):
+    if isinstance(obj, float):
+        return obj if _math.isfinite(obj) else None
+    if isinstance(obj, _np.ndarray):
+        if obj.dtype.kind == 'f' and not _np.all(_np.isfinite(obj)):
+            return _np.where(_np.isfinite(obj), obj, None)
+        return obj
+    if isinstance(obj, _np.floating):
+        return float(obj) if _np.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _replace_nonfinite_floats(val) for key, val in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_nonfinite_floats(val) for val in obj]
+    return obj
+
+
+def _contains_nonfinite_floats(obj):
+    if isinstance(obj, (float, _np.floating)):
+        return not _math.isfinite(obj)
+    if isinstance(obj, _np.ndarray):
+        if obj.dtype.kind == 'f':
+            return not _np.all(_np.isfinite(obj))
+        if obj.dtype.kind == 'O':
+            return any(_contains_nonfinite_floats(val) for val in obj.flat)
+        return False
+    if isinstance(obj, dict):
+        return any(_contains_nonfinite_floats(val) for val in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_contains_nonfinite_floats(val) for val in obj)
+    return False
+
+
+if _orjson is not None:
+    _ORJSON_OPTIONS = _orjson.OPT_SERIALIZE_NUMPY | _orjson.OPT_NON_STR_KEYS
+
+
+def _orjson_default(obj):
+    # Fallback for numpy objects that orjson can not serialize natively, e.g.
+    # non-contiguous arrays, arrays of Python objects or unsupported dtypes
+    if isinstance(obj, _np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, _np.generic):
+        return obj.item()
+    raise TypeError
+
+
 class _NpEncoder(_json.JSONEncoder):
     # https://stackoverflow.com/questions/50916422/python-typeerror-object-of-type-int64-is-not-json-serializable/50916741
     def default(self, obj):
@@ -34,6 +612,8 @@ class _NpEncoder(_json.JSONEncoder):
             return int(obj)
         if isinstance(obj, _np.floating):
             return float(obj)
+        if isinstance(obj, _np.bool_):
+            return bool(obj)
         if isinstance(obj, _np.ndarray):
             return obj.tolist()
         return super(_NpEncoder, self).default(obj)
@@ -0,0 +1,266 @@
+// Project sites:    https://github.com/robert-haas/unified-plotting
+// Purpose:          Decoding of the data payloads that are embedded in the plots of this package
+// Code changes:     Wrapped all into a require define function
+
+if(!require.defined("up-payload")){
+  define("up-payload", ["exports"], function(exports){
+    "use strict";
+
+    // Base64 text to bytes
+    function base64ToBytes(base64Text){
+      const binary = atob(base64Text),
+        bytes = new Uint8Array(binary.length);
+      for(let i=0; i<binary.length; i++){
+        bytes[i] = binary.charCodeAt(i);
+      }
+      return bytes;
+    }
+
+    // Inflate of zlib data (RFC 1950, 1951) for browsers without DecompressionStream,
+    // following the canonical Huffman decoding of zlib's puff.c
+    const LENGTH_BASE = [3, 4, 5, 6, 7, 8, 9, 10, 11, 13, 15, 17, 19, 23, 27, 31, 35, 43, 51,
+        59, 67, 83, 99, 115, 131, 163, 195, 227, 258],
+      LENGTH_EXTRA = [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4,
+        5, 5, 5, 5, 0],
+      DISTANCE_BASE = [1, 2, 3, 4, 5, 7, 9, 13, 17, 25, 33, 49, 65, 97, 129, 193, 257, 385,
+        513, 769, 1025, 1537, 2049, 3073, 4097, 6145, 8193, 12289, 16385, 24577],
+      DISTANCE_EXTRA = [0, 0, 0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 10,
+        10, 11, 11, 12, 12, 13, 13],
+      CODE_LENGTH_ORDER = [16, 17, 18, 0, 8, 7, 9, 6, 10, 5, 11, 4, 12, 3, 13, 2, 14, 1, 15];
+
+    function buildHuffmanTable(lengths){
+      const counts = new Uint16Array(16),
+        offsets = new Uint16Array(16),
+        symbols = new Uint16Array(lengths.length);
+      for(let i=0; i<lengths.length; i++){
+        counts[lengths[i]]++;
+      }
+      counts[0] = 0;
+      for(let len=1; len<16; len++){
+        offsets[len] = offsets[len-1] + counts[len-1];
+      }
+      for(let i=0; i<lengths.length; i++){
+        if(lengths[i] !== 0){
+          symbols[offsets[lengths[i]]++] = i;
+        }
+      }
+      return {counts: counts, symbols: symbols};
+    }
+
+    const FIXED_TABLES = (function(){
+      const lengths = new Uint8Array(288 + 30);
+      lengths.fill(8, 0, 144);
+      lengths.fill(9, 144, 256);
+      lengths.fill(7, 256, 280);
+      lengths.fill(8, 280, 288);
+      lengths.fill(5, 288);
+      return [buildHuffmanTable(lengths.subarray(0, 288)),
+              buildHuffmanTable(lengths.subarray(288))];
+    })();
+
+    function inflate(data){
+      let position = 2,  // zlib header, preset dictionaries are not used by Python's zlib
+        bitBuffer = 0,
+        bitCount = 0,
+        output = new Uint8Array(Math.max(1024, data.length * 4)),
+        outputLength = 0;
+
+      function readBits(num){
+        while(bitCount < num){
+          if(position >= data.length){
+            throw new Error("Compressed data ended unexpectedly.");
+          }
+          bitBuffer |= data[position++] << bitCount;
+          bitCount += 8;
+        }
+        const value = bitBuffer & ((1 << num) - 1);
+        bitBuffer >>>= num;
+        bitCount -= num;
+        return value;
+      }
+      function reserve(num){
+        if(outputLength + num > output.length){
+          const larger = new Uint8Array(Math.max(output.length * 2, outputLength + num));
+          larger.set(output.subarray(0, outputLength));
+          output = larger;
+        }
+      }
+      function decodeSymbol(table){
+        let code = 0, first = 0, index = 0;
+        for(let len=1; len<16; len++){
+          code |= readBits(1);
+          const count = table.counts[len];
+          if(code - count < first){
+            return table.symbols[index + code - first];
+          }
+          index += count;
+          first = (first + count) << 1;
+          code <<= 1;
+        }
+        throw new Error("Compressed data contains an invalid code.");
+      }
+      function readDynamicTables(){
+        const numLiteralCodes = readBits(5) + 257,
+          numDistanceCodes = readBits(5) + 1,
+          numCodeLengthCodes = readBits(4) + 4,
+          codeLengths = new Uint8Array(19);
+        for(let i=0; i<numCodeLengthCodes; i++){
+          codeLengths[CODE_LENGTH_ORDER[i]] = readBits(3);
+        }
+        const codeLengthTable = buildHuffmanTable(codeLengths),
+          lengths = new Uint8Array(numLiteralCodes + numDistanceCodes);
+        let i = 0;
+        while(i < lengths.length){
+          const symbol = decodeSymbol(codeLengthTable);
+          if(symbol < 16){
+            lengths[i++] = symbol;
+          } else{
+            let value = 0, repeat;
+            if(symbol === 16){
+              value = lengths[i-1];
+              repeat = 3 + readBits(2);
+            } else if(symbol === 17){
+              repeat = 3 + readBits(3);
+            } else{
+              repeat = 11 + readBits(7);
+            }
+            lengths.fill(value, i, i + repeat);
+            i += repeat;
+          }
+        }
+        return [buildHuffmanTable(lengths.subarray(0, numLiteralCodes)),
+                buildHuffmanTable(lengths.subarray(numLiteralCodes))];
+      }
+
+      let isLastBlock = 0;
+      while(!isLastBlock){
+        isLastBlock = readBits(1);
+        const blockType = readBits(2);
+        if(blockType === 0){
+          // Stored block: starts at the next byte boundary
+          bitBuffer = 0;
+          bitCount = 0;
+          const length = data[position] | (data[position+1] << 8);
+          position += 4;
+          reserve(length);
+          output.set(data.subarray(position, position + length), outputLength);
+          outputLength += length;
+          position += length;
+        } else if(blockType === 1 || blockType === 2){
+          const [literalTable, distanceTable] = blockType === 1 ?
+            FIXED_TABLES : readDynamicTables();
+          for(;;){
+            const symbol = decodeSymbol(literalTable);
+            if(symbol < 256){
+              reserve(1);
+              output[outputLength++] = symbol;
+            } else if(symbol === 256){
+              break;
+            } else{
+              const lengthCode = symbol - 257,
+                length = LENGTH_BASE[lengthCode] + readBits(LENGTH_EXTRA[lengthCode]),
+                distanceCode = decodeSymbol(distanceTable),
+                distance = DISTANCE_BASE[distanceCode] + readBits(DISTANCE_EXTRA[distanceCode]);
+              reserve(length);
+              for(let i=0; i<length; i++){
+                output[outputLength] = output[outputLength - distance];
+                outputLength++;
+              }
+            }
+          }
+        } else{
+          throw new Error("Compressed data contains an invalid block type.");
+        }
+      }
+      return output.subarray(0, outputLength);
+    }
+
+    function decompress(base64Text){
+      // Deflate-compressed text in base64 encoding to text, with DecompressionStream if the
+      // browser supports it and otherwise with the slower inflate above
+      if(typeof(DecompressionStream) === "undefined"){
+        return new Promise(function(resolve){
+          resolve(new TextDecoder().decode(inflate(base64ToBytes(base64Text))));
+        });
+      }
+      return fetch("data:application/octet-stream;base64," + base64Text)
+        .then(function(response){
+          const stream = response.body.pipeThrough(new DecompressionStream("deflate"));
+          return new Response(stream).text();
+        });
+    }
+
+    // Column-wise data: numerical columns are little-endian typed arrays, string columns are
+    // Int32 indices into a list of unique strings and other columns are plain lists
+    const TYPED_ARRAYS = {int32: Int32Array, float32: Float32Array, float64: Float64Array};
+
+    function decodeColumn(column){
+      if(TYPED_ARRAYS.hasOwnProperty(column.type)){
+        return new TYPED_ARRAYS[column.type](base64ToBytes(column.values).buffer);
+      }
+      if(column.type === "category"){
+        const codes = new Int32Array(base64ToBytes(column.codes).buffer);
+        return Array.from(codes, code => column.categories[code]);
+      }
+      return column.values;
+    }
+
+    function tableToRows(table){
+      // Row objects as required by SlickGrid and parcoords
+      const rows = new Array(table.num_rows);
+      for(let i=0; i<table.num_rows; i++){
+        rows[i] = {id: i, checkbox: 0};
+      }
+      for(const column of table.columns){
+        const name = column.name,
+          values = decodeColumn(column);
+        for(let i=0; i<rows.length; i++){
+          rows[i][name] = values[i];
+        }
+      }
+      return rows;
+    }
+
+    function create(options){
+      // Embedded data: inline JSON or deflate-compressed JSON text in base64 encoding,
+      // with lazy loading a list of such texts, one for each graph
+      const payload = {
+        compressed: options.compressed,
+        text: null,
+        lazy: options.lazy === true,
+        load(){
+          // Decompress the data once, afterwards it is parsed from payload.text when fetched
+          if(payload.compressed === null){
+            return Promise.resolve();
+          }
+          return decompress(payload.compressed).then(function(text){
+            payload.text = text;
+            payload.compressed = null;
+          });
+        },
+        loadGraph(entry){
+          // Parse the text of a single graph, which is decompressed first if required
+          if(typeof(entry.compressed) === "undefined"){
+            return Promise.resolve(JSON.parse(entry.text));
+          }
+          return decompress(entry.compressed).then(function(text){
+            return JSON.parse(text);
+          });
+        },
+        reportError(error){
+          const container = document.getElementById(options.containerId);
+          container.textContent = "Failed to load the data of this plot. " + error.message;
+          console.error(error);
+        },
+      };
+      return payload;
+    }
+
+    exports.base64ToBytes = base64ToBytes;
+    exports.inflate = inflate;
+    exports.decompress = decompress;
+    exports.decodeColumn = decodeColumn;
+    exports.tableToRows = tableToRows;
+    exports.create = create;
+  });
+}
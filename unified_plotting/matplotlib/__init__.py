@@ -23,10 +23,11 @@ try:
         'scatter_matrix',
         'violin',
         'Figure',
+        'export_batch',
     ]
 
     from matplotlib import rcParams as _rcParams
-    from matplotlib import pyplot as _plt
+    from matplotlib import style as _style
     import warnings as _warnings
 
     # 1) Customizations
@@ -39,7 +40,7 @@ try:
     _rcParams['axes.axisbelow'] = True
 
     # - Set global style, basis on which later both package- and user-defined settings are applied
-    _plt.style.use('seaborn-white')
+    _style.use('seaborn-white')
 
     # 2) Suppress undesired warnings
     # - via warning module
@@ -67,6 +68,7 @@ try:
     from ._plots_nd import scatter_matrix
     from ._plots_nd import violin
     from ._data_structures import Figure
+    from ._batch_export import export_batch
 except ImportError as excp:
     _logging.report_missing_library('Matplotlib', excp)
     __all__ = []
@@ -0,0 +1,211 @@
+"""Parallel creation and export of many Matplotlib figures in a pool of worker processes."""
+
+import concurrent.futures as _futures
+import gc as _gc
+import multiprocessing as _multiprocessing
+import os as _os
+
+import numpy as _np
+
+try:
+    from multiprocessing import shared_memory as _shared_memory  # Python >= 3.8
+except ImportError:
+    _shared_memory = None
+
+
+_SHARED_MEMORY_MIN_BYTES = 2 ** 20
+
+
+def export_batch(plot_specs, out_dir, workers=None, formats='png', callback=None):
+    """Create and export many Matplotlib figures in parallel with a pool of worker processes.
+
+    Rendering with Matplotlib is CPU-bound and limited by the global interpreter lock,
+    therefore figures are built and saved in separate processes to use all CPU cores.
+    Large numpy arrays in the plot arguments are placed in shared memory once and accessed by
+    the workers directly instead of being pickled for each job. This requires Python >= 3.8,
+    otherwise the arrays are pickled.
+
+    Parameters
+    ----------
+    plot_specs : iterable of dict
+        Description of each figure with the following keys:
+
+        - ``"function"``: Name of a plotting function in :py:mod:`unified_plotting.matplotlib`,
+          e.g. ``"scatter"``.
+        - ``"args"``: Optional sequence of positional arguments of the function.
+        - ``"kwargs"``: Optional dict of keyword arguments of the function.
+        - ``"filename"``: Optional name of the exported file without extension.
+          Default: ``"plot_<index>"``.
+
+    out_dir : str
+        Directory in which the files are created. It is created if it does not exist.
+        Existing files are overwritten without warning.
+    workers : int, optional
+        Number of worker processes. Default: number of CPU cores.
+    formats : str or list of str
+        Image formats in which each figure is exported, see the method ``export_many`` of
+        :ref:`Figure <mpl-figure>`. Raster graphics of several formats are encoded from one
+        rendering with Pillow. If it is not installed, each format is exported separately by
+        Matplotlib, which supports PNG without further packages.
+    callback : callable, optional
+        Function that is called in the main process with the result of each figure as soon as
+        it is completed, e.g. to report progress. Results arrive in order of completion.
+
+    Notes
+    -----
+    The worker processes are started with the "spawn" method, which imports the main module
+    of the calling program in each worker. A script therefore needs to call this function
+    inside an ``if __name__ == '__main__':`` block, otherwise each worker would run the
+    script again.
+
+    Returns
+    -------
+    results : list of dict
+        Result of each figure in order of the given specs, with the keys ``"index"``,
+        ``"filepaths"`` (mapping of image format to filepath) and ``"error"``
+        (None or a message). A failure of one figure does not affect the others.
+
+    Examples
+    --------
+    >>> specs = [dict(function='scatter', args=(x, y), kwargs=dict(title=name), filename=name)
+    ...          for name, x, y in data]
+    >>> results = up.matplotlib.export_batch(specs, 'plots', workers=8)
+
+    """
+    # Argument processing
+    plot_specs = list(plot_specs)
+    if workers is None:
+        workers = _os.cpu_count() or 1
+    if not isinstance(workers, int) or workers < 1:
+        message = 'Argument "workers" needs to be a positive int.'
+        raise ValueError(message)
+    if isinstance(formats, str):
+        formats = [formats]
+    for spec in plot_specs:
+        if not isinstance(spec, dict) or 'function' not in spec:
+            message = 'Each plot spec needs to be a dict with at least the key "function".'
+            raise ValueError(message)
+    _os.makedirs(out_dir, exist_ok=True)
+
+    # Transformation
+    results = [None] * len(plot_specs)
+    shared_blocks = dict()
+    try:
+        jobs = []
+        for index, spec in enumerate(plot_specs):
+            job = dict(
+                function=spec['function'],
+                args=_share_arrays(spec.get('args', ()), shared_blocks),
+                kwargs=_share_arrays(spec.get('kwargs', {}), shared_blocks),
+                filepath=_os.path.join(out_dir, spec.get('filename', 'plot_{}'.format(index))),
+            )
+            jobs.append(job)
+        # Spawned workers start with a clean Matplotlib state and a non-interactive backend
+        try:
+            executor = _futures.ProcessPoolExecutor(
+                workers, mp_context=_multiprocessing.get_context('spawn'),
+                initializer=_initialize_worker)
+        except TypeError:
+            executor = _futures.ProcessPoolExecutor(workers)  # Python 3.6
+        with executor:
+            futures = {executor.submit(_build_and_export, index, job, formats): index
+                       for index, job in enumerate(jobs)}
+            for future in _futures.as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as excp:
+                    # Worker process crashed, the pool can not be used anymore
+                    result = dict(index=futures[future], filepaths=dict(), error=_describe(excp))
+                results[result['index']] = result
+                if callback is not None:
+                    callback(result)
+    finally:
+        for block in shared_blocks.values():
+            block.close()
+            block.unlink()
+    return results
+
+
+class _SharedArray:
+    """Reference to a numpy array in shared memory, which is pickled instead of the data."""
+
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+
+def _share_arrays(item, shared_blocks):
+    """Replace large numpy arrays in a nested argument structure by shared memory references."""
+    if isinstance(item, (list, tuple)):
+        return type(item)(_share_arrays(val, shared_blocks) for val in item)
+    if isinstance(item, dict):
+        return {key: _share_arrays(val, shared_blocks) for key, val in item.items()}
+    if (_shared_memory is not None and isinstance(item, _np.ndarray)
+            and item.dtype.kind in 'biufc' and item.nbytes >= _SHARED_MEMORY_MIN_BYTES):
+        # The same array object is shared only once, even if it occurs in several specs
+        if id(item) not in shared_blocks:
+            block = _shared_memory.SharedMemory(create=True, size=item.nbytes)
+            _np.ndarray(item.shape, item.dtype, buffer=block.buf)[...] = item
+            shared_blocks[id(item)] = block
+        return _SharedArray(shared_blocks[id(item)].name, item.shape, item.dtype.str)
+    return item
+
+
+def _attach_arrays(item, attached_blocks):
+    """Replace shared memory references by read-only numpy arrays that use the shared data."""
+    if isinstance(item, (list, tuple)):
+        return type(item)(_attach_arrays(val, attached_blocks) for val in item)
+    if isinstance(item, dict):
+        return {key: _attach_arrays(val, attached_blocks) for key, val in item.items()}
+    if isinstance(item, _SharedArray):
+        block = _shared_memory.SharedMemory(name=item.name)
+        attached_blocks.append(block)
+        array = _np.ndarray(item.shape, _np.dtype(item.dtype), buffer=block.buf)
+        array.flags.writeable = False
+        return array
+    return item
+
+
+def _initialize_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _build_and_export(index, job, formats):
+    """Create a figure in a worker process and export it in all requested formats."""
+    attached_blocks = []
+    try:
+        return _build_and_export_with_arrays(index, job, formats, attached_blocks)
+    finally:
+        # The arguments and the figure were local to the call above, but artists may still
+        # be part of reference cycles that point into the shared data until they are collected
+        if attached_blocks:
+            _gc.collect()
+        for block in attached_blocks:
+            block.close()
+
+
+def _build_and_export_with_arrays(index, job, formats, attached_blocks):
+    from .. import matplotlib as _up_matplotlib
+    from . import _data_structures
+
+    try:
+        args = _attach_arrays(job['args'], attached_blocks)
+        kwargs = _attach_arrays(job['kwargs'], attached_blocks)
+        fig = getattr(_up_matplotlib, job['function'])(*args, **kwargs)
+        if _data_structures._pil_image is None:
+            # Without Pillow each format is saved separately with savefig, where PNG works
+            filepaths = {data_format: fig._export_img(job['filepath'], data_format)
+                         for data_format in formats}
+        else:
+            targets = {data_format: job['filepath'] for data_format in formats}
+            filepaths = fig.export_many(targets)
+        result = dict(index=index, filepaths=filepaths, error=None)
+    except Exception as excp:
+        result = dict(index=index, filepaths=dict(), error=_describe(excp))
+    return result
+
+
+def _describe(excp):
+    return '{}: {}'.format(type(excp).__name__, excp)
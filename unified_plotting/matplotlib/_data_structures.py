@@ -1,14 +1,51 @@
 """Data structures for representing Matplotlib plots."""
 
+import inspect as _inspect
 import io as _io
+import os as _os
+import threading as _threading
 
-import matplotlib.pyplot as _plt
+import numpy as _np
+from matplotlib import font_manager as _font_manager
+from matplotlib.backends.backend_agg import FigureCanvasAgg as _FigureCanvasAgg
+
+try:
+    from PIL import Image as _pil_image
+except ImportError:
+    _pil_image = None
 
 from .._unified_arguments import shared_processing as _shared_processing
 from ..utilities import base64 as _base64
 from ..utilities import operating_system as _operating_system
 
 
+_RASTER_FORMATS = {'png': 'PNG', 'jpg': 'JPEG', 'jpeg': 'JPEG', 'tif': 'TIFF', 'tiff': 'TIFF',
+                   'webp': 'WEBP'}
+_VECTOR_FORMATS = ['eps', 'pdf', 'pgf', 'ps', 'svg']
+
+
+def _font_cache_is_thread_local():
+    """Check if Matplotlib keeps separate font objects for each thread, as newer versions do."""
+    try:
+        return 'thread_id' in _inspect.signature(_font_manager._get_font).parameters
+    except Exception:
+        return False
+
+
+class _NoLock:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+# Older Matplotlib versions share font objects between all threads and protect them only during
+# Agg drawing, but text is also measured by layout calculations and vector backends.
+# Therefore rendering is serialized for them, while figures are still created concurrently.
+_RENDER_LOCK = _NoLock() if _font_cache_is_thread_local() else _threading.RLock()
+
+
 class Figure:
     """Data structure for wrapping, representing, displaying and exporting a Matplotlib figure.
 
@@ -37,6 +74,7 @@ class Figure:
                  margin_bottom_pt=None, margin_bottom_rel=None):
         """Initialize a figure with a Matplotlib figure object."""
         self.fig = fig
+        self._output_cache = _shared_processing.OutputCache()
         self.set_size(
             width_mm, width_in, width_pt, height_mm, height_in, height_pt, dpi,
             margin_auto, margin_left_mm, margin_left_in, margin_left_pt, margin_left_rel,
@@ -46,9 +84,15 @@ class Figure:
         self._display_format = 'png'
 
     def __del__(self):
-        """Delete a figure by closing the embedded Matplotlib figure object."""
+        """Delete a figure, closing the embedded Matplotlib figure object if pyplot manages it.
+
+        Figures created by this package are not known to pyplot and need no closing, but a
+        figure passed in by the user may be registered in pyplot's global figure manager.
+        """
         try:
-            _plt.close(self.fig)
+            if getattr(self.fig.canvas, 'manager', None) is not None:
+                import matplotlib.pyplot as plt
+                plt.close(self.fig)
         except Exception:
             pass
 
@@ -180,6 +224,7 @@ class Figure:
 
         """
         # Calculate quantities in all units
+        self._output_cache.clear()
         current_size = self.size if hasattr(self, 'size') else None
         self.size = _shared_processing.SizeManager(
             width_mm, width_in, width_pt, height_mm, height_in, height_pt, dpi,
@@ -192,7 +237,8 @@ class Figure:
         self.fig.set_size_inches(self.size.width_in, self.size.height_in)
         # Set margins
         if self.size.margin_auto:
-            self.fig.tight_layout()
+            with _RENDER_LOCK:
+                self.fig.tight_layout()
         else:
             self.fig.subplots_adjust(
                 left=self.size.margin_left_rel,
@@ -213,6 +259,7 @@ class Figure:
             data_format = data_format.lower()
         known_formats = ['eps', 'pdf', 'png', 'ps', 'svg']
         if data_format in known_formats:
+            self._output_cache.clear()
             self._display_format = data_format
         else:
             message = 'Unknown data format. Possible values: {}'.format(known_formats)
@@ -245,6 +292,22 @@ class Figure:
         else:
             _operating_system.open_html_text_in_webbrowser(self._repr_html_())
 
+    # Cache of rendered representations
+    def _cached(self, name, function):
+        """Get a rendered representation from the output cache or render and cache it.
+
+        The cache is invalidated by any modification of the Matplotlib figure object, which is
+        detected with its stale flag: each change of an artist marks it and its parents as stale.
+        Rendering does not reset the flag, therefore it is done here.
+
+        """
+        if self.fig.stale:
+            self._output_cache.clear()
+        key = (name, self.size.width_in, self.size.height_in, self.size.dpi)
+        value = self._output_cache.get(key, function, id(self.fig))
+        self.fig.stale = False
+        return value
+
     # Representation as text
     @property
     def html_text(self):
@@ -261,9 +324,12 @@ class Figure:
     @property
     def svg_text(self):
         """Create an SVG text representation of the plot, usable in HTML context or SVG file."""
+        return self._cached('svg_text', self._render_svg_text)
+
+    def _render_svg_text(self):
         # Write SVG output into memory
         try:
-            with _io.StringIO() as file_handle:
+            with _io.StringIO() as file_handle, _RENDER_LOCK:
                 self.fig.savefig(
                     fname=file_handle,
                     dpi=self.size.dpi,
@@ -285,8 +351,11 @@ class Figure:
     # Representation as data URL
     def _to_binary_data(self, data_format):
         """Create a binary representation of the plot in a chosen image format."""
+        return self._cached(data_format, lambda: self._render_binary_data(data_format))
+
+    def _render_binary_data(self, data_format):
         try:
-            with _io.BytesIO() as file_handle:
+            with _io.BytesIO() as file_handle, _RENDER_LOCK:
                 # Note: Passing facecolor is necessary, otherwise it would default to 'w'
                 self.fig.savefig(
                     fname=file_handle,
@@ -302,6 +371,28 @@ class Figure:
             raise ValueError(message)
         return binary_data
 
+    def _render_rgba(self):
+        """Draw the plot once on an Agg canvas and return its pixels as RGBA array.
+
+        The canvas and resolution of the figure are restored afterwards, as done by savefig.
+
+        """
+        original_canvas = self.fig.canvas
+        original_dpi = self.fig.dpi
+        try:
+            self.fig.dpi = self.size.dpi
+            canvas = _FigureCanvasAgg(self.fig)
+            with _RENDER_LOCK:
+                canvas.draw()
+            rgba = _np.array(canvas.buffer_rgba())
+        except Exception:
+            message = 'Matplotlib failed to draw the plot on an Agg canvas.'
+            raise ValueError(message)
+        finally:
+            self.fig.dpi = original_dpi
+            self.fig.set_canvas(original_canvas)
+        return rgba
+
     def _to_data_url(self, data_format):
         """Create a data URL representation with base64 encoded date in a chosen image format."""
         binary_data = self._to_binary_data(data_format)
@@ -434,14 +525,15 @@ class Figure:
 
         # Transformation
         try:
-            self.fig.savefig(
-                fname=filepath_used,
-                dpi=self.size.dpi,
-                quality=quality,
-                facecolor=self.fig.get_facecolor(),
-                edgecolor=self.fig.get_edgecolor(),
-                format=data_format,
-            )
+            with _RENDER_LOCK:
+                self.fig.savefig(
+                    fname=filepath_used,
+                    dpi=self.size.dpi,
+                    quality=quality,
+                    facecolor=self.fig.get_facecolor(),
+                    edgecolor=self.fig.get_edgecolor(),
+                    format=data_format,
+                )
         except Exception:
             message = 'Matplotlib failed to generate an image in "{}" format.'.format(data_format)
             raise ValueError(message)
@@ -573,3 +665,97 @@ class Figure:
 
         """
         return self._export_img(filepath, data_format='svg')
+
+    # Export as image files in several formats
+    def export_many(self, targets, thumbnail_filepath=None, thumbnail_max_px=256):
+        """Export the plot in several formats, rendering all raster graphics only once.
+
+        The plot is drawn a single time on an Agg canvas and the resulting pixel buffer is
+        encoded into each requested raster format and an optional thumbnail, instead of
+        drawing the whole canvas again for each format. The buffer is also kept in the output
+        cache of the figure, so that repeated calls do not draw it again as long as the figure
+        is not modified. Vector formats are written by their own Matplotlib backends.
+
+        Parameters
+        ----------
+        targets : dict
+            Mapping of image format to filepath, e.g. ``{'png': 'plot', 'jpg': 'plot'}``.
+            Raster formats: "png", "jpg", "jpeg", "tif", "tiff", "webp".
+            Vector formats: "eps", "pdf", "pgf", "ps", "svg".
+            If a file exists it will be overwritten without warning.
+            If a path does not end with the extension of its format it will be changed to do so.
+            If a parent directory does not exist it will be created.
+        thumbnail_filepath : str, optional
+            Filepath of a downscaled raster image created from the same pixel buffer.
+            Its format is determined by the file extension, which needs to be one of the raster
+            formats. Otherwise ".png" is appended.
+        thumbnail_max_px : int
+            Maximum width and height of the thumbnail in pixels. The aspect ratio is preserved.
+
+        Returns
+        -------
+        filepaths_used : dict
+            Mapping of image format to filepath of the generated file.
+            If a thumbnail was requested, its filepath is available under the key "thumbnail".
+
+        """
+        # Argument processing
+        for data_format in targets:
+            if data_format not in _RASTER_FORMATS and data_format not in _VECTOR_FORMATS:
+                message = 'Unknown data format "{}". Possible values: {}'.format(
+                    data_format, list(_RASTER_FORMATS) + _VECTOR_FORMATS)
+                raise ValueError(message)
+        if thumbnail_filepath is not None:
+            thumbnail_format = _os.path.splitext(thumbnail_filepath)[1][1:].lower()
+            if thumbnail_format not in _RASTER_FORMATS:
+                thumbnail_format = 'png'
+        raster_formats = [data_format for data_format in targets if data_format in _RASTER_FORMATS]
+        if (raster_formats or thumbnail_filepath is not None) and _pil_image is None:
+            message = 'Exporting raster graphics with export_many requires the package Pillow.'
+            raise ValueError(message)
+
+        # Transformation
+        filepaths_used = dict()
+        if raster_formats or thumbnail_filepath is not None:
+            rgba = self._cached('rgba', self._render_rgba)
+            image = _pil_image.fromarray(rgba, 'RGBA')
+            for data_format in raster_formats:
+                filepaths_used[data_format] = self._export_pil_image(
+                    image, targets[data_format], data_format)
+            if thumbnail_filepath is not None:
+                thumbnail = image.copy()
+                thumbnail.thumbnail((thumbnail_max_px, thumbnail_max_px), _pil_image.LANCZOS)
+                filepaths_used['thumbnail'] = self._export_pil_image(
+                    thumbnail, thumbnail_filepath, thumbnail_format)
+        for data_format in targets:
+            if data_format in _VECTOR_FORMATS:
+                filepaths_used[data_format] = self._export_img(targets[data_format], data_format)
+        return filepaths_used
+
+    def _export_pil_image(self, image, filepath, data_format):
+        """Encode a Pillow image of the rendered plot into a raster graphic file."""
+        # Precondition
+        filepath_used = _operating_system.ensure_file_extension(filepath, data_format)
+        _operating_system.ensure_parent_directory(filepath_used)
+
+        # Transformation
+        pil_format = _RASTER_FORMATS[data_format]
+        kwargs = dict(format=pil_format, dpi=(self.size.dpi, self.size.dpi))
+        if pil_format == 'JPEG':
+            # No transparency in JPEG: composite onto white like Matplotlib does
+            background = _pil_image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+            kwargs['quality'] = 95
+        try:
+            image.save(filepath_used, **kwargs)
+        except Exception:
+            message = 'Pillow failed to generate an image in "{}" format.'.format(data_format)
+            raise ValueError(message)
+
+        # Postcondition
+        _operating_system.is_nonempty_file(
+            filepath_used, raise_exception=True,
+            message='Export of plot as image file in {} format failed.'.format(
+                data_format.upper()))
+        return filepath_used
@@ -4,8 +4,10 @@ import math as _math
 from collections.abc import Iterable as _Iterable
 from numbers import Number as _Number
 
-import matplotlib.pyplot as _plt
+from matplotlib import cm as _cm
+from matplotlib.backends.backend_agg import FigureCanvasAgg as _FigureCanvasAgg
 from matplotlib.colors import LinearSegmentedColormap as _LinearSegmentedColormap
+from matplotlib.figure import Figure as _MplFigure
 from mpl_toolkits.axes_grid1.inset_locator import inset_axes as _inset_axes
 from mpl_toolkits.mplot3d import Axes3D  # required, although not used directly
 
@@ -21,22 +23,38 @@ from ._data_structures import Figure as _Figure
 
 # 0) External fig and ax objects
 
+def new_figure():
+    """Create a Matplotlib figure with an Agg canvas that is independent of pyplot.
+
+    Figures created with pyplot are registered in its global figure manager until they are
+    closed, which is not thread-safe and keeps them alive. A figure created here is not
+    known to pyplot and is released like any other Python object.
+
+    References
+    ----------
+    - https://matplotlib.org/faq/howto_faq.html#how-to-use-matplotlib-in-a-web-application-server
+
+    """
+    fig = _MplFigure()
+    _FigureCanvasAgg(fig)
+    return fig
+
+
 def extract_fig_and_ax(kwargs):
     """Extract fig and ax from kwargs."""
     given = _parse_spec_kwargs(_args.external_fig_and_ax, kwargs)
     fig, ax = given['fig'], given['ax']
 
     if fig is None or ax is None:
-        new_fig, new_ax = _plt.subplots()
         if isinstance(fig, _Figure):
             fig = fig.fig
         elif fig is None:
-            fig = new_fig
+            fig = new_figure() if ax is None else ax.figure
         if ax is None:
             try:
                 ax = fig.axes[0]
             except Exception:
-                ax = new_ax
+                ax = fig.add_subplot(111)
     return fig, ax
 
 
@@ -52,7 +70,7 @@ def extract_fig_and_ax_3d(kwargs):
 
     if fig is None or ax is None:
         if fig is None:
-            fig = _plt.figure()
+            fig = new_figure()
         if ax is None:
             ax = fig.add_subplot(111, projection='3d')  # better behavior than _Axes3D(fig)
     return fig, ax
@@ -1083,7 +1101,7 @@ def _convert_colormap(given_colormap):
 
 def convert_colormap_spec(given_colormap_spec):
     """Convert a general colormap spec into one that can be used by Matplotlib."""
-    colormap = _plt.cm.get_cmap(_convert_colormap(given_colormap_spec['colormap']))
+    colormap = _cm.get_cmap(_convert_colormap(given_colormap_spec['colormap']))
     if given_colormap_spec['colormap_reversed']:
         colormap = colormap.reversed()
     mpl_colormap_spec = dict(
@@ -1118,7 +1136,7 @@ def set_colormap_properties(ax, collection, mpl_colormap_spec):
         bbox_transform=ax.transAxes,
         borderpad=0,
     )
-    color_bar = _plt.colorbar(collection, cax=cax)
+    color_bar = ax.figure.colorbar(collection, cax=cax)
     color_bar.solids.set_edgecolor('face')  # fixes a problem with discrete lines in colorbar
     color_bar.set_alpha(1.0)
     color_bar.draw_all()
@@ -2,8 +2,6 @@
 
 from collections.abc import Iterable as _Iterable
 
-import matplotlib.pyplot as _plt
-
 from .._unified_arguments import arguments as _args
 from .._unified_arguments import shared_preprocessing as _shared_preprocessing
 from .._unified_arguments import shared_processing as _shared_processing
@@ -55,7 +53,6 @@ def hexbin(x, y, opacity=None, **kwargs):
     x, y = _shared_preprocessing.prepare_vector_data_2d(x, y, kwargs)
 
     # Layout
-    _plt.ioff()  # Required to prevent multiple outputs, not sure why it needs to be exactly here
     fig, ax = _matplotlib_processing.extract_fig_and_ax(kwargs)
     size_spec = _matplotlib_processing.set_plot_size(kwargs, fig)
     _matplotlib_processing.set_plot_color(kwargs, fig, ax)
@@ -132,7 +129,6 @@ def histogram_2d(x, y, opacity=None, **kwargs):
     x, y = _shared_preprocessing.prepare_vector_data_2d(x, y, kwargs)
 
     # Layout
-    _plt.ioff()  # Required to prevent multiple outputs, not sure why it needs to be exactly here
     fig, ax = _matplotlib_processing.extract_fig_and_ax(kwargs)
     size_spec = _matplotlib_processing.set_plot_size(kwargs, fig)
     _matplotlib_processing.set_plot_color(kwargs, fig, ax)
@@ -235,7 +231,6 @@ def scatter(x, y, name=None, color=None, opacity=None, **kwargs):
         _shared_preprocessing.prepare_vector_data_2d_multiple(x, y, kwargs)
 
     # Layout
-    _plt.ioff()  # Required to prevent multiple outputs, not sure why it needs to be exactly here
     fig, ax = _matplotlib_processing.extract_fig_and_ax(kwargs)
     size_spec = _matplotlib_processing.set_plot_size(kwargs, fig)
     _matplotlib_processing.set_plot_color(kwargs, fig, ax)
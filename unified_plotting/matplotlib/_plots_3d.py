@@ -2,8 +2,6 @@
 
 from collections.abc import Iterable as _Iterable
 
-import matplotlib.pyplot as _plt
-
 from .._unified_arguments import arguments as _args
 from .._unified_arguments import shared_preprocessing as _shared_preprocessing
 from .._unified_arguments import shared_processing as _shared_processing
@@ -95,7 +93,6 @@ def contour(x, y, z, opacity=None,
         interpolation_num_x_gridpoints, interpolation_num_y_gridpoints)
 
     # Layout
-    _plt.ioff()  # Required to prevent multiple outputs, not sure why it needs to be exactly here
     fig, ax = _matplotlib_processing.extract_fig_and_ax(kwargs)
     size_spec = _matplotlib_processing.set_plot_size(kwargs, fig)
     _matplotlib_processing.set_plot_color(kwargs, fig, ax)
@@ -195,7 +192,6 @@ def scatter_3d(x, y, z, name=None, color=None, opacity=None,
         x, y, z, kwargs)
 
     # Layout
-    _plt.ioff()  # Required to prevent multiple outputs, not sure why it needs to be exactly here.
     fig, ax = _matplotlib_processing.extract_fig_and_ax_3d(kwargs)
     size_spec = _matplotlib_processing.set_plot_size(kwargs, fig)
     _matplotlib_processing.set_plot_color(kwargs, fig, ax)
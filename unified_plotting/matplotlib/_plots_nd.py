@@ -2,8 +2,6 @@
 
 from collections.abc import Iterable as _Iterable
 
-import matplotlib.pyplot as _plt
-
 from .. import _logging
 from .._unified_arguments import arguments as _args
 from .._unified_arguments import shared_preprocessing as _shared_preprocessing
@@ -75,7 +73,6 @@ def box(data, name=None, color=None, opacity=None, orientation='vertical',
         orientation, 'orientation', ['vertical', 'horizontal'])
 
     # Layout
-    _plt.ioff()  # Required to prevent multiple outputs, not sure why it needs to be exactly here
     fig, ax = _matplotlib_processing.extract_fig_and_ax(kwargs)
     size_spec = _matplotlib_processing.set_plot_size(kwargs, fig)
     _matplotlib_processing.set_plot_color(kwargs, fig, ax)
@@ -180,7 +177,6 @@ def histogram(data, name=None, color=None, opacity=None, bar_mode='group', orien
     histtype = 'barstacked' if bar_mode == 'stack' else 'bar'
 
     # Layout
-    _plt.ioff()  # Required to prevent multiple outputs, not sure why it needs to be exactly here
     fig, ax = _matplotlib_processing.extract_fig_and_ax(kwargs)
     size_spec = _matplotlib_processing.set_plot_size(kwargs, fig)
     _matplotlib_processing.set_plot_color(kwargs, fig, ax)
@@ -296,8 +292,8 @@ def scatter_matrix(data, name=None, color=None, opacity=None,
 
     # Layout
     num_series = len(data)
-    _plt.ioff()  # Required to prevent multiple outputs, not sure why it needs to be exactly here
-    fig, axes = _plt.subplots(num_series, num_series, sharex='col')
+    fig = _matplotlib_processing.new_figure()
+    axes = fig.subplots(num_series, num_series, sharex='col')
     size_spec = _matplotlib_processing.set_plot_size(kwargs, fig)
     _matplotlib_processing.set_super_title(kwargs, fig)
 
@@ -468,7 +464,6 @@ def violin(data, name=None, color=None, opacity=None, violin_width=0.6, orientat
         orientation, 'orientation', ['vertical', 'horizontal'])
 
     # Layout
-    _plt.ioff()  # Required to prevent multiple outputs, not sure why it needs to be exactly here
     fig, ax = _matplotlib_processing.extract_fig_and_ax(kwargs)
     size_spec = _matplotlib_processing.set_plot_size(kwargs, fig)
     _matplotlib_processing.set_plot_color(kwargs, fig, ax)
@@ -32,6 +32,7 @@ try:
         'surface',
         'violin',
         'Figure',
+        'ExportPool',
     ]
 
     # Plot imports
@@ -54,6 +55,7 @@ try:
     from ._plots_financial import candlestick
     from ._plots_financial import ohlc
     from ._data_structures import Figure
+    from ._export_pool import ExportPool
 except ImportError as excp:
     __all__ = []
     _logging.report_missing_library('Plotly', excp)
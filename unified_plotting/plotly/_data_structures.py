@@ -1,6 +1,12 @@
 """Data structures for representing Plotly plots."""
 
+import warnings as _warnings
+from functools import lru_cache as _lru_cache
+from hashlib import sha256 as _sha256
+from os.path import join as _join
+
 from plotly import io as _pio
+from plotly.offline import get_plotlyjs as _get_plotlyjs
 from plotly.offline import init_notebook_mode as _init_notebook_mode
 
 from .._unified_arguments import shared_processing as _shared_processing
@@ -37,6 +43,7 @@ class Figure:
                  margin_bottom_pt=None, margin_bottom_rel=None):
         """Initialize a figure with a Plotly figure object."""
         self.fig = fig
+        self._output_cache = _shared_processing.OutputCache()
         self.set_size(
             width_mm, width_in, width_pt, height_mm, height_in, height_pt, dpi,
             margin_auto,
@@ -50,6 +57,7 @@ class Figure:
     def __add__(self, other):
         """Add a figure to this one in a simplistic way by adding the trace but not its layout."""
         self.fig.add_traces(other.fig['data'])
+        self._output_cache.clear()
         return self
 
     # IPython integration
@@ -206,6 +214,7 @@ class Figure:
 
         """
         # Calculate quantities in all units
+        self._output_cache.clear()
         current_size = self.size if hasattr(self, 'size') else None
         self.size = _shared_processing.SizeManager(
             width_mm, width_in, width_pt, height_mm, height_in, height_pt, dpi,
@@ -243,6 +252,7 @@ class Figure:
             data_format = data_format.lower()
         known_formats = ['html', 'eps', 'jpg', 'pdf', 'png', 'svg', 'webp']
         if data_format in known_formats:
+            self._output_cache.clear()
             self._display_format = data_format
         else:
             message = 'Unknown data format. Possible values: {}'.format(known_formats)
@@ -268,6 +278,19 @@ class Figure:
         else:
             _operating_system.open_html_text_in_webbrowser(self.html_text)
 
+    # Cache of rendered representations
+    def _cached(self, name, function):
+        """Get a rendered representation from the output cache or render and cache it.
+
+        The cache is invalidated by any modification of the Plotly figure object, which is
+        detected by a fingerprint of its content that is much cheaper to calculate than
+        a rendering.
+
+        """
+        key = (name, self.size.width_px, self.size.height_px, self.size.dpi)
+        state = _fingerprint(self.fig, self._config)
+        return self._output_cache.get(key, function, state)
+
     # Representation as text
     @property
     def html_text(self):
@@ -283,13 +306,15 @@ class Figure:
         - https://plot.ly/python-api-reference/generated/plotly.io.to_html.html
 
         """
-        html_text = _pio.to_html(
-            fig=self.fig,
-            config=self._config,
-            full_html=True,         # starting with an <html> tag
-            include_plotlyjs=True,  # script tag containing plotly.js source code (~3MB)
-        )
-        return html_text
+        def render():
+            return _pio.to_html(
+                fig=self.fig,
+                config=dict(self._config),  # copy, since plotly adds a key
+                full_html=True,         # starting with an <html> tag
+                include_plotlyjs=True,  # script tag containing plotly.js source code (~3MB)
+            )
+
+        return self._cached('html_standalone', render)
 
     @property
     def html_text_cdn(self):
@@ -300,13 +325,15 @@ class Figure:
         - https://plot.ly/python-api-reference/generated/plotly.io.to_html.html
 
         """
-        html_text = _pio.to_html(
-            fig=self.fig,
-            config=self._config,
-            full_html=True,
-            include_plotlyjs='cdn',  # plotly.js is loaded using a CDN (requires web connection!)
-        )
-        return html_text
+        def render():
+            return _pio.to_html(
+                fig=self.fig,
+                config=dict(self._config),
+                full_html=True,
+                include_plotlyjs='cdn',  # plotly.js is loaded from a CDN (needs web connection!)
+            )
+
+        return self._cached('html_cdn', render)
 
     @property
     def html_text_partial(self):
@@ -320,6 +347,7 @@ class Figure:
         # Caution: Needs require.js to know where to find plotly.js
         #          For Jupyter notebooks it is ensured with_init_notebook_mode() in _repr_html_()
         #          For use in a webserver, it has to be ensured by surrounding JS code.
+        # Not cached, because each output needs its own div id to be shown twice in a notebook
         html_text = _pio.to_html(
             fig=self.fig,
             config=self._config,
@@ -344,7 +372,7 @@ class Figure:
         - https://help.plot.ly/json-chart-schema
 
         """
-        return _pio.to_json(fig=self.fig)
+        return self._cached('json', lambda: _pio.to_json(fig=self.fig))
 
     @property
     def svg_text(self):
@@ -361,14 +389,16 @@ class Figure:
         - https://plot.ly/python-api-reference/generated/plotly.io.to_image.html
 
         """
-        binary_data = _pio.to_image(
-            fig=self.fig,
-            format=data_format,
-            width=self.size.width_px,    # width of the exported image in layout pixels
-            height=self.size.height_px,  # height of the exported image in layout pixels
-            scale=self.size.dpi / 96.0,  # larger than 1.0 will increase the image resolution
-        )
-        return binary_data
+        def render():
+            return _pio.to_image(
+                fig=self.fig,
+                format=data_format,
+                width=self.size.width_px,    # width of the exported image in layout pixels
+                height=self.size.height_px,  # height of the exported image in layout pixels
+                scale=self.size.dpi / 96.0,  # larger than 1.0 will increase the image resolution
+            )
+
+        return self._cached(data_format, render)
 
     def _to_data_url(self, data_format):
         binary_data = self._to_binary_data(data_format)
@@ -454,7 +484,7 @@ class Figure:
         return self._to_img_element('webp')
 
     # Export as HTML file (interactive)
-    def export_html(self, filepath):
+    def export_html(self, filepath, assets='inline', asset_directory=None):
         """Export the plot as HTML file that contains an interactive vector graphic.
 
         Parameters
@@ -464,6 +494,18 @@ class Figure:
             If the file exists it will be overwritten without warning.
             If the path does not end with ".html" it will be changed to do so.
             If the parent directory does not exist it will be created.
+        assets : str
+            Possible values: "inline", "directory".
+            If "inline", the code of plotly.js (~3MB) is embedded in the HTML file, so that
+            it is fully self-contained.
+            If "directory", plotly.js is written only once into a shared directory, with
+            a hash of its content in the filename, and the HTML file refers to it with a
+            relative script tag. This considerably reduces the total size when many plots
+            are exported. Both variants work offline, but in the second one the HTML file
+            and the asset directory need to be moved together.
+        asset_directory : str
+            Directory for the plotly.js file if assets is "directory".
+            If None, a directory named "assets" next to the HTML file is used.
 
         Returns
         -------
@@ -482,14 +524,32 @@ class Figure:
         filepath_used = _operating_system.ensure_file_extension(filepath, 'html')
         _operating_system.ensure_parent_directory(filepath_used)
 
+        # Argument processing
+        if assets == 'inline':
+            include_plotlyjs = True  # script tag containing plotly.js source code (~3MB)
+        elif assets == 'directory':
+            if asset_directory is None:
+                asset_directory = _join(
+                    _operating_system.get_parent_directory(filepath_used), 'assets')
+            plotlyjs_text, plotlyjs_digest = _load_plotlyjs()
+            plotlyjs_filepath = _operating_system.write_content_addressed_file(
+                plotlyjs_text, asset_directory, 'plotly.min', 'js', plotlyjs_digest)
+            # script tag with a relative src attribute pointing to the shared plotly.js file
+            include_plotlyjs = _operating_system.get_relative_url(
+                plotlyjs_filepath, filepath_used)
+        else:
+            message = 'Value "{}" for assets is invalid. Possible values: {}'.format(
+                assets, ['inline', 'directory'])
+            raise ValueError(message)
+
         # Transformation
         _pio.write_html(
             fig=self.fig,
             file=filepath_used,
             config=self._config,
             auto_open=False,
-            full_html=True,         # starting with an <html> tag
-            include_plotlyjs=True,  # script tag containing plotly.js source code (~3MB)
+            full_html=True,  # starting with an <html> tag
+            include_plotlyjs=include_plotlyjs,
         )
 
         # Postcondition
@@ -696,3 +756,25 @@ class Figure:
 
         """
         return self._export_img(filepath, data_format='svg')
+
+
+@_lru_cache(maxsize=None)
+def _load_plotlyjs():
+    """Load the bundled plotly.js code and its SHA-256 digest once per process."""
+    text = _get_plotlyjs()
+    return text, _sha256(text.encode('utf-8')).hexdigest()
+
+
+def _fingerprint(fig, config):
+    """Calculate a hash of the current content of a Plotly figure object and its config.
+
+    The content is taken from the public dict representation of the figure with data,
+    layout and frames. Instead of serializing it, numerical or textual sequences are hashed
+    as contiguous arrays, which is fast even for large data.
+
+    """
+    digest = _sha256()
+    with _warnings.catch_warnings():
+        _warnings.simplefilter('ignore')  # numpy warns about ragged nested sequences
+        _shared_processing.update_fingerprint(digest, [fig.to_plotly_json(), config])
+    return id(fig), digest.hexdigest()
@@ -0,0 +1,322 @@
+"""Pool of persistent worker processes for exporting many Plotly figures as image files."""
+
+import multiprocessing as _multiprocessing
+import os as _os
+import signal as _signal
+import time as _time
+from collections import deque as _deque
+from multiprocessing.connection import wait as _wait
+
+from plotly import io as _pio
+
+from ..utilities import operating_system as _operating_system
+from ._data_structures import Figure as _Figure
+
+
+_KNOWN_FORMATS = ['eps', 'jpg', 'jpeg', 'pdf', 'png', 'svg', 'webp']
+
+
+class ExportPool:
+    """Pool of long-lived worker processes that export Plotly figures as static image files.
+
+    Plotly's static image export relies on an external renderer process (Orca), whose startup
+    and per-call communication dominate when thousands of figures are exported one by one.
+    Each worker process of this pool loads Plotly once and keeps its renderer running between
+    jobs, and the jobs of a batch are distributed over all workers, so that throughput scales
+    with the number of CPU cores.
+
+    Workers are started on demand when the first batch is submitted. A job that exceeds the
+    timeout is aborted by terminating its worker, which is then replaced by a new one.
+    A job whose worker crashed is resubmitted to a new worker up to ``max_retries`` times.
+
+    The pool can be used as context manager, otherwise :py:meth:`close` needs to be called
+    to stop the worker processes.
+
+    The worker processes are started with the "spawn" method, which imports the main module
+    of the calling program in each worker. A script therefore needs to use the pool inside
+    an ``if __name__ == '__main__':`` block, otherwise each worker would run the script again.
+
+    Parameters
+    ----------
+    num_workers : int, optional
+        Number of worker processes. Default: number of CPU cores.
+    timeout : float, optional
+        Maximum time in seconds a single export may take. Default: no limit.
+    max_retries : int
+        Number of times a job is resubmitted after its worker process crashed.
+
+    Examples
+    --------
+    >>> with up.plotly.ExportPool(num_workers=4, timeout=60) as pool:
+    ...     filepaths = pool.export_batch(figures, ['png', 'svg'], ['plot_1', 'plot_2'])
+
+    """
+
+    def __init__(self, num_workers=None, timeout=None, max_retries=1):
+        """Create a pool without starting any worker process yet."""
+        # Argument processing
+        if num_workers is None:
+            num_workers = _os.cpu_count() or 1
+        if not isinstance(num_workers, int) or num_workers < 1:
+            message = 'Argument "num_workers" needs to be a positive int.'
+            raise ValueError(message)
+        if timeout is not None and timeout <= 0:
+            message = 'Argument "timeout" needs to be None or a positive number.'
+            raise ValueError(message)
+        if not isinstance(max_retries, int) or max_retries < 0:
+            message = 'Argument "max_retries" needs to be a non-negative int.'
+            raise ValueError(message)
+
+        self.num_workers = num_workers
+        self.timeout = timeout
+        self.max_retries = max_retries
+        # Spawned workers do not inherit a renderer process that the parent may have started
+        self._context = _multiprocessing.get_context('spawn')
+        self._idle_workers = []
+        self._num_started_workers = 0
+
+    def __enter__(self):
+        """Enter the context of the pool."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Leave the context of the pool by stopping all worker processes."""
+        self.close()
+
+    def close(self):
+        """Stop all worker processes. The pool can still be used afterwards."""
+        while self._idle_workers:
+            self._idle_workers.pop().stop()
+            self._num_started_workers -= 1
+
+    def export_batch(self, figures, formats, filepaths):
+        """Export a batch of Plotly figures as image files in one or more formats.
+
+        Parameters
+        ----------
+        figures : list of :ref:`Figure <plotly-figure>`
+            Figures to export. Their size and resolution are used as in the single export
+            methods, e.g. :py:meth:`Figure.export_png`.
+        formats : str or list of str
+            Image formats, each figure is exported in each of them.
+            Possible values: "eps", "jpg", "jpeg", "pdf", "png", "svg", "webp"
+        filepaths : list of str
+            One filepath for each figure.
+            If a file exists it will be overwritten without warning.
+            The file extension of each format is appended if the path does not end with it.
+            If a parent directory does not exist it will be created.
+
+        Returns
+        -------
+        filepaths_used : list of dict
+            For each figure a mapping of image format to filepath of the generated file.
+
+        Raises
+        ------
+        ValueError
+            If any export failed or timed out. All other files are exported nevertheless.
+
+        """
+        # Argument processing
+        figures = list(figures)
+        filepaths = list(filepaths)
+        if isinstance(formats, str):
+            formats = [formats]
+        formats = [data_format.lower() for data_format in formats]
+        for data_format in formats:
+            if data_format not in _KNOWN_FORMATS:
+                message = 'Unknown data format "{}". Possible values: {}'.format(
+                    data_format, _KNOWN_FORMATS)
+                raise ValueError(message)
+        if len(figures) != len(filepaths):
+            message = 'Arguments "figures" and "filepaths" need to have the same length.'
+            raise ValueError(message)
+        for figure in figures:
+            if not isinstance(figure, _Figure):
+                message = 'Argument "figures" needs to contain only Plotly figures.'
+                raise ValueError(message)
+
+        # Transformation
+        jobs = _deque()
+        for index, (figure, filepath) in enumerate(zip(figures, filepaths)):
+            fig_dict = figure.fig.to_dict()
+            scale = figure.size.dpi / 96.0
+            for data_format in formats:
+                filepath_used = _operating_system.ensure_file_extension(filepath, data_format)
+                _operating_system.ensure_parent_directory(filepath_used)
+                request = (fig_dict, filepath_used, data_format,
+                           figure.size.width_px, figure.size.height_px, scale)
+                jobs.append(_Job(index, data_format, request))
+        filepaths_used = [dict() for _ in figures]
+        errors = self._run(jobs, filepaths_used)
+
+        # Postcondition
+        if errors:
+            message = 'Export of {} of {} image files failed:\n{}'.format(
+                len(errors), len(formats) * len(figures), '\n'.join(errors[:10]))
+            if any('orca' in error for error in errors):
+                message += (
+                    '\nPlotly requires Orca to be installed in order to export image files. '
+                    'The online documentation of "unified plotting" contains an installation '
+                    'guide including a section on how to install Orca.')
+            raise ValueError(message)
+        return filepaths_used
+
+    def _run(self, jobs, filepaths_used):
+        """Distribute jobs over idle workers until all are done, failed or timed out."""
+        errors = []
+        busy_workers = dict()
+        try:
+            while jobs or busy_workers:
+                # Assign jobs to idle workers, start new workers if the pool is not full yet
+                while jobs and (self._idle_workers
+                                or self._num_started_workers < self.num_workers):
+                    worker = self._acquire_worker()
+                    job = jobs.popleft()
+                    if worker.assign(job, self.timeout):
+                        busy_workers[worker.connection] = worker
+                    else:
+                        self._discard(worker)
+                        self._retry_or_fail(job, jobs, errors, 'worker process crashed')
+
+                # Wait for the first finished job or the earliest deadline
+                if not busy_workers:
+                    continue
+                deadlines = [worker.deadline for worker in busy_workers.values()
+                             if worker.deadline is not None]
+                wait_time = None
+                if deadlines:
+                    wait_time = max(0.0, min(deadlines) - _time.monotonic())
+                for connection in _wait(list(busy_workers), wait_time):
+                    worker = busy_workers.pop(connection)
+                    job = worker.job
+                    try:
+                        error = worker.receive()
+                    except (EOFError, OSError):
+                        self._discard(worker)
+                        self._retry_or_fail(job, jobs, errors, 'worker process crashed')
+                        continue
+                    self._idle_workers.append(worker)
+                    filepath = job.request[1]
+                    if error is None and _operating_system.is_nonempty_file(filepath):
+                        filepaths_used[job.index][job.data_format] = filepath
+                    else:
+                        errors.append('{}: {}'.format(filepath, error or 'empty file'))
+
+                # Abort jobs that exceeded the timeout
+                now = _time.monotonic()
+                for connection, worker in list(busy_workers.items()):
+                    if worker.deadline is not None and now >= worker.deadline:
+                        del busy_workers[connection]
+                        self._discard(worker)
+                        errors.append('{}: timeout after {} s'.format(
+                            worker.job.request[1], self.timeout))
+        finally:
+            # Workers with unfinished jobs, e.g. after KeyboardInterrupt, can not be reused
+            for worker in busy_workers.values():
+                self._discard(worker)
+        return errors
+
+    def _acquire_worker(self):
+        if self._idle_workers:
+            return self._idle_workers.pop()
+        self._num_started_workers += 1
+        return _Worker(self._context)
+
+    def _discard(self, worker):
+        worker.stop(force=True)
+        self._num_started_workers -= 1
+
+    def _retry_or_fail(self, job, jobs, errors, reason):
+        job.num_attempts += 1
+        if job.num_attempts <= self.max_retries:
+            jobs.append(job)
+        else:
+            errors.append('{}: {}'.format(job.request[1], reason))
+
+
+class _Job:
+    """Export of one figure in one format."""
+
+    def __init__(self, index, data_format, request):
+        self.index = index
+        self.data_format = data_format
+        self.request = request
+        self.num_attempts = 0
+
+
+class _Worker:
+    """Handle of a worker process that receives jobs through a pipe, one at a time."""
+
+    def __init__(self, context):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_work, args=(child_connection,), daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.job = None
+        self.deadline = None
+
+    def assign(self, job, timeout):
+        """Send a job to the worker process. Return False if it is not alive anymore."""
+        self.job = job
+        self.deadline = None if timeout is None else _time.monotonic() + timeout
+        try:
+            self.connection.send(job.request)
+        except (EOFError, OSError):
+            return False
+        return True
+
+    def receive(self):
+        """Receive the result of the current job, which is None or an error message."""
+        error = self.connection.recv()
+        self.job = None
+        self.deadline = None
+        return error
+
+    def stop(self, force=False):
+        """Stop the worker process, either by request or by termination."""
+        if not force:
+            try:
+                self.connection.send(None)
+                self.process.join(timeout=10)
+            except (EOFError, OSError):
+                pass
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=10)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+def _work(connection):
+    """Main function of a worker process that exports figures until it is stopped."""
+    # Terminating the worker shuts down its renderer process, which would be left over otherwise
+    _signal.signal(_signal.SIGTERM, _exit)
+    try:
+        while True:
+            try:
+                request = connection.recv()
+            except EOFError:
+                break
+            if request is None:
+                break
+            fig_dict, filepath, data_format, width, height, scale = request
+            try:
+                _pio.write_image(
+                    fig=fig_dict, file=filepath, format=data_format,
+                    width=width, height=height, scale=scale)
+                error = None
+            except Exception as excp:
+                error = '{}: {}'.format(type(excp).__name__, excp)
+            connection.send(error)
+    finally:
+        try:
+            _pio.orca.shutdown_server()
+        except Exception:
+            pass
+
+
+def _exit(signal_number, frame):
+    raise SystemExit(1)
@@ -416,29 +416,25 @@ def scatter_3d(x, y, z, name=None, color=None, opacity=None, axis_aspect_ratio=N
 
         # Stem plots
         if show_stem_x or show_stem_y or show_stem_z:
-            x_new, y_new, z_new = [], [], []
-            if show_stem_x:
-                for x_val, y_val, z_val in zip(x_i, y_i, z_i):
-                    x_new.extend([x_bound, x_val, None])
-                    y_new.extend([y_val, y_val, None])
-                    z_new.extend([z_val, z_val, None])
-            if show_stem_y:
-                for x_val, y_val, z_val in zip(x_i, y_i, z_i):
-                    x_new.extend([x_val, x_val, None])
-                    y_new.extend([y_bound, y_val, None])
-                    z_new.extend([z_val, z_val, None])
-            if show_stem_z:
-                for x_val, y_val, z_val in zip(x_i, y_i, z_i):
-                    x_new.extend([x_val, x_val, None])
-                    y_new.extend([y_val, y_val, None])
-                    z_new.extend([z_bound, z_val, None])
+            # Each stem consists of three vertices: projection, point and a NaN separator
+            points = _np.array([x_i, y_i, z_i], dtype=float)
+            num_points = points.shape[1]
+            stems = []
+            for axis, (show_stem, bound) in enumerate(
+                    [(show_stem_x, x_bound), (show_stem_y, y_bound), (show_stem_z, z_bound)]):
+                if show_stem:
+                    stem = _np.empty((3, num_points, 3))
+                    stem[:, :, 0] = points
+                    stem[axis, :, 0] = bound
+                    stem[:, :, 1] = points
+                    stem[:, :, 2] = _np.nan
+                    stems.append(stem.reshape(3, -1))
+            x_new, y_new, z_new = _np.concatenate(stems, axis=1)
             if isinstance(plotly_marker_spec['color'], str):
                 marker_color = plotly_marker_spec['color']
             else:
-                marker_color = []
-                for num in plotly_marker_spec['color']:
-                    marker_color.extend([num]*3)
-                marker_color = marker_color*3
+                marker_color = _np.repeat(_np.asarray(plotly_marker_spec['color']), 3)
+                marker_color = _np.tile(marker_color, len(stems))
             if show_stem_line:
                 stem_mode = 'markers+lines'
             else:
@@ -0,0 +1,24 @@
+"""This is the subpackage :py:mod:`unified_plotting.report`.
+
+It provides a report builder that combines figures from all
+subpackages (Plotly, Matplotlib, JavaScript) together with
+headings and text into a single HTML document.
+Each JavaScript library is included only once in the document,
+regardless of how many figures depend on it, and identical
+figure data is embedded only once.
+
+It contains the following classes.
+"""
+
+from .. import _logging
+
+
+try:
+    __all__ = [
+        'Report',
+    ]
+
+    from ._report import Report
+except ImportError as excp:
+    __all__ = []
+    _logging.report_missing_library('Report subpackage', excp)
@@ -0,0 +1,372 @@
+"""Report builder that combines figures of all subpackages into a single HTML document."""
+
+import html as _html
+import json as _json
+import os as _os
+import shutil as _shutil
+import tempfile as _tempfile
+from hashlib import sha256 as _sha256
+from io import StringIO as _StringIO
+
+from plotly import io as _pio
+
+from ..javascript import _template_system
+from ..javascript._data_structures import Figure as _JavaScriptFigure
+from ..matplotlib._data_structures import Figure as _MatplotlibFigure
+from ..plotly._data_structures import Figure as _PlotlyFigure
+from ..plotly._data_structures import _load_plotlyjs
+from ..utilities import operating_system as _operating_system
+
+
+class Report:
+    """Data structure for combining figures, headings and text into a single HTML document.
+
+    Figures can come from any subpackage. In contrast to concatenating the standalone HTML
+    text of each figure, every JavaScript library (e.g. plotly.js, d3.js, vis.js) is included
+    only once in the document, and identical figure data is embedded only once.
+
+    Examples
+    --------
+    >>> report = up.report.Report(title='Results')
+    >>> report.add_heading('Overview')
+    >>> report.add_figure(up.plotly.scatter(x, y), caption='Raw data')
+    >>> report.add_figure(up.matplotlib.histogram([x, y]))
+    >>> report.add_figure(up.javascript.network_d3(graph))
+    >>> report.export_html('results.html')
+
+    """
+
+    def __init__(self, figures=None, title=None, matplotlib_format='svg'):
+        """Initialize a report, optionally with a list of figures.
+
+        Parameters
+        ----------
+        figures : list of Figure objects
+            Figures created by functions of the subpackages
+            :py:mod:`unified_plotting.plotly`, :py:mod:`unified_plotting.matplotlib`
+            and :py:mod:`unified_plotting.javascript`.
+        title : str
+            Title of the document, which is also shown as first heading.
+        matplotlib_format : str
+            Possible values: "svg", "png".
+            Matplotlib figures are embedded either as inline vector graphic or as raster image.
+
+        """
+        if matplotlib_format not in ('svg', 'png'):
+            message = 'Value "{}" for matplotlib_format is invalid. Possible values: {}'.format(
+                matplotlib_format, ['svg', 'png'])
+            raise ValueError(message)
+        self.title = title
+        self.matplotlib_format = matplotlib_format
+        self._items = []
+        if figures is not None:
+            for fig in figures:
+                self.add_figure(fig)
+
+    def add_figure(self, fig, caption=None):
+        """Add a figure, optionally with a caption below it."""
+        if not isinstance(fig, (_JavaScriptFigure, _MatplotlibFigure, _PlotlyFigure)):
+            message = 'Given object is not a Figure of this package: {}'.format(type(fig))
+            raise ValueError(message)
+        self._items.append(('figure', (fig, caption)))
+
+    def add_heading(self, text, level=2):
+        """Add a heading of a given level (1 to 6)."""
+        if level not in range(1, 7):
+            message = 'Value "{}" for level is invalid. Possible values: 1 to 6'.format(level)
+            raise ValueError(message)
+        html_text = '<h{level}>{text}</h{level}>\n'.format(level=level, text=_html.escape(text))
+        self._items.append(('html', html_text))
+
+    def add_text(self, text):
+        """Add a paragraph of plain text."""
+        self._items.append(('html', '<p>{}</p>\n'.format(_html.escape(text))))
+
+    def add_html(self, html_text):
+        """Add HTML text that is inserted without any modification."""
+        self._items.append(('html', html_text + '\n'))
+
+    @property
+    def figures(self):
+        """All added figures, in order of appearance."""
+        return [item[0] for kind, item in self._items if kind == 'figure']
+
+    # Export as HTML file (interactive)
+    def export_html(self, filepath, assets='inline', asset_directory=None):
+        """Export the report as HTML file.
+
+        The document is written piece by piece directly to the file, so that it never needs
+        to be held in memory as a whole.
+
+        Parameters
+        ----------
+        filepath : str
+            Filepath of the created HTML file.
+            If the file exists it will be overwritten without warning.
+            If the path does not end with ".html" it will be changed to do so.
+            If the parent directory does not exist it will be created.
+        assets : str
+            Possible values: "inline", "directory".
+            If "inline", the code of each required JavaScript library is embedded once in
+            the HTML file, so that it is fully self-contained.
+            If "directory", each library is written into a shared directory, with a hash of
+            its content in the filename, and the HTML file refers to it with a relative
+            script tag, see the export_html method of JavaScript and Plotly figures.
+        asset_directory : str
+            Directory for the library files if assets is "directory".
+            If None, a directory named "assets" next to the HTML file is used.
+
+        Returns
+        -------
+        filepath : str
+            Filepath of the generated HTML file, guaranteed to end with ".html".
+
+        """
+        # Precondition
+        used_filepath = _operating_system.ensure_file_extension(filepath, 'html')
+        _operating_system.ensure_parent_directory(used_filepath)
+        if assets not in ('inline', 'directory'):
+            message = 'Value "{}" for assets is invalid. Possible values: {}'.format(
+                assets, ['inline', 'directory'])
+            raise ValueError(message)
+        if assets == 'directory' and asset_directory is None:
+            asset_directory = _os.path.join(
+                _operating_system.get_parent_directory(used_filepath), 'assets')
+
+        # Transformation
+        with open(used_filepath, 'w', encoding='utf-8') as file_handle:
+            writer = _ReportWriter(
+                file_handle, used_filepath, asset_directory, self.matplotlib_format)
+            writer.write_start(self.title, self.figures)
+            for kind, item in self._items:
+                if kind == 'figure':
+                    writer.write_figure(*item)
+                else:
+                    file_handle.write(item)
+            writer.write_end()
+        return used_filepath
+
+
+class _ReportWriter:
+    """State of a single export, which tracks what was already written to the document."""
+
+    def __init__(self, file_handle, filepath, asset_directory, matplotlib_format):
+        self._file_handle = file_handle
+        self._filepath = filepath
+        self._asset_directory = asset_directory
+        self._matplotlib_format = matplotlib_format
+        self._payload_keys = set()
+        self._stream_keys = {}
+        self._static_figures = {}
+        self._static_ids = set()
+        self._num_copies = 0
+
+    # Start and end of the document
+    def write_start(self, title, figures):
+        title = '' if title is None else _html.escape(title)
+        self._file_handle.write(_DOCUMENT_START.format(title=title))
+        self._write_libraries(figures)
+        self._file_handle.write(_DOCUMENT_BODY)
+        if title:
+            self._file_handle.write('<h1>{}</h1>\n'.format(title))
+
+    def write_end(self):
+        if self._num_copies:
+            self._file_handle.write(_COPY_SCRIPT)
+        self._file_handle.write(_DOCUMENT_END)
+
+    def _write_libraries(self, figures):
+        # plotly.js is loaded before require.js, otherwise it registers itself as anonymous
+        # AMD module instead of providing the global object Plotly
+        if any(isinstance(fig, _PlotlyFigure) for fig in figures):
+            plotlyjs_text, plotlyjs_digest = _load_plotlyjs()
+            self._file_handle.write(_PLOTLY_CONFIG)
+            self._write_script(plotlyjs_text, 'plotly.min', plotlyjs_digest)
+        javascript_figures = [fig for fig in figures if isinstance(fig, _JavaScriptFigure)]
+        if javascript_figures:
+            assets = [_template_system.load_asset('third_party/require/require.min.js')]
+            for fig in javascript_figures:
+                assets.extend(fig._html_template.assets)
+            unique_assets = {asset.digest: asset for asset in assets}
+            for asset in unique_assets.values():
+                self._write_script(asset.text, asset.name, asset.digest)
+
+    def _write_script(self, text, name, digest):
+        if self._asset_directory is None:
+            self._file_handle.write('<script type="text/javascript">\n')
+            self._file_handle.write(text)
+            self._file_handle.write('\n</script>\n')
+        else:
+            asset_filepath = _operating_system.write_content_addressed_file(
+                text, self._asset_directory, name, 'js', digest)
+            url = _operating_system.get_relative_url(asset_filepath, self._filepath)
+            self._file_handle.write(
+                '<script type="text/javascript" src="{}"></script>\n'.format(url))
+
+    # Figures
+    def write_figure(self, fig, caption):
+        self._file_handle.write('<div class="up-report-figure">\n')
+        if isinstance(fig, _JavaScriptFigure):
+            self._write_javascript_figure(fig)
+        elif isinstance(fig, _PlotlyFigure):
+            self._write_plotly_figure(fig)
+        else:
+            self._write_matplotlib_figure(fig)
+        if caption is not None:
+            self._file_handle.write(
+                '<p class="up-report-caption">{}</p>\n'.format(_html.escape(caption)))
+        self._file_handle.write('</div>\n')
+
+    def _write_javascript_figure(self, fig):
+        def replace_value(value):
+            if isinstance(value, _template_system.Asset):
+                return ''
+            if isinstance(value, (_template_system.Payload, _template_system.JsonStream)):
+                return self._write_payload(value)
+            return value
+
+        # Payload definitions are written before the figure that refers to them
+        template = fig._html_template.map_values(replace_value)
+        data = {
+            'RANDOM_ID': fig._generate_random_id(),
+            'PREFIX': '',
+            'LOAD_REQUIRE': '',
+            'SUFFIX': '',
+        }
+        template.write(self._file_handle, data)
+        self._file_handle.write('\n')
+
+    def _write_plotly_figure(self, fig):
+        payload = _template_system.Payload(_pio.to_json(fig.fig, validate=False))
+        reference = self._write_payload(payload)
+        config = dict(fig._config)
+        config.setdefault('responsive', True)
+        layout = fig.fig.layout
+        self._file_handle.write(_PLOTLY_FIGURE.format(
+            id='up-report-' + _JavaScriptFigure._generate_random_id(),
+            width='100%' if layout.width is None else '{}px'.format(layout.width),
+            height='100%' if layout.height is None else '{}px'.format(layout.height),
+            payload=reference,
+            config=_json.dumps(config),
+        ))
+
+    def _write_matplotlib_figure(self, fig):
+        # Repeated figures are recognized by identity, because SVG output contains random ids,
+        # and identical images by content. Both are only embedded once and copied in the browser
+        element_id = self._static_figures.get(id(fig))
+        if element_id is None:
+            if self._matplotlib_format == 'svg':
+                html_text = fig.svg_text
+            else:
+                html_text = fig.png_img_element
+            element_id = 'up-report-static-' + _sha256(html_text.encode('utf-8')).hexdigest()[:16]
+            self._static_figures[id(fig)] = element_id
+            if element_id not in self._static_ids:
+                self._static_ids.add(element_id)
+                self._file_handle.write('<div id="{}">{}</div>\n'.format(element_id, html_text))
+                return
+        self._file_handle.write('<div data-up-report-copy="{}"></div>\n'.format(element_id))
+        self._num_copies += 1
+
+    def _write_payload(self, payload):
+        """Define a payload once in the document and return a JavaScript expression for it.
+
+        The expression creates a new object on each evaluation, because plots may modify
+        their data, e.g. a force layout adds positions to the nodes of a graph.
+
+        """
+        if isinstance(payload, _template_system.JsonStream):
+            # A stream is converted only once, even if several figures share it
+            if id(payload) not in self._stream_keys:
+                self._stream_keys[id(payload)] = (payload, self._write_stream(payload))
+            key = self._stream_keys[id(payload)][1]
+        else:
+            key = _sha256(payload.text.encode('utf-8')).hexdigest()[:16]
+            if key not in self._payload_keys:
+                self._write_payload_definition(key, _StringIO(payload.text))
+        return 'upReportPayloads["{}"]()'.format(key)
+
+    def _write_stream(self, stream):
+        # The stream is written chunk by chunk to a temporary file while it is hashed, so its
+        # text is never held in memory and the data is converted a single time
+        with _tempfile.TemporaryFile('w+', encoding='utf-8') as temp_handle:
+            hash_writer = _HashWriter(temp_handle)
+            stream.write(hash_writer)
+            key = hash_writer.hexdigest()[:16]
+            if key not in self._payload_keys:
+                temp_handle.seek(0)
+                self._write_payload_definition(key, temp_handle)
+        return key
+
+    def _write_payload_definition(self, key, text_handle):
+        self._file_handle.write(_PAYLOAD_START.format(key=key))
+        _shutil.copyfileobj(text_handle, self._file_handle)
+        self._file_handle.write(_PAYLOAD_END)
+        self._payload_keys.add(key)
+
+
+class _HashWriter:
+    """File-like object that calculates the SHA-256 hash of the text passed on to a file."""
+
+    def __init__(self, file_handle):
+        self._file_handle = file_handle
+        self._hash = _sha256()
+
+    def write(self, text):
+        self._hash.update(text.encode('utf-8'))
+        self._file_handle.write(text)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+_DOCUMENT_START = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+  body {{ margin: 1em; font-family: sans-serif; }}
+  .up-report-figure {{ margin: 1em 0; }}
+  .up-report-caption {{ margin: 0.3em 0; font-size: 0.9em; color: #444; }}
+</style>
+<script type="text/javascript">window.upReportPayloads = {{}};</script>
+"""
+
+_DOCUMENT_BODY = """</head>
+<body>
+"""
+
+_DOCUMENT_END = """</body>
+</html>
+"""
+
+_PLOTLY_CONFIG = """<script type="text/javascript">
+  window.PlotlyConfig = {MathJaxConfig: 'local'};
+</script>
+"""
+
+_PLOTLY_FIGURE = """<div id="{id}" class="plotly-graph-div"
+     style="width:{width}; height:{height};"></div>
+<script type="text/javascript">
+  (function(){{
+    const figure = {payload};
+    Plotly.newPlot("{id}", figure.data, figure.layout, {config});
+  }})();
+</script>
+"""
+
+_PAYLOAD_START = """<script type="text/javascript">
+  upReportPayloads["{key}"] = function(){{ return """
+
+_PAYLOAD_END = """; };
+</script>
+"""
+
+_COPY_SCRIPT = """<script type="text/javascript">
+  document.querySelectorAll("[data-up-report-copy]").forEach(function(element){
+    const source = document.getElementById(element.getAttribute("data-up-report-copy"));
+    element.innerHTML = source.innerHTML;
+  });
+</script>
+"""
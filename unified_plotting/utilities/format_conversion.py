@@ -1,6 +1,8 @@
 """Conversion of various graph and vector data formats."""
 
-from copy import deepcopy as _deepcopy
+import numpy as _np
+
+from .. import _logging
 
 
 def _prepare_jgf_dict():
@@ -63,26 +65,25 @@ def graphtool_to_jgf(graph_object):
                            for key in graph_object.graph_properties.keys()}
     _insert_graph_data(data_graph, graph_directed, graph_metadata_dict)
 
-    # 2) Nodes and their properties
-    for node_object in graph_object.vertices():
-        node_id = str(node_object)
-        node_metadata_dict = {}
-        for key, value_array in graph_object.vertex_properties.items():
-            val = value_array[node_object]
-            if isinstance(val, (str, int, float)) and val not in ('', 0, 0.0):
-                node_metadata_dict[key] = val
-        _insert_node_data(data_nodes, node_id, node_metadata_dict)
-
-    # 3) Edges and their properties
-    for edge_object in graph_object.edges():
-        edge_source_id = str(edge_object.source())
-        edge_target_id = str(edge_object.target())
-        edge_metadata_dict = {}
-        for key, value_array in graph_object.edge_properties.items():
-            val = value_array[edge_object]
-            if val not in ('', 0, 0.0):
-                edge_metadata_dict[key] = val
-        _insert_edge_data(data_edges, edge_source_id, edge_target_id, edge_metadata_dict)
+    # 2) Nodes and their properties, read from the property arrays at once
+    node_indices = graph_object.get_vertices()
+    node_columns = {
+        key: _graphtool_values(value_array, node_indices, graph_object.vertex_index,
+                               graph_object.vertices(), only_scalars=True)
+        for key, value_array in graph_object.vertex_properties.items()}
+    node_rows = _columns_to_rows(node_columns, len(node_indices))
+    for node_index, node_metadata_dict in zip(node_indices.tolist(), node_rows):
+        _insert_node_data(data_nodes, str(node_index), node_metadata_dict)
+
+    # 3) Edges and their properties, with the edge index as third column to access the arrays
+    edges = graph_object.get_edges([graph_object.edge_index])
+    edge_columns = {
+        key: _graphtool_values(value_array, edges[:, 2], graph_object.edge_index,
+                               graph_object.edges(), only_scalars=False)
+        for key, value_array in graph_object.edge_properties.items()}
+    edge_rows = _columns_to_rows(edge_columns, len(edges))
+    for (source, target), edge_metadata_dict in zip(edges[:, :2].tolist(), edge_rows):
+        _insert_edge_data(data_edges, str(source), str(target), edge_metadata_dict)
     return data
 
 
@@ -95,20 +96,17 @@ def igraph_to_jgf(graph_object):
     graph_metadata_dict = {attr: graph_object[attr] for attr in graph_object.attributes()}
     _insert_graph_data(data_graph, graph_directed, graph_metadata_dict)
 
-    # 2) Nodes and their properties
-    for node_object in graph_object.vs:
-        node_id = str(node_object.index)
-        node_metadata_dict = {key: val for key, val in node_object.attributes().items()
-                              if val is not None}
-        _insert_node_data(data_nodes, node_id, node_metadata_dict)
-
-    # 3) Edges and their properties
-    for edge_object in graph_object.es:
-        edge_source_id = str(edge_object.source)
-        edge_target_id = str(edge_object.target)
-        edge_metadata_dict = {key: val for key, val in edge_object.attributes().items()
-                              if val is not None}
-        _insert_edge_data(data_edges, edge_source_id, edge_target_id, edge_metadata_dict)
+    # 2) Nodes and their properties, read as one list per attribute
+    node_columns = {key: graph_object.vs[key] for key in graph_object.vs.attribute_names()}
+    node_rows = _columns_to_rows(node_columns, graph_object.vcount())
+    for node_index, node_metadata_dict in enumerate(node_rows):
+        _insert_node_data(data_nodes, str(node_index), node_metadata_dict)
+
+    # 3) Edges and their properties, read as one list per attribute
+    edge_columns = {key: graph_object.es[key] for key in graph_object.es.attribute_names()}
+    edge_rows = _columns_to_rows(edge_columns, graph_object.ecount())
+    for (source, target), edge_metadata_dict in zip(graph_object.get_edgelist(), edge_rows):
+        _insert_edge_data(data_edges, str(source), str(target), edge_metadata_dict)
     return data
 
 
@@ -117,8 +115,8 @@ def networkit_to_jgf(graph_object):
     # Argument processing
     graph_metadata, node_metadata, edge_metadata = {}, {}, {}
     if isinstance(graph_object, list):
-        if len(graph_object) >= 2:
-            graph_metadata = graph_object[1]
+        if len(graph_object) >= 2 and isinstance(graph_object[1], dict):
+            graph_metadata = dict(graph_object[1])
         if len(graph_object) >= 3:
             node_metadata = graph_object[2]
             if isinstance(node_metadata, dict):
@@ -143,22 +141,20 @@ def networkit_to_jgf(graph_object):
     _insert_graph_data(data_graph, graph_directed, graph_metadata_dict)
 
     # 2) Nodes and their properties
-    def parse_node(node):
+    for node in graph_object.iterNodes():
         node_id = str(node)
-        node_metadata_dict = node_metadata.get(node_id, {})
+        node_metadata_dict = dict(node_metadata.get(node_id, {}))
         _insert_node_data(data_nodes, node_id, node_metadata_dict)
 
-    graph_object.forNodes(parse_node)
-
-    # 3) Edges and their properties
-    def parse_edge(source_node, target_node, edge_weight, edge_id):
-        edge_source_id = str(source_node)
-        edge_target_id = str(target_node)
-        used_edge_id = '({}, {})'.format(edge_source_id, edge_target_id)
-        edge_metadata_dict = edge_metadata.get(used_edge_id, {})
+    # 3) Edges and their properties, metadata is only looked up if there is any
+    for source, target in graph_object.iterEdges():
+        edge_source_id = str(source)
+        edge_target_id = str(target)
+        edge_metadata_dict = {}
+        if edge_metadata:
+            used_edge_id = '({}, {})'.format(edge_source_id, edge_target_id)
+            edge_metadata_dict = dict(edge_metadata.get(used_edge_id, {}))
         _insert_edge_data(data_edges, edge_source_id, edge_target_id, edge_metadata_dict)
-
-    graph_object.forEdges(parse_edge)
     return data
 
 
@@ -166,29 +162,18 @@ def networkx_to_jgf(graph_object):
     """Convert a NetworkX graph object to JSON graph format (JGF)."""
     data, data_graph, data_nodes, data_edges = _prepare_jgf_dict()
 
-    # Copy to prevent side effects (preferably deep, otherwise shallow)
-    try:
-        graph_object = _deepcopy(graph_object)
-    except Exception:
-        graph_object = graph_object.copy()
-
     # 1) Graph properties
     graph_directed = graph_object.is_directed()
     graph_metadata_dict = dict(graph_object.graph)
     _insert_graph_data(data_graph, graph_directed, graph_metadata_dict)
 
-    # 2) Nodes and their properties
-    for node_object in graph_object.nodes:
-        node_id = str(node_object)
-        node_metadata_dict = graph_object.nodes[node_object]
-        _insert_node_data(data_nodes, node_id, node_metadata_dict)
+    # 2) Nodes and their properties, copied shallowly to prevent side effects on the graph
+    for node_object, node_metadata_dict in graph_object.nodes(data=True):
+        _insert_node_data(data_nodes, str(node_object), dict(node_metadata_dict))
 
-    # 3) Edges and their properties
-    for edge_object in graph_object.edges:
-        edge_source_id = str(edge_object[0])
-        edge_target_id = str(edge_object[1])
-        edge_metadata_dict = graph_object.edges[edge_object]
-        _insert_edge_data(data_edges, edge_source_id, edge_target_id, edge_metadata_dict)
+    # 3) Edges and their properties, also each edge of a multigraph
+    for source, target, edge_metadata_dict in graph_object.edges(data=True):
+        _insert_edge_data(data_edges, str(source), str(target), dict(edge_metadata_dict))
     return data
 
 
@@ -269,6 +254,244 @@ def snap_to_jgf(graph_object):
     return data
 
 
+def _columns_to_rows(columns, num_rows):
+    """Get one dict per row from a dict of columns, leaving out None as missing value."""
+    rows = [dict() for _ in range(num_rows)]
+    for key, values in columns.items():
+        for row, val in zip(rows, values):
+            if val is not None:
+                row[key] = val
+    return rows
+
+
+def _graphtool_values(value_array, indices, index_map, descriptors, only_scalars):
+    """Get the values of a graph-tool property map for nodes or edges given by their index.
+
+    Properties of a scalar type are read from their numpy array at once, others such as
+    strings need to be accessed by descriptor. Empty strings and zeros mark missing values
+    and become None, as do non-scalar values if only scalars are allowed.
+
+    """
+    array = value_array.a  # None for value types that are not scalar
+    if array is not None:
+        values = array[indices]
+        if value_array.value_type() == 'bool':
+            values = values.astype(bool)
+        is_missing = (values == 0).tolist()
+        values = values.tolist()
+    else:
+        values_by_index = {int(index_map[item]): value_array[item] for item in descriptors}
+        values = [values_by_index[index] for index in indices.tolist()]
+        is_missing = [(only_scalars and not isinstance(val, (str, int, float)))
+                      or val in ('', 0, 0.0) for val in values]
+    return [None if missing else val for val, missing in zip(values, is_missing)]
+
+
+def edges_to_columnar_graph(edges, nodes=None, directed=False, metadata=None,
+                            source='source', target='target', node_id='id'):
+    """Convert tabular edge and node data to a columnar graph that keeps all attributes as arrays.
+
+    Unlike JGF, where each node and edge is a separate object, a columnar graph stores each
+    attribute as one array, and edges refer to the position of their nodes in the node arrays.
+    No Python object is created per node or edge, which is much faster and more compact for
+    large graphs. The network plots of this package accept the result directly and expand it
+    to JGF in the browser.
+
+    Parameters
+    ----------
+    edges : dict of array-like or pandas DataFrame
+        Edge attributes as columns of equal length, which need to include the ids of the
+        source and target nodes. The columns "id", "label", "relation" and "directed" are
+        data of an edge in JGF, all other columns become metadata, e.g. "color" or "size".
+    nodes : dict of array-like or pandas DataFrame, optional
+        Node attributes as columns of equal length, which need to include the node ids.
+        The column "label" is data of a node in JGF, all others become metadata.
+        If not provided, the nodes are derived from the edges in order of first appearance.
+        Edges that refer to an unknown node are removed with a warning.
+    directed : bool
+        Whether the graph is directed.
+    metadata : dict, optional
+        Graph metadata, e.g. "background_color". The keys "label" and "type" are data of
+        the graph in JGF.
+    source : str
+        Name of the edge column with the source node ids.
+    target : str
+        Name of the edge column with the target node ids.
+    node_id : str
+        Name of the node column with the node ids.
+
+    Returns
+    -------
+    data : dict
+        Graph with the keys "node_columns" and "edge_columns" instead of "nodes" and "edges",
+        each a dict of numpy arrays. The edge columns "source" and "target" contain positions
+        in the node columns.
+
+    """
+    # Argument processing
+    edge_columns = _to_columns(edges, 'edges')
+    if source not in edge_columns or target not in edge_columns:
+        message = 'Edge data needs to contain the columns "{}" and "{}".'.format(source, target)
+        raise ValueError(message)
+    source_ids = edge_columns.pop(source)
+    target_ids = edge_columns.pop(target)
+
+    # Transformation
+    if nodes is None:
+        node_columns = dict()
+        node_ids, positions = _unique_in_order(_np.concatenate(
+            _as_comparable_ids(source_ids, target_ids)))
+        source_positions = positions[:len(source_ids)]
+        target_positions = positions[len(source_ids):]
+    else:
+        node_columns = _to_columns(nodes, 'nodes')
+        if node_id not in node_columns:
+            message = 'Node data needs to contain the column "{}".'.format(node_id)
+            raise ValueError(message)
+        node_ids, source_ids, target_ids = _as_comparable_ids(
+            node_columns.pop(node_id), source_ids, target_ids)
+        source_positions = _find_positions(node_ids, source_ids)
+        target_positions = _find_positions(node_ids, target_ids)
+        is_known = (source_positions >= 0) & (target_positions >= 0)
+        if not is_known.all():
+            num_removed = int(len(is_known) - is_known.sum())
+            message = ('{} edges were removed because they refer to a node that is not part '
+                       'of the node data.'.format(num_removed))
+            _logging.warn_user(message)
+            source_positions = source_positions[is_known]
+            target_positions = target_positions[is_known]
+            edge_columns = {key: val[is_known] for key, val in edge_columns.items()}
+    node_columns = {'id': node_ids, **node_columns}
+    edge_columns = {'source': source_positions, 'target': target_positions, **edge_columns}
+    return _columnar_graph(node_columns, edge_columns, directed, metadata)
+
+
+def sparse_matrix_to_columnar_graph(matrix, nodes=None, directed=None, metadata=None,
+                                    weight='weight'):
+    """Convert a sparse adjacency matrix of SciPy to a columnar graph.
+
+    Each stored entry of the matrix at row i and column j becomes an edge from node i to
+    node j with the entry as weight. See :func:`edges_to_columnar_graph` for the resulting
+    data structure.
+
+    Parameters
+    ----------
+    matrix : scipy.sparse matrix
+        Square adjacency matrix.
+    nodes : dict of array-like or pandas DataFrame, optional
+        Node attributes as columns with one value for each row of the matrix.
+        If it contains a column "id", it is used as node ids, otherwise the row numbers.
+    directed : bool, optional
+        Whether the graph is directed. If False, each pair of nodes is connected by one edge,
+        no matter in which triangle of the matrix its entry is stored. If both triangles
+        contain an entry for a pair, the one of the upper triangle is used.
+        Default: True if the matrix is not symmetric.
+    metadata : dict, optional
+        Graph metadata, e.g. "background_color".
+    weight : str or None
+        Name of the edge attribute that holds the matrix entries. If None, they are omitted.
+
+    Returns
+    -------
+    data : dict
+        Graph with the keys "node_columns" and "edge_columns" instead of "nodes" and "edges".
+
+    """
+    # Argument processing
+    num_rows, num_cols = matrix.shape
+    if num_rows != num_cols:
+        message = 'Adjacency matrix needs to be square, but it has shape {}.'.format(
+            matrix.shape)
+        raise ValueError(message)
+    if directed is None:
+        directed = (matrix != matrix.T).nnz > 0
+    node_columns = dict() if nodes is None else _to_columns(nodes, 'nodes')
+    node_ids = node_columns.pop('id', _np.arange(num_rows))
+    if len(node_ids) != num_rows:
+        message = 'Node data needs to have one row for each row of the adjacency matrix.'
+        raise ValueError(message)
+
+    # Transformation
+    coo = matrix.tocoo()
+    rows, cols, values = coo.row, coo.col, coo.data
+    if not directed:
+        # Entries of the lower triangle are mirrored, so that they are not lost, and an entry
+        # of the upper triangle takes precedence over the mirrored one of the same pair
+        is_lower = rows > cols
+        rows, cols = _np.where(is_lower, cols, rows), _np.where(is_lower, rows, cols)
+        order = _np.argsort(is_lower, kind='stable')
+        pairs = rows[order].astype(_np.int64) * num_rows + cols[order]
+        _, first_indices = _np.unique(pairs, return_index=True)
+        kept = _np.sort(order[first_indices])
+        rows, cols, values = rows[kept], cols[kept], values[kept]
+    edge_columns = {'source': rows, 'target': cols}
+    if weight is not None:
+        edge_columns[weight] = values
+    node_columns = {'id': node_ids, **node_columns}
+    return _columnar_graph(node_columns, edge_columns, directed, metadata)
+
+
+def _columnar_graph(node_columns, edge_columns, directed, metadata):
+    data = {'graph': {}}
+    data_graph = data['graph']
+    _insert_graph_data(data_graph, bool(directed), dict(metadata or {}))
+    data_graph['node_columns'] = node_columns
+    data_graph['edge_columns'] = edge_columns
+    return data
+
+
+def _to_columns(table, name):
+    """Get a dict of equally long numpy arrays from a dict of sequences or a DataFrame."""
+    try:
+        keys = list(table.keys())
+    except AttributeError:
+        message = 'Argument "{}" needs to be a dict of columns or a pandas DataFrame.'.format(name)
+        raise ValueError(message)
+    columns = {str(key): _to_array(table[key]) for key in keys}
+    if len({len(val) for val in columns.values()}) > 1:
+        message = 'All columns of argument "{}" need to have the same length.'.format(name)
+        raise ValueError(message)
+    return columns
+
+
+def _to_array(values):
+    try:
+        values = values.to_numpy()  # pandas Series
+    except AttributeError:
+        pass
+    array = _np.asarray(values)
+    if array.ndim != 1:
+        array = _np.empty(len(values), dtype=object)
+        array[:] = list(values)
+    return array
+
+
+def _as_comparable_ids(*id_arrays):
+    """Convert id arrays to a common numeric or string dtype, so that they can be compared."""
+    if all(array.dtype.kind in 'biu' for array in id_arrays):
+        return list(id_arrays)
+    return [array.astype(str) for array in id_arrays]
+
+
+def _unique_in_order(ids):
+    """Get the unique ids in order of first appearance and the position of each id in them."""
+    unique_ids, first_indices, inverse = _np.unique(ids, return_index=True, return_inverse=True)
+    order = _np.argsort(first_indices, kind='stable')
+    ranks = _np.empty_like(order)
+    ranks[order] = _np.arange(len(order))
+    return unique_ids[order], ranks[inverse]
+
+
+def _find_positions(node_ids, ids):
+    """Get the position of each id in the node ids, or -1 if it is not contained."""
+    if len(node_ids) == 0:
+        return _np.full(len(ids), -1)
+    sorter = _np.argsort(node_ids, kind='stable')
+    sorted_ids = node_ids[sorter]
+    indices = _np.searchsorted(sorted_ids, ids).clip(0, len(sorted_ids) - 1)
+    return _np.where(sorted_ids[indices] == ids, sorter[indices], -1)
+
+
 def dataframe_to_vector_data(df):
     """Convert a Pandas dataframe to vector data (list of lists)."""
     column_names = list(df.columns)
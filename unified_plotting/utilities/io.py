@@ -1,9 +1,20 @@
 """Input/output operations for vector and graph data."""
 
+import array as _array
 import csv as _csv
 import json as _json
+import re as _re
 from math import isnan as _isnan
 
+import numpy as _np
+
+from . import format_conversion as _format_conversion
+
+
+_NON_WHITESPACE = _re.compile(r'\S')
+_NODE_DATA_KEYS = ('id', 'label')
+_EDGE_DATA_KEYS = ('source', 'target', 'id', 'label', 'relation', 'directed')
+
 
 def read_dsv_file(filepath, name=None, get_name_from_header=None, delimiter=','):
     """Read a delimiter-separated value file and provide it as vector data."""
@@ -115,3 +126,402 @@ def read_json_file(filepath):
     with open(filepath) as file_handle:
         data = _json.load(file_handle)
     return data
+
+
+def read_jgf_file(filepath, chunk_size=2**20):
+    """Read a JSON file with graphs in JGF incrementally and provide them as columnar graphs.
+
+    In contrast to :func:`read_json_file`, the nodes and edges are decoded one after another
+    and their attributes are collected in compact buffers: numbers in typed arrays and
+    strings as codes into a list of distinct strings, as long as a column holds only one of
+    these types. No dict is kept for a node or edge, so memory usage is proportional to the
+    columnar result rather than to the nested Python objects of the whole file. The structure
+    is validated while reading, so that an invalid file fails at the first invalid item.
+
+    Parameters
+    ----------
+    filepath : str or file object
+        Path of a JSON file or a file object in text mode. It needs to contain a dict with a
+        single graph under "graph" or multiple graphs under "graphs", a single graph with
+        "nodes" and/or "edges", or a list of such dicts.
+    chunk_size : int
+        Number of characters that are read from the file at once.
+
+    Returns
+    -------
+    graphs : list of dict
+        Graphs with the keys "node_columns" and "edge_columns" instead of "nodes" and
+        "edges", without top-level graph key. See
+        :func:`~unified_plotting.utilities.format_conversion.edges_to_columnar_graph`.
+
+    References
+    ----------
+    - https://github.com/jsongraph/json-graph-specification
+
+    """
+    # Argument processing
+    if not filepath:
+        raise ValueError('Filepath is empty.')
+    if not isinstance(filepath, str) and not hasattr(filepath, 'read'):
+        raise ValueError('Filepath is neither a string nor a file object.')
+
+    # Transformation
+    if isinstance(filepath, str):
+        with open(filepath) as file_handle:
+            return _read_jgf_document(_JsonReader(file_handle, chunk_size))
+    return _read_jgf_document(_JsonReader(filepath, chunk_size))
+
+
+class _JsonReader:
+    """Reader of JSON text from a file that decodes the structure piece by piece.
+
+    Arrays and objects can be entered with :meth:`iter_array` and :meth:`iter_object`,
+    and each of their values can either be entered as well or decoded as a whole with
+    :meth:`read_value`. Only the text of the current value is held in memory.
+
+    """
+
+    __slots__ = ('value_start', '_file_handle', '_chunk_size', '_buffer', '_position',
+                 '_offset', '_is_exhausted', '_decoder')
+
+    def __init__(self, file_handle, chunk_size):
+        self._file_handle = file_handle
+        self._chunk_size = max(int(chunk_size), 1)
+        self._buffer = ''
+        self._position = 0
+        self._offset = 0
+        self._is_exhausted = False
+        self._decoder = _json.JSONDecoder()
+        self.value_start = 0
+
+    def tell(self):
+        """Get the position of the reader in the text, counted in characters."""
+        return self._offset + self._position
+
+    def fail(self, message, position=None):
+        """Raise an error that names the position in the text where the problem occurred."""
+        message = 'Invalid JGF text at character {}: {}'.format(
+            self.tell() if position is None else position, message)
+        raise ValueError(message)
+
+    def peek(self):
+        """Get the next character that is not whitespace, or an empty string at the end."""
+        while True:
+            match = _NON_WHITESPACE.search(self._buffer, self._position)
+            if match is not None:
+                self._position = match.start()
+                return self._buffer[self._position]
+            self._position = len(self._buffer)
+            if not self._read_more():
+                return ''
+
+    def expect(self, characters):
+        """Consume the next character that is not whitespace, which needs to be a given one."""
+        char = self.peek()
+        if not char or char not in characters:
+            self.fail('Expected {} but found {}.'.format(
+                ' or '.join(repr(c) for c in characters), repr(char) if char else 'the end'))
+        self._position += 1
+        return char
+
+    def read_value(self):
+        """Decode the next complete JSON value, whose position is then in value_start."""
+        self.peek()
+        self.value_start = self.tell()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except _json.JSONDecodeError as error:
+                # Incomplete values fail at the end of the buffer or in an unterminated string
+                is_incomplete = (error.pos >= len(self._buffer) - 8
+                                 or error.msg.startswith('Unterminated string'))
+                if is_incomplete and self._read_more():
+                    continue
+                self._position = error.pos
+                self.fail(error.msg + '.')
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._read_more():
+                continue
+            self._position = end
+            return value
+
+    def iter_object(self):
+        """Enter an object and yield its keys, after each of which its value needs to be read."""
+        self.expect('{')
+        if self.peek() == '}':
+            self._position += 1
+            return
+        while True:
+            if self.peek() != '"':
+                self.fail('Expected a key.')
+            key = self.read_value()
+            self.expect(':')
+            yield key
+            if self.expect(',}') == '}':
+                return
+
+    def iter_array(self):
+        """Enter an array and yield the position of each item, which needs to be read."""
+        self.expect('[')
+        if self.peek() == ']':
+            self._position += 1
+            return
+        position = 0
+        while True:
+            yield position
+            position += 1
+            if self.expect(',]') == ']':
+                return
+
+    def _read_more(self):
+        """Append the next chunk to the unconsumed part of the buffer, if there is one."""
+        if self._is_exhausted:
+            return False
+        remaining = self._buffer[self._position:]
+        chunk = self._file_handle.read(max(self._chunk_size, len(remaining)))
+        if not chunk:
+            self._is_exhausted = True
+            return False
+        self._offset += self._position
+        self._buffer = remaining + chunk
+        self._position = 0
+        return True
+
+
+class _ColumnBuffer:
+    """Growing column of JSON values in a compact form, where None marks a missing value.
+
+    Numbers are stored in a typed array and strings as codes into a list of distinct
+    strings. A column that mixes types, or holds booleans, lists, dicts or integers that
+    are not exactly representable as float, falls back to a list of values.
+
+    """
+
+    __slots__ = ('_kind', '_values', '_categories', '_codes', '_length', '_has_missing',
+                 '_is_integral')
+
+    def __init__(self):
+        self._kind = None
+        self._values = None
+        self._categories = None
+        self._codes = None
+        self._length = 0
+        self._has_missing = False
+        self._is_integral = True
+
+    def append(self, position, value):
+        """Set the value at a position behind all previous ones, the ones between are missing."""
+        if position > self._length:
+            self.pad(position)
+        kind = self._kind
+        value_type = value.__class__
+        if kind == 'string' and value_type is str:
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self._categories)
+                self._categories.append(value)
+            self._values.append(code)
+        elif kind == 'number' and (value_type is float or (
+                value_type is int and -2**53 <= value <= 2**53)):
+            if value_type is float:
+                self._is_integral = False
+            self._values.append(value)
+        elif kind == 'object':
+            self._values.append(value)
+        else:
+            if kind is None and value_type is str:
+                self._start('string')
+            elif kind is None and value_type in (int, float):
+                self._start('number')
+            else:
+                self._to_objects()
+            self.append(position, value)
+            return
+        self._length += 1
+
+    def pad(self, length):
+        """Fill the column with missing values up to a length."""
+        num_missing = length - self._length
+        if num_missing <= 0:
+            return
+        self._has_missing = True
+        if self._kind == 'string':
+            self._values.extend(_array.array('i', [-1]) * num_missing)
+        elif self._kind == 'number':
+            self._values.extend(_array.array('d', [_np.nan]) * num_missing)
+        elif self._kind == 'object':
+            self._values.extend([None] * num_missing)
+        self._length = length
+
+    def to_array(self):
+        """Get the column as numpy array with the types of :func:`edges_to_columnar_graph`."""
+        if self._kind == 'number':
+            values = _np.frombuffer(self._values, dtype=float)
+            if self._is_integral and not self._has_missing:
+                return values.astype(_np.int64)
+            return values.copy()
+        array = _np.empty(self._length, dtype=object)
+        if self._kind == 'string':
+            codes = _np.frombuffer(self._values, dtype=_np.int32)
+            is_present = codes >= 0
+            categories = _np.empty(len(self._categories), dtype=object)
+            categories[:] = self._categories
+            array[is_present] = categories[codes[is_present]]
+        elif self._kind == 'object':
+            array[:] = self._values
+        return array
+
+    def _start(self, kind):
+        num_missing = self._length
+        self._kind = kind
+        self._length = 0
+        if kind == 'string':
+            self._values = _array.array('i')
+            self._categories = []
+            self._codes = dict()
+        elif kind == 'number':
+            self._values = _array.array('d')
+        else:
+            self._values = []
+        self.pad(num_missing)
+
+    def _to_objects(self):
+        if self._kind is None:
+            self._start('object')
+            return
+        values = self.to_array().tolist()
+        if self._kind == 'number' and self._is_integral:
+            values = [None if val != val else int(val) for val in values]
+        elif self._kind == 'number':
+            values = [None if val != val else val for val in values]
+        self._kind = 'object'
+        self._values = values
+        self._categories = None
+        self._codes = None
+
+
+def _read_jgf_document(reader):
+    """Read the graphs of a complete JGF document."""
+    graphs = []
+    if reader.peek() == '[':
+        for _ in reader.iter_array():
+            _read_jgf_dict(reader, graphs)
+    else:
+        _read_jgf_dict(reader, graphs)
+    if reader.peek():
+        reader.fail('Unexpected text after the end of the data.')
+    if not graphs:
+        raise ValueError('JGF text contains no graph.')
+    return graphs
+
+
+def _read_jgf_dict(reader, graphs):
+    """Read a dict with a graph under "graph", graphs under "graphs" or a graph itself."""
+    if reader.peek() != '{':
+        reader.fail('Expected a dict with "graph" or "graphs".')
+    fields = dict()
+    for key in reader.iter_object():
+        if key == 'graph':
+            graphs.append(_read_jgf_graph(reader, len(graphs) + 1))
+        elif key == 'graphs':
+            if reader.peek() != '[':
+                reader.fail('The value of "graphs" needs to be a list.')
+            for _ in reader.iter_array():
+                graphs.append(_read_jgf_graph(reader, len(graphs) + 1))
+        else:
+            _read_jgf_graph_field(reader, key, fields, len(graphs) + 1)
+    if 'node_columns' in fields or 'edge_columns' in fields:
+        graphs.append(_to_columnar_graph(fields))
+
+
+def _read_jgf_graph(reader, number):
+    """Read a graph object and convert it to a columnar graph."""
+    if reader.peek() != '{':
+        reader.fail('Graph {} needs to be a dict.'.format(number))
+    fields = dict()
+    for key in reader.iter_object():
+        _read_jgf_graph_field(reader, key, fields, number)
+    return _to_columnar_graph(fields)
+
+
+def _read_jgf_graph_field(reader, key, fields, number):
+    if key == 'nodes':
+        fields['node_columns'] = _read_jgf_items(
+            reader, 'node', number, ('id', ), _NODE_DATA_KEYS)
+    elif key == 'edges':
+        fields['edge_columns'] = _read_jgf_items(
+            reader, 'edge', number, ('source', 'target'), _EDGE_DATA_KEYS)
+    else:
+        fields[key] = reader.read_value()
+
+
+def _read_jgf_items(reader, name, number, required_keys, data_keys):
+    """Read the nodes or edges of a graph into columns of the data and metadata fields."""
+    if reader.peek() != '[':
+        reader.fail('The {}s of graph {} need to be a list.'.format(name, number))
+    columns = dict()
+    num_items = 0
+    for position in reader.iter_array():
+        item = reader.read_value()
+        start = reader.value_start
+        if not isinstance(item, dict):
+            reader.fail('{} {} of graph {} is not a dict.'.format(
+                name.capitalize(), position, number), start)
+        for key in required_keys:
+            if item.get(key).__class__ not in (str, int, float):
+                reader.fail('{} {} of graph {} has no valid "{}".'.format(
+                    name.capitalize(), position, number, key), start)
+        metadata = item.get('metadata')
+        if metadata is None:
+            metadata = dict()
+        elif not isinstance(metadata, dict):
+            reader.fail('The metadata of {} {} of graph {} is not a dict.'.format(
+                name, position, number), start)
+        values = [(key, item[key]) for key in data_keys if key in item]
+        values += [(key, val) for key, val in metadata.items() if key not in data_keys]
+        for key, value in values:
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = _ColumnBuffer()
+            column.append(position, value)
+        num_items += 1
+    for column in columns.values():
+        column.pad(num_items)
+    return {key: column.to_array() for key, column in columns.items()}
+
+
+def _to_columnar_graph(fields):
+    """Assemble a columnar graph from the fields of a graph object in JGF.
+
+    As for JGF given as dict, a node with an id that is already used by an earlier node and
+    an edge that refers to an unknown node are ignored without a warning.
+
+    """
+    node_columns = fields.get('node_columns')
+    edge_columns = fields.get('edge_columns') or {
+        'source': _np.zeros(0, dtype=_np.int64), 'target': _np.zeros(0, dtype=_np.int64)}
+    if node_columns is not None and 'id' not in node_columns:
+        node_columns = dict(node_columns, id=_np.zeros(0, dtype=_np.int64))
+    if node_columns is not None:
+        node_columns, edge_columns = _remove_ignored_items(node_columns, edge_columns)
+    graph = _format_conversion.edges_to_columnar_graph(
+        edge_columns, nodes=node_columns, directed=fields.get('directed') is True)['graph']
+    for key in ('label', 'type', 'metadata'):
+        if fields.get(key) is not None:
+            graph[key] = fields[key]
+    return graph
+
+
+def _remove_ignored_items(node_columns, edge_columns):
+    """Remove nodes with a repeated id and edges that refer to an unknown node."""
+    node_ids, source_ids, target_ids = _format_conversion._as_comparable_ids(
+        node_columns['id'], edge_columns['source'], edge_columns['target'])
+    _, first_indices = _np.unique(node_ids, return_index=True)
+    if len(first_indices) < len(node_ids):
+        kept = _np.sort(first_indices)
+        node_columns = {key: val[kept] for key, val in node_columns.items()}
+        node_ids = node_ids[kept]
+    is_known = _np.isin(source_ids, node_ids) & _np.isin(target_ids, node_ids)
+    if not is_known.all():
+        edge_columns = {key: val[is_known] for key, val in edge_columns.items()}
+    return node_columns, edge_columns
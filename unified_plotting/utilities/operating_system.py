@@ -1,6 +1,7 @@
 """Simple, central access to operating system functionality."""
 
 import atexit as _atexit
+import hashlib as _hashlib
 import logging as _logging
 import os as _os
 import random as _random
@@ -176,6 +177,19 @@ def get_parent_directory(filepath):
     return _os.path.dirname(filepath)
 
 
+def get_relative_url(target_path, start_filepath):
+    """Get a relative URL that refers to a target path from a document at a start filepath.
+
+    References
+    ----------
+    - https://docs.python.org/3/library/os.path.html#os.path.relpath
+
+    """
+    start_dirpath = _os.path.dirname(_os.path.abspath(start_filepath))
+    relative_path = _os.path.relpath(_os.path.abspath(target_path), start_dirpath)
+    return relative_path.replace(_os.sep, '/')
+
+
 def is_nonempty_file(filepath, raise_exception=False, message=None):
     """Check if a file exists and is non-empty.
 
@@ -476,6 +490,53 @@ def move_file(source_filepath, target_filepath):
         raise ValueError('Target file "{}" was not created.'.format(target_filepath))
 
 
+def write_content_addressed_file(text, dirpath, name, extension, digest=None):
+    """Write a text file whose filename contains a hash of its content, unless it exists.
+
+    Identical content always leads to the same filepath, so that a file can be shared by
+    many documents and is written only once, while changed content gets a new filepath.
+
+    Parameters
+    ----------
+    text : str
+        Content of the file.
+    dirpath : str
+        Directory in which the file is created. It is created if it does not exist.
+    name : str
+        First part of the filename, which is followed by the hash and the extension.
+    extension : str
+        File extension, e.g. "js".
+    digest : str
+        Hexadecimal SHA-256 digest of the UTF-8 encoded text, if it is already known.
+
+    Returns
+    -------
+    filepath : str
+
+    """
+    # Argument processing
+    binary_data = text.encode('utf-8')
+    if digest is None:
+        digest = _hashlib.sha256(binary_data).hexdigest()
+    filename = '{}.{}.{}'.format(name, digest[:16], extension.lstrip('.'))
+    filepath = _os.path.join(dirpath, filename)
+
+    # Transformation: Write to a temporary file first, so that concurrent writers
+    # or readers never see an incomplete file
+    if not _os.path.isfile(filepath):
+        create_directory(dirpath)
+        file_descriptor, temporary_filepath = _tempfile.mkstemp(dir=dirpath, suffix='.tmp')
+        try:
+            with _os.fdopen(file_descriptor, 'wb') as file_handle:
+                file_handle.write(binary_data)
+            _os.chmod(temporary_filepath, 0o644)
+            _os.replace(temporary_filepath, filepath)
+        except BaseException:
+            _os.remove(temporary_filepath)
+            raise
+    return filepath
+
+
 # Run programs
 
 def open_url_or_file_in_webbrowser(data):